@@ -0,0 +1,100 @@
+"""Benchmark the fence scanner against the regex it replaced.
+
+Run from the repository root:
+
+    python benchmarks/fence_scanner.py [megabytes]
+
+Three inputs of the given size (default 4 MB): a chat answer with many
+blocks, one huge block, and the same answer received as a stream of
+small chunks (where the regex has to rescan everything received so far
+to find the blocks completed by each chunk).
+"""
+import re
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from springboot_assistant.fences import FenceScanner, scan_fences  # noqa: E402
+
+OLD_PATTERN = r"```(?:(java|xml|properties|yml|yaml|json))?\s*([\s\S]*?)```"
+
+JAVA = """```java:src/main/java/com/example/demo/Book{n}Controller.java
+package com.example.demo;
+
+@RestController
+@RequestMapping("/books/{n}")
+public class Book{n}Controller {{
+    @GetMapping
+    public List<Book> all() {{
+        return repository.findAll();
+    }}
+}}
+```
+
+The controller above exposes the books endpoint.
+
+"""
+
+
+def old_extract(text):
+    return [(match.group(1) or "text", match.group(2).strip()) for match in re.finditer(OLD_PATTERN, text)]
+
+
+def many_blocks(size):
+    parts, total, n = [], 0, 0
+    while total < size:
+        part = JAVA.format(n=n)
+        parts.append(part)
+        total += len(part)
+        n += 1
+    return "".join(parts)
+
+
+def one_block(size):
+    line = "    private static final String VALUE = \"0123456789abcdef\";\n"
+    return "```java\nclass Big {\n" + line * (size // len(line)) + "}\n```\n"
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def stream_old(text, chunk):
+    found = 0
+    for end in range(chunk, len(text) + chunk, chunk):
+        found = len(old_extract(text[:end]))
+    return found
+
+
+def stream_new(text, chunk):
+    scanner = FenceScanner()
+    found = 0
+    for start in range(0, len(text), chunk):
+        found += len(scanner.feed(text[start:start + chunk]))
+    return found + len(scanner.finish())
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+    size = int(megabytes * 1024 * 1024)
+    print(f"{'input':<34}{'regex':>10}{'scanner':>10}")
+
+    for name, text in (("many blocks", many_blocks(size)), ("one block", one_block(size))):
+        old_seconds, old_blocks = timed(old_extract, text)
+        new_seconds, new_blocks = timed(scan_fences, text)
+        assert len(old_blocks) == len(new_blocks)
+        print(f"{name + f' ({len(text) / 1e6:.1f} MB)':<34}{old_seconds:>9.3f}s{new_seconds:>9.3f}s")
+
+    # Streaming rescans are quadratic for the regex, so keep that input smaller
+    text = many_blocks(min(size, 256 * 1024))
+    old_seconds, old_found = timed(stream_old, text, 4096)
+    new_seconds, new_found = timed(stream_new, text, 64)
+    print(f"{f'stream ({len(text) / 1e6:.2f} MB)':<34}{old_seconds:>9.3f}s{new_seconds:>9.3f}s")
+    print(f"regex rescans every 4 KB ({old_found} blocks), scanner fed every 64 bytes ({new_found} blocks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure the memory held by a project whose classes are revised many times.
+
+Run from the repository root:
+
+    python benchmarks/file_store.py [classes] [revisions]
+
+Each of the given number of classes (default 40) is revised the given
+number of times (default 20) by chat answers that change a few lines. The
+previous file store kept every revision as a full `Name_1.java` copy in a
+dict; the blob store keeps the latest content once and earlier versions as
+deltas. Memory is measured with tracemalloc.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from springboot_assistant.blobs import BlobStore, VersionedFiles  # noqa: E402
+
+
+def java_class(n, revision):
+    fields = "".join(f"    private String field{i}; // revision {revision if i % 10 == revision % 10 else 0}\n"
+                     for i in range(60))
+    return f"package com.example.demo;\n\npublic class Entity{n} {{\n{fields}}}\n"
+
+
+def old_store(classes, revisions):
+    files = {}
+    for revision in range(revisions):
+        for n in range(classes):
+            code = java_class(n, revision)
+            filename, counter = f"Entity{n}.java", 1
+            while filename in files and files[filename] != code:
+                filename = f"Entity{n}_{counter}.java"
+                counter += 1
+            files[filename] = code
+    return files
+
+
+def blob_store(classes, revisions):
+    files = VersionedFiles(blobs=BlobStore())
+    for revision in range(revisions):
+        for n in range(classes):
+            files[f"Entity{n}.java"] = java_class(n, revision)
+    return files
+
+
+def measure(name, build, classes, revisions):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    files = build(classes, revisions)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>12}: {held / 1024:8.0f} KiB in {len(files)} files, built in {elapsed:.2f}s")
+    return files
+
+
+def main():
+    classes = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    revisions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    measure("old dict", old_store, classes, revisions)
+    files = measure("blob store", blob_store, classes, revisions)
+    assert files.version("Entity0.java", 1) == java_class(0, 0)
+
+
+if __name__ == "__main__":
+    main()
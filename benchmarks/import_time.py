@@ -0,0 +1,74 @@
+"""Measure the import cost of the Streamlit app.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py [top]
+
+Startup: the import statements at the top of SpringbootAIAssistant.py are
+run in a fresh interpreter with ``python -X importtime`` and the slowest
+modules (cumulative microseconds, default top 15) are listed. Modules
+that are not installed here are skipped and reported.
+
+Per rerun: Streamlit executes the script again on every interaction, so
+the same statements are then run again in-process, where every module is
+already in sys.modules.
+"""
+import ast
+import subprocess
+import sys
+import time
+
+SCRIPT = "SpringbootAIAssistant.py"
+
+
+def import_statements(path):
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    return [ast.get_source_segment(source, node)
+            for node in ast.parse(source).body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def available(statement):
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True)
+    return result.returncode == 0
+
+
+def startup(statements, top):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    # Top-level imports are the least indented names
+    roots = [row for row in rows if row[2].startswith(" ") and not row[2].startswith("  ")]
+    print(f"startup: {sum(row[0] for row in roots) / 1000:.1f} ms for {len(rows)} modules")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {name.strip()}")
+
+
+def rerun(statements, runs=100):
+    code = compile("\n".join(statements), SCRIPT, "exec")
+    exec(code, {})
+    started = time.perf_counter()
+    for _ in range(runs):
+        exec(code, {})
+    print(f"per rerun: {(time.perf_counter() - started) / runs * 1e6:.0f} us for {len(statements)} import statements")
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    sys.path.insert(0, ".")
+    statements = import_statements(SCRIPT)
+    missing = [statement for statement in statements if not available(statement)]
+    if missing:
+        print("skipped (not installed here): " + "; ".join(missing))
+    statements = [statement for statement in statements if statement not in missing]
+    startup(statements, top)
+    rerun(statements)
+
+
+if __name__ == "__main__":
+    main()
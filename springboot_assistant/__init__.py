@@ -0,0 +1,3 @@
+# Streamlit-independent core of the Spring Boot AI Code Assistant.
+# The UI (SpringbootAIAssistant.py), the batch CLI (python -m springboot_assistant)
+# and other clients all drive generation through these modules.
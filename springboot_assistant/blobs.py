@@ -0,0 +1,200 @@
+import difflib
+import hashlib
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+# Content-addressed storage for project files. Each distinct content is kept
+# once per process, whichever projects, sessions or file names hold it, and
+# contents above a size threshold are kept zlib-compressed. Files keep their
+# earlier versions as reverse deltas: the newest version is stored whole and
+# each older one as the edits that rebuild it from the version after it.
+
+# Contents of at least this many characters are compressed
+COMPRESS_THRESHOLD = 4096
+# Decompressed large contents kept for repeated reads
+DECOMPRESSED_CACHE_SIZE = 16
+# Earlier versions kept per file; the oldest are dropped first
+MAX_VERSIONS = 50
+
+
+# Function to hash file contents; used as the version key for a file
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+# Reference-counted blobs by content hash. Small contents are kept as the
+# string itself, so every holder shares one object; large ones compressed.
+class BlobStore:
+    def __init__(self, compress_threshold=COMPRESS_THRESHOLD):
+        self.compress_threshold = compress_threshold
+        self._blobs = {}
+        self._refs = {}
+        self._decompressed = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Function to add a reference to a content; returns its hash
+    def put(self, content, digest=None):
+        digest = digest or content_hash(content)
+        with self._lock:
+            if digest in self._blobs:
+                self._refs[digest] += 1
+                return digest
+            if len(content) >= self.compress_threshold:
+                self._blobs[digest] = zlib.compress(content.encode("utf-8"))
+            else:
+                self._blobs[digest] = content
+            self._refs[digest] = 1
+        return digest
+
+    def get(self, digest):
+        with self._lock:
+            blob = self._blobs[digest]
+            if isinstance(blob, str):
+                return blob
+            content = self._decompressed.get(digest)
+            if content is not None:
+                self._decompressed.move_to_end(digest)
+                return content
+        content = zlib.decompress(blob).decode("utf-8")
+        with self._lock:
+            self._decompressed[digest] = content
+            while len(self._decompressed) > DECOMPRESSED_CACHE_SIZE:
+                self._decompressed.popitem(last=False)
+        return content
+
+    # Function to drop a reference; the blob goes with its last one
+    def release(self, digest):
+        with self._lock:
+            self._refs[digest] -= 1
+            if self._refs[digest] == 0:
+                del self._refs[digest]
+                del self._blobs[digest]
+                self._decompressed.pop(digest, None)
+
+    # Function to summarise the store: blob count and the bytes held
+    def stats(self):
+        with self._lock:
+            blobs = list(self._blobs.values())
+        stored = sum(len(blob) for blob in blobs)
+        return {"blobs": len(blobs), "stored_bytes": stored}
+
+
+# Blobs shared by every in-memory project of the process
+default_blobs = BlobStore()
+
+
+# Function to encode the edits that rebuild `target` from `source`, line by
+# line: runs of lines copied from the source and new text, zlib-compressed JSON
+def make_delta(source, target):
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, source_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"))
+
+
+# Function to rebuild a target from its source and a make_delta() delta
+def apply_delta(source, delta):
+    source_lines = source.splitlines(keepends=True)
+    return "".join(
+        op if isinstance(op, str) else "".join(source_lines[op[0]:op[1]])
+        for op in json.loads(zlib.decompress(delta).decode("utf-8"))
+    )
+
+
+# Version history shared by the file mappings. A class using it provides
+# _version_entries(filename): the earlier versions, oldest first, as
+# (number, hash, replaced, delta) where `replaced` is when the version was
+# superseded and `delta` rebuilds it from the next newer version.
+class VersionHistory:
+    # Function to list a file's versions, oldest first, ending with the
+    # current one: {"version", "hash", "replaced", "current"}
+    def versions(self, filename):
+        entries = self._version_entries(filename)
+        versions = [{"version": number, "hash": digest, "replaced": replaced, "current": False}
+                    for number, digest, replaced, _ in entries]
+        versions.append({"version": entries[-1][0] + 1 if entries else 1, "hash": self.hash_of(filename),
+                         "replaced": None, "current": True})
+        return versions
+
+    # Function to get the content of one version of a file
+    def version(self, filename, number):
+        entries = self._version_entries(filename)
+        content = self[filename]
+        if number == (entries[-1][0] + 1 if entries else 1):
+            return content
+        for entry_number, _, _, delta in reversed(entries):
+            content = apply_delta(content, delta)
+            if entry_number == number:
+                return content
+        raise KeyError(f"{filename} has no version {number}")
+
+
+# Dict of filename -> content backed by a BlobStore, with version history.
+# Replacing a file's content keeps the previous content as a delta, so a
+# revised class stays one file instead of piling up copies. Iterating and
+# reading return the stored strings; nothing is copied.
+class VersionedFiles(VersionHistory, MutableMapping):
+    def __init__(self, files=None, blobs=None, max_versions=MAX_VERSIONS):
+        self._blobs = default_blobs if blobs is None else blobs
+        self._max_versions = max_versions
+        self._hashes = {}
+        self._history = {}
+        if files:
+            self.update(files)
+
+    def __getitem__(self, filename):
+        return self._blobs.get(self._hashes[filename])
+
+    def __setitem__(self, filename, content):
+        digest = content_hash(content)
+        previous = self._hashes.get(filename)
+        if previous == digest:
+            return
+        self._blobs.put(content, digest)
+        if previous is not None:
+            history = self._history.setdefault(filename, [])
+            number = history[-1][0] + 1 if history else 1
+            history.append((number, previous, time.time(), make_delta(content, self._blobs.get(previous))))
+            del history[:-self._max_versions]
+            self._blobs.release(previous)
+        self._hashes[filename] = digest
+
+    def __delitem__(self, filename):
+        self._blobs.release(self._hashes.pop(filename))
+        self._history.pop(filename, None)
+
+    def __iter__(self):
+        return iter(list(self._hashes))
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, filename):
+        return filename in self._hashes
+
+    # Function to hand the blobs back when a project is dropped; the mapping
+    # is empty afterwards
+    def close(self):
+        for digest in self._hashes.values():
+            self._blobs.release(digest)
+        self._hashes.clear()
+        self._history.clear()
+
+    # Content hash of a file, without reading it
+    def hash_of(self, filename):
+        return self._hashes[filename]
+
+    def _version_entries(self, filename):
+        if filename not in self._hashes:
+            raise KeyError(filename)
+        return self._history.get(filename, [])
@@ -0,0 +1,96 @@
+# Listing, search and paging for the project file browser. Entries are built
+# from file names, the project's categories and the Java symbol indexes, so
+# listing a project never loads file contents; a file is only read when it
+# is opened.
+
+# File types by extension (or whole name), for listing without the content
+FILE_TYPES = {
+    "java": "java",
+    "xml": "xml",
+    "properties": "properties",
+    "yml": "yaml",
+    "yaml": "yaml",
+    "json": "json",
+    "md": "markdown",
+    "sql": "sql",
+    "gradle": "groovy",
+    "kts": "kotlin",
+    "kt": "kotlin",
+    "sh": "bash",
+    "dockerfile": "dockerfile",
+}
+CATEGORY_LABELS = {"main": "Source Code", "test": "Tests", "config": "Configuration"}
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+# Function to get a file's type from its name
+def file_type_of(filename):
+    name = filename.rsplit("/", 1)[-1].lower()
+    return FILE_TYPES.get(name.rsplit(".", 1)[-1] if "." in name else name, "text")
+
+
+# Function to describe each project file for the list view:
+# {"filename", "kind" (generated/test), "category", "type", "role", "symbols"}.
+# `symbol_indexes` are JavaSymbolIndex objects covering the Java files.
+def file_entries(project, symbol_indexes=()):
+    categories = {filename: category for category, filenames in project["file_categories"].items()
+                  for filename in filenames}
+    entries = []
+    for kind, key in (("generated", "generated_files"), ("test", "test_files")):
+        for filename in project[key]:
+            symbols, role = [], None
+            for index in symbol_indexes:
+                parsed = index.parsed(filename)
+                if parsed is None:
+                    continue
+                for declaration in parsed["types"]:
+                    role = role or declaration["role"]
+                    symbols.append(declaration["name"])
+                    symbols.extend(method["name"] for method in declaration["methods"])
+                    symbols.extend(nested["name"] for nested in declaration["nested"])
+                break
+            entries.append({
+                "filename": filename,
+                "kind": kind,
+                "category": categories.get(filename, "test" if kind == "test" else "main"),
+                "type": file_type_of(filename),
+                "role": role or "",
+                "symbols": list(dict.fromkeys(symbols)),
+            })
+    return entries
+
+
+# Function to filter entries by a search query and category. Every word of
+# the query must match the file name, type, role or one of its symbols
+# (case-insensitive); "type:", "role:" and "symbol:" restrict a word to one field.
+def filter_entries(entries, query="", category=None):
+    words = query.lower().split()
+    matched = []
+    for entry in entries:
+        if category and entry["category"] != category:
+            continue
+        fields = {
+            "name": entry["filename"].lower(),
+            "type": entry["type"],
+            "role": entry["role"],
+            "symbol": " ".join(entry["symbols"]).lower(),
+        }
+        if all(_matches(word, fields) for word in words):
+            matched.append(entry)
+    return matched
+
+
+def _matches(word, fields):
+    field, _, value = word.partition(":")
+    if value and field in fields:
+        return value in fields[field]
+    return any(word in text for text in fields.values())
+
+
+# Function to get one page of entries; returns (entries, page, page count)
+# with the page number clamped to the pages there are
+def paginate(entries, page, page_size):
+    pages = max(1, -(-len(entries) // page_size))
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return entries[start:start + page_size], page, pages
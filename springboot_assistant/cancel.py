@@ -0,0 +1,55 @@
+import threading
+from contextvars import ContextVar
+
+# Cancellation for running generations. A CancelToken is handed to (or set
+# for) a generation; cancelling it stops stream loops at the next chunk,
+# closes open HTTP streams so Ollama stops decoding, and drops requests still
+# waiting in the scheduler. Output received before the cancel is kept.
+
+# Token for the generation running in this context (jobs, UI runs); unset means not cancellable
+cancel_token = ContextVar("cancel_token", default=None)
+
+
+class GenerationCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._closers = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            try:
+                closer()
+            except Exception:
+                pass  # the stream is being torn down anyway
+
+    # Function to register a callable (e.g. a response's close) to run on cancel;
+    # runs it straight away if the token is already cancelled
+    def on_cancel(self, closer):
+        with self._lock:
+            if not self._event.is_set():
+                self._closers.append(closer)
+                return
+        closer()
+
+    def discard(self, closer):
+        with self._lock:
+            if closer in self._closers:
+                self._closers.remove(closer)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise GenerationCancelled("Generation cancelled")
@@ -0,0 +1,128 @@
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .llm import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from .logs import add_log, log_sink
+from .pipeline import PIPELINE_STAGES, run_pipeline
+
+
+# Function to read prompt jobs from a JSONL file. Each line is either a JSON
+# string or an object with "prompt" and optional "name"/"metadata"/"model".
+def load_jobs(path):
+    jobs = []
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            if isinstance(job, str):
+                job = {"prompt": job}
+            if not job.get("prompt"):
+                raise ValueError(f"{path}:{line_number}: missing 'prompt'")
+            job.setdefault("name", f"project-{line_number}")
+            jobs.append(job)
+    return jobs
+
+
+# Function to turn a job name into a safe directory name
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-") or "project"
+
+
+# Function to run one job and write its project to disk
+def run_job(job, args):
+    job_logs = []
+    log_sink.set(job_logs.append)
+    name = _slug(job["name"])
+    metadata = dict(job.get("metadata") or {})
+    metadata.setdefault("app_name", name)
+
+    try:
+        project, zip_data, report = run_pipeline(
+            job["prompt"],
+            metadata=metadata,
+            model=job.get("model", args.model),
+            temperature=job.get("temperature", args.temperature),
+            stages=args.stages,
+            include_spring_initializr=args.spring_initializr,
+            structured=job.get("structured", args.structured)
+        )
+        project_dir = os.path.join(args.output, name)
+        os.makedirs(project_dir, exist_ok=True)
+        if zip_data:
+            with open(os.path.join(args.output, f"{name}.zip"), "wb") as handle:
+                handle.write(zip_data)
+            with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
+                zip_file.extractall(project_dir)
+        with open(os.path.join(project_dir, "conversation.json"), "w", encoding="utf-8") as handle:
+            json.dump(project["messages"], handle, indent=2)
+        report["status"] = "ok" if project["generated_files"] else "empty"
+    except Exception as e:
+        add_log("ERROR", f"Job {name} failed: {str(e)}")
+        report = {"prompt": job["prompt"], "status": "error", "error": str(e), "timings": {}}
+
+    report["name"] = name
+    if args.include_logs:
+        report["logs"] = job_logs
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m springboot_assistant",
+        description="Generate Spring Boot projects from a JSONL file of prompts without the Streamlit UI."
+    )
+    parser.add_argument("prompts", help="JSONL file with one prompt (string or object) per line")
+    parser.add_argument("-o", "--output", default="generated-projects", help="directory to write projects to")
+    parser.add_argument("-m", "--model", default=DEFAULT_MODEL, help="Ollama model to use")
+    parser.add_argument("-t", "--temperature", type=float, default=DEFAULT_TEMPERATURE)
+    parser.add_argument("-j", "--concurrency", type=int, default=1, help="number of projects generated in parallel")
+    parser.add_argument("--stages", nargs="+", choices=PIPELINE_STAGES, default=PIPELINE_STAGES,
+                        help="pipeline stages to run")
+    parser.add_argument("--spring-initializr", action="store_true", help="build the ZIP on top of a Spring Initializr project")
+    parser.add_argument("--structured", action="store_true",
+                        help="generate code as a JSON list of files (Ollama structured outputs) instead of Markdown")
+    parser.add_argument("--report", default=None, help="where to write the JSON timing report (default: <output>/report.json)")
+    parser.add_argument("--include-logs", action="store_true", help="include per-project logs in the report")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.prompts)
+    os.makedirs(args.output, exist_ok=True)
+    add_log("INFO", f"Running {len(jobs)} jobs with concurrency {args.concurrency}")
+
+    started = time.perf_counter()
+    reports = []
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [executor.submit(run_job, job, args) for job in jobs]
+        for future in as_completed(futures):
+            report = future.result()
+            add_log("INFO", f"{report['name']}: {report['status']} in {report['timings'].get('total', 0)}s")
+            reports.append(report)
+
+    reports.sort(key=lambda report: report["name"])
+    summary = {
+        "model": args.model,
+        "concurrency": args.concurrency,
+        "jobs": len(jobs),
+        "succeeded": sum(1 for report in reports if report["status"] == "ok"),
+        "wall_time": round(time.perf_counter() - started, 3),
+        "projects": reports,
+    }
+    report_path = args.report or os.path.join(args.output, "report.json")
+    with open(report_path, "w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2)
+    add_log("INFO", f"Timing report written to {report_path}")
+
+    return 0 if summary["succeeded"] == len(jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import re
+import threading
+from functools import lru_cache
+
+from .llm import DEFAULT_MODEL
+from .logs import add_log
+from .router import routed_completion
+
+# Tokens sent with each chat turn: system prompt, summary, history and the new prompt
+DEFAULT_CONTEXT_BUDGET = 3072
+# A single earlier message never takes more than this share of the budget
+MAX_MESSAGE_SHARE = 0.5
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+# Function to estimate the token count of a text. Counts words, numbers and
+# punctuation separately and charges long words extra, which tracks BPE
+# tokenisers closely enough on prose and Java code. Cached per text.
+@lru_cache(maxsize=4096)
+def estimate_tokens(text):
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        tokens += 1 + len(piece) // 8
+    return tokens + 4  # role and message framing
+
+
+# Function to shorten a message to about max_tokens, keeping its start and end
+def truncate_message(content, max_tokens):
+    if estimate_tokens(content) <= max_tokens:
+        return content
+    # Characters per token for this message, used to size the kept parts
+    ratio = len(content) / estimate_tokens(content)
+    keep = int(max_tokens * ratio / 2)
+    return f"{content[:keep]}\n\n[... earlier content trimmed to fit the context window ...]\n\n{content[-keep:]}"
+
+
+# Function to pick the history that fits the budget. Walks back from the newest
+# message, keeps the selected turns in chronological order, and returns them
+# with the index of the oldest message included.
+def pack_history(history, budget, summary_text=None):
+    remaining = budget
+    if summary_text:
+        remaining -= estimate_tokens(summary_text)
+
+    max_message_tokens = int(budget * MAX_MESSAGE_SHARE)
+    packed = []
+    start = len(history)
+    for index in range(len(history) - 1, -1, -1):
+        content = truncate_message(history[index]["content"], max_message_tokens)
+        cost = estimate_tokens(content)
+        if cost > remaining:
+            break
+        packed.append({"role": history[index]["role"], "content": content})
+        remaining -= cost
+        start = index
+
+    packed.reverse()
+    return packed, start
+
+
+# Keeps a rolling summary of the turns that no longer fit in the context
+# window. Summaries are extended incrementally in a background thread; chat
+# turns use whatever summary is ready and never wait for it.
+class ConversationSummarizer:
+    def __init__(self, max_summary_tokens=400):
+        self.max_summary_tokens = max_summary_tokens
+        self.summary = ""
+        self.covered = 0  # number of leading history messages the summary covers
+        self._lock = threading.Lock()
+        self._worker = None
+
+    # Function to return the summary available right now, if any
+    def current_summary(self):
+        with self._lock:
+            return self.summary or None
+
+    # Function to summarise history[covered:upto] in the background
+    def schedule(self, history, upto, model=DEFAULT_MODEL):
+        with self._lock:
+            if upto <= self.covered or (self._worker and self._worker.is_alive()):
+                return
+            pending = [dict(message) for message in history[self.covered:upto]]
+            previous = self.summary
+            self._worker = threading.Thread(
+                target=self._summarize, args=(previous, pending, upto, model), daemon=True
+            )
+            self._worker.start()
+
+    def _summarize(self, previous, pending, upto, model):
+        transcript = "\n\n".join(
+            f"{message['role'].upper()}: {truncate_message(message['content'], 600)}" for message in pending
+        )
+        prompt = f"""
+        Update the running summary of a conversation between a developer and a Spring Boot assistant.
+        Keep class names, endpoints, entities, libraries and decisions; drop code bodies.
+        Answer with the updated summary only, in at most {self.max_summary_tokens // 2} words.
+
+        Current summary:
+        {previous or "(none)"}
+
+        New messages:
+        {transcript}
+        """
+        try:
+            summary = routed_completion(
+                "summary",
+                [{"role": "user", "content": prompt}],
+                model=model,
+                temperature=0.2,
+                description="conversation summary"
+            )
+        except Exception as e:
+            add_log("WARNING", f"Conversation summary failed: {str(e)}")
+            return
+
+        with self._lock:
+            self.summary = truncate_message(summary.strip(), self.max_summary_tokens)
+            self.covered = upto
+        add_log("INFO", f"Conversation summary now covers {upto} messages")
+
+
+# Function to build the chat payload: system prompt, summary of older turns,
+# the most recent turns that fit the budget (in order), then the new prompt
+def build_context(system_prompt, history, prompt, budget=DEFAULT_CONTEXT_BUDGET, summarizer=None, model=DEFAULT_MODEL):
+    budget = max(0, budget - estimate_tokens(system_prompt) - estimate_tokens(prompt))
+    summary_text = summarizer.current_summary() if summarizer is not None else None
+
+    packed, start = pack_history(history, budget, summary_text)
+    if start == 0:
+        summary_text = None  # the whole conversation fits, no summary needed
+    if summarizer is not None:
+        summarizer.schedule(history, start, model=model)
+
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary_text:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary_text}"})
+    messages.extend(packed)
+    messages.append({"role": "user", "content": prompt})
+
+    add_log("INFO", f"Context: {len(packed)}/{len(history)} previous messages, "
+                    f"{'with' if summary_text else 'no'} summary, ~{sum(estimate_tokens(m['content']) for m in messages)} tokens")
+    return messages
@@ -0,0 +1,375 @@
+import io
+import re
+import zipfile
+from collections import ChainMap
+
+import requests
+
+from .blobs import VersionedFiles, content_hash
+from .fences import scan_fences
+from .java_index import parse_java_cached, primary_type
+from .logs import add_log
+from .timeouts import request_timeout
+
+DEFAULT_PROJECT_METADATA = {
+    "app_name": "spring-boot-app",
+    "group_id": "com.example",
+    "artifact_id": "demo",
+    "description": "Spring Boot Application",
+    "java_version": "17",
+    "spring_boot_version": "3.2.3",
+}
+
+
+# Function to create an empty project. The keys mirror the Streamlit session
+# state, so st.session_state can be passed anywhere a project is expected.
+# Files are kept in the shared blob store, with their earlier versions.
+def new_project(metadata=None):
+    project_metadata = dict(DEFAULT_PROJECT_METADATA)
+    if metadata:
+        project_metadata.update(metadata)
+    return {
+        "messages": [],
+        "generated_files": VersionedFiles(),
+        "test_files": VersionedFiles(),
+        "file_categories": {
+            "main": [],
+            "test": [],
+            "config": []
+        },
+        "project_metadata": project_metadata,
+        # Test filename -> what the test was generated from (see incremental.py)
+        "test_sources": {},
+    }
+
+
+# Read-through view of several file mappings that also gives content hashes
+# without reading the files, like VersionedFiles and LazyFiles
+class ProjectFiles(ChainMap):
+    def hash_of(self, filename):
+        for files in self.maps:
+            if filename in files:
+                return files.hash_of(filename) if hasattr(files, "hash_of") else content_hash(files[filename])
+        raise KeyError(filename)
+
+
+# Function to get every file of a project, tests after the generated code,
+# as one read-through view (nothing is copied)
+def project_files(project):
+    return ProjectFiles(project["test_files"], project["generated_files"])
+
+
+# Function to extract the code blocks of a response, as
+# {"language", "path", "code", "complete"} dicts (see fences.py). Blocks
+# cut off before their closing fence are left out.
+def extract_code_blocks(text):
+    if not text or not text.strip():
+        add_log("WARNING", "No text to extract code blocks from")
+        return []
+
+    add_log("INFO", f"Extracting code blocks from text of length {len(text)}")
+    code_blocks = [block for block in scan_fences(text) if block["complete"]]
+
+    add_log("INFO", f"Found {len(code_blocks)} code blocks")
+    return code_blocks
+
+
+# Languages taken from a fence's tag as they are, and other tags for them
+KNOWN_LANGUAGES = {"java", "xml", "properties", "yml", "yaml", "json", "dockerfile", "sql", "groovy",
+                   "kotlin", "bash", "markdown"}
+LANGUAGE_ALIASES = {"docker": "dockerfile", "kt": "kotlin", "kts": "kotlin", "sh": "bash", "shell": "bash",
+                    "md": "markdown", "gradle": "groovy"}
+
+
+# Function to detect file type based on content
+def detect_file_type(content, language_hint=None):
+    language_hint = LANGUAGE_ALIASES.get(language_hint, language_hint)
+    if language_hint in KNOWN_LANGUAGES:
+        return language_hint
+
+    if "public class" in content or "import org.springframework" in content:
+        return "java"
+    elif "<project" in content or "<dependencies" in content or "<?xml" in content:
+        return "xml"
+    elif "spring.datasource.url" in content or "server.port" in content:
+        return "properties"
+    elif "---" in content and (":" in content) and ("  " in content):
+        return "yaml"
+    elif content.strip().startswith("{") and content.strip().endswith("}"):
+        return "json"
+    else:
+        return "text"
+
+
+# Function to suggest filename based on content
+def suggest_filename(content, file_type):
+    if file_type == "java":
+        declaration = primary_type(parse_java_cached(content))
+        # Check if it's a test file
+        is_test = "import org.junit" in content or (declaration or {}).get("role") == "test"
+
+        if declaration and declaration["name"]:
+            class_name = declaration["name"]
+            if is_test:
+                return f"{class_name}.java", "test"
+            else:
+                return f"{class_name}.java", "main"
+        else:
+            if is_test:
+                return "TestClass.java", "test"
+            else:
+                return "JavaClass.java", "main"
+
+    elif file_type == "xml" and "pom" in content.lower():
+        return "pom.xml", "config"
+    elif file_type == "xml" and "application-context" in content.lower():
+        return "application-context.xml", "config"
+    elif file_type == "xml":
+        return "config.xml", "config"
+    elif file_type == "properties":
+        if "test" in content.lower():
+            return "application-test.properties", "config"
+        else:
+            return "application.properties", "config"
+    elif file_type == "yaml" or file_type == "yml":
+        if "test" in content.lower():
+            return "application-test.yml", "config"
+        else:
+            return "application.yml", "config"
+    elif file_type == "json":
+        return "config.json", "config"
+    elif file_type == "dockerfile":
+        return "Dockerfile", "config"
+    elif file_type == "sql":
+        return "schema.sql", "config"
+    elif file_type == "groovy":
+        return "build.gradle", "config"
+    elif file_type == "kotlin":
+        return ("build.gradle.kts" if "plugins {" in content else "Main.kt"), "main"
+    elif file_type == "bash":
+        return "script.sh", "config"
+    elif file_type == "markdown":
+        return "README.md", "config"
+    else:
+        return "file.txt", "config"
+
+
+# Function to get a file's category from its path in a Maven/Gradle layout
+# (None when the path does not say)
+def category_for_path(path):
+    path = "/" + path.replace("\\", "/").lstrip("/")
+    if "/src/test/" in path:
+        return "test"
+    if "/src/main/java/" in path or "/src/main/kotlin/" in path:
+        return "main"
+    if "/src/main/resources/" in path:
+        return "config"
+    return None
+
+
+# Function to register the code blocks of a chat response as project files
+def register_code_blocks(project, response):
+    return register_blocks(project, extract_code_blocks(response))
+
+
+# Function to register code blocks ({"language", "path", "code"}, from
+# fences.py or structured.py) as project files. A block with a path takes its
+# file name, and its category where the path shows it, from the path; the
+# language tag gives its type. Only what is missing is guessed from the code.
+# A block named like an existing file is a revision of it and replaces its
+# content (the file mapping keeps the earlier version); only distinct blocks
+# of the same response that share a name get numbered names.
+def register_blocks(project, blocks):
+    file_info = []
+    registered = set()
+    for block in blocks:
+        code = block["code"]
+        file_type = detect_file_type(code, block["language"])
+        filename, category = suggest_filename(code, file_type)
+        if block["path"]:
+            # The model named the file (```java:src/main/java/... or a structured answer)
+            filename = block["path"].rstrip("/").rsplit("/", 1)[-1] or filename
+            category = category_for_path(block["path"]) or category
+
+        # Ensure unique filenames within the response
+        base_name = filename.split('.')[0]
+        extension = filename.split('.')[-1]
+        counter = 1
+        original_filename = filename
+        while filename in registered and project["generated_files"][filename] != code:
+            filename = f"{base_name}_{counter}.{extension}"
+            counter += 1
+        registered.add(filename)
+
+        project["generated_files"][filename] = code
+
+        # Add to appropriate category list if not already there
+        if filename not in project["file_categories"][category]:
+            project["file_categories"][category].append(filename)
+
+        file_info.append({
+            "filename": filename,
+            "type": file_type,
+            "category": category,
+            "original_name": original_filename,
+            "code": code
+        })
+
+    return file_info
+
+
+# Function to store a generated test class in the project
+def add_test_file(project, test_filename, test_code):
+    project["test_files"][test_filename] = test_code
+
+    # Add to test category
+    if test_filename not in project["file_categories"]["test"]:
+        project["file_categories"]["test"].append(test_filename)
+
+
+# Function to store a generated config/doc file in the project
+def add_config_file(project, filename, content):
+    project["generated_files"][filename] = content
+    if filename not in project["file_categories"]["config"]:
+        project["file_categories"]["config"].append(filename)
+
+
+# Function to replace the content of an existing file, generated code or test
+def update_file(project, filename, content):
+    files = project["test_files"] if filename in project["test_files"] else project["generated_files"]
+    files[filename] = content
+
+
+# Function to get the category a file is listed under
+def file_category(project, filename):
+    for category, filenames in project["file_categories"].items():
+        if filename in filenames:
+            return category
+    return "test" if filename in project["test_files"] else "main"
+
+
+# Function to generate a zip file with all code files
+def generate_zip_file(files_dict, project_metadata, include_spring_initializr=False):
+    zip_buffer = io.BytesIO()
+
+    # If Spring Initializr is requested, generate a base project first
+    if include_spring_initializr:
+        try:
+            # Prepare Spring Initializr request
+            initializr_url = "https://start.spring.io/starter.zip"
+            params = {
+                "type": "maven-project",
+                "language": "java",
+                "bootVersion": project_metadata["spring_boot_version"],
+                "baseDir": project_metadata["app_name"],
+                "groupId": project_metadata["group_id"],
+                "artifactId": project_metadata["artifact_id"],
+                "name": project_metadata["app_name"],
+                "description": project_metadata["description"],
+                "packageName": f"{project_metadata['group_id']}.{project_metadata['artifact_id']}",
+                "packaging": "jar",
+                "javaVersion": project_metadata["java_version"],
+                "dependencies": "web,data-jpa,lombok,actuator"
+            }
+
+            add_log("INFO", "Requesting base project from Spring Initializr")
+            response = requests.get(initializr_url, params=params, timeout=request_timeout("initializr"))
+
+            if response.status_code == 200:
+                add_log("INFO", "Successfully got Spring Initializr template")
+
+                # Extract the Spring Initializr ZIP
+                with zipfile.ZipFile(io.BytesIO(response.content)) as init_zip:
+                    # Create a new ZIP with the Spring Initializr files plus our generated files
+                    with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
+                        # Copy all files from Spring Initializr
+                        for item in init_zip.infolist():
+                            zip_file.writestr(item.filename, init_zip.read(item.filename))
+
+                        # Now add our generated files, properly organizing them
+                        organized_files = organize_project_files(files_dict)
+                        package_name = f"{project_metadata['group_id']}.{project_metadata['artifact_id']}"
+                        base_package_path = package_name.replace('.', '/')
+
+                        for directory, files in organized_files.items():
+                            for filename, content in files.items():
+                                if directory == "src/main/java" or directory == "src/test/java":
+                                    # Place Java files in the correct package structure
+                                    file_path = f"{directory}/{base_package_path}/{filename}"
+                                    # Update package declarations in the file
+                                    if detect_file_type(content) == "java":
+                                        content = update_package_declaration(content, package_name)
+                                else:
+                                    file_path = f"{directory}/{filename}" if directory else filename
+
+                                # Only write the file if it doesn't exist in the Spring Initializr template
+                                # or if we're intentionally overwriting it (like pom.xml)
+                                try:
+                                    init_zip.getinfo(file_path)
+                                    if filename == "pom.xml":  # Always overwrite pom.xml with our version
+                                        zip_file.writestr(file_path, content)
+                                except KeyError:  # File doesn't exist in the original ZIP
+                                    zip_file.writestr(file_path, content)
+
+                return zip_buffer.getvalue()
+            else:
+                add_log("ERROR", f"Spring Initializr request failed with status code {response.status_code}")
+        except Exception as e:
+            add_log("ERROR", f"Failed to generate project with Spring Initializr: {str(e)}")
+
+    # Fallback to regular ZIP file generation
+    with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
+        organized_files = organize_project_files(files_dict)
+        for directory, files in organized_files.items():
+            for filename, content in files.items():
+                file_path = f"{directory}/{filename}" if directory else filename
+                zip_file.writestr(file_path, content)
+
+    return zip_buffer.getvalue()
+
+
+# Function to update package declarations in Java files
+def update_package_declaration(content, package_name):
+    # Check if the file already has a package declaration
+    package_match = re.search(r'^package\s+([a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)*);', content, re.MULTILINE)
+
+    if package_match:
+        # Replace existing package declaration
+        return re.sub(r'^package\s+([a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)*);',
+                      f'package {package_name};', content, count=1, flags=re.MULTILINE)
+    else:
+        # Add package declaration at the beginning
+        return f'package {package_name};\n\n{content}'
+
+
+# Function to organize files in a project structure
+def organize_project_files(files):
+    project_structure = {
+        "src/main/java": {},
+        "src/main/resources": {},
+        "src/test/java": {},
+        "src/test/resources": {},
+        "": {}  # Root directory
+    }
+
+    for filename, content in files.items():
+        file_type = detect_file_type(content)
+
+        if file_type == "java" and ("@Test" in content or "import org.junit" in content):
+            project_structure["src/test/java"][filename] = content
+        elif file_type == "java":
+            project_structure["src/main/java"][filename] = content
+        elif file_type in ["properties", "yml", "yaml", "json"] and "test" in filename.lower():
+            project_structure["src/test/resources"][filename] = content
+        elif file_type in ["properties", "yml", "yaml", "json"]:
+            project_structure["src/main/resources"][filename] = content
+        elif filename == "pom.xml":
+            project_structure[""][filename] = content
+        elif filename.lower() == "readme.md":
+            project_structure[""][filename] = content
+        elif filename.lower() == "dockerfile":
+            project_structure[""][filename] = content
+        else:
+            project_structure[""][filename] = content
+
+    return project_structure
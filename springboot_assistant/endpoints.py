@@ -0,0 +1,268 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import requests
+
+from .logs import add_log
+from .timeouts import request_timeout
+
+# Pool of Ollama servers. Configure with OLLAMA_HOSTS (comma-separated URLs) or
+# OLLAMA_HOST; defaults to the local server. Requests go to a healthy endpoint,
+# preferring one that already has the model loaded, then one that has it
+# installed, then the one with the fewest requests in flight. Connection
+# failures mark the endpoint unhealthy and the request moves to the next one.
+# Short calls can be hedged: with OLLAMA_HEDGE_AFTER set, a second copy is
+# sent to another endpoint if the first has not answered after that many seconds.
+
+DEFAULT_HOST = "http://localhost:11434"
+# Seconds between background health checks
+HEALTH_INTERVAL = 15
+
+
+# Function to list the Ollama servers configured in the environment
+def configured_hosts():
+    hosts = os.environ.get("OLLAMA_HOSTS") or os.environ.get("OLLAMA_HOST") or DEFAULT_HOST
+    return [host for host in hosts.split(",") if host.strip()]
+
+
+def _normalize(url):
+    url = url.strip().rstrip("/").replace("0.0.0.0", "localhost")  # a server bind address
+    if "://" not in url:
+        url = f"http://{url}"
+    if url.count(":") == 1:
+        url += ":11434"
+    return url
+
+
+class OllamaEndpoint:
+    def __init__(self, url):
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.installed = set()
+        self.loaded = set()
+        self.latency = None  # moving average of request time, seconds
+        self.failures = 0
+        self.checked = 0.0
+
+    def describe(self):
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "installed": sorted(self.installed),
+            "loaded": sorted(self.loaded),
+            "latency_seconds": round(self.latency, 3) if self.latency is not None else None,
+            "failures": self.failures,
+        }
+
+
+class EndpointPool:
+    def __init__(self, urls, health_interval=HEALTH_INTERVAL, hedge_after=None):
+        self.endpoints = [OllamaEndpoint(_normalize(url)) for url in urls]
+        self.health_interval = health_interval
+        self.hedge_after = hedge_after
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._closed = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(self.endpoints)), thread_name_prefix="ollama-pool")
+
+    @classmethod
+    def from_env(cls):
+        hedge_after = os.environ.get("OLLAMA_HEDGE_AFTER")
+        return cls(configured_hosts(), hedge_after=float(hedge_after) if hedge_after else None)
+
+    @property
+    def primary_url(self):
+        return self.endpoints[0].url
+
+    # Function to health-check one endpoint: installed models from /api/tags and
+    # models in memory from /api/ps (older servers without /api/ps are fine)
+    def check(self, endpoint):
+        try:
+            response = requests.get(f"{endpoint.url}/api/tags", timeout=request_timeout("health"))
+            response.raise_for_status()
+            installed = {model.get("name") for model in response.json().get("models", [])}
+            loaded = set()
+            try:
+                running = requests.get(f"{endpoint.url}/api/ps", timeout=request_timeout("health"))
+                if running.status_code == 200:
+                    loaded = {model.get("name") for model in running.json().get("models", [])}
+            except requests.RequestException:
+                pass
+            with self._lock:
+                if not endpoint.healthy:
+                    add_log("INFO", f"Ollama endpoint {endpoint.url} is healthy again")
+                endpoint.healthy, endpoint.installed, endpoint.loaded = True, installed, loaded
+        except Exception as e:
+            with self._lock:
+                if endpoint.healthy:
+                    add_log("WARNING", f"Ollama endpoint {endpoint.url} failed its health check: {str(e)}")
+                endpoint.healthy = False
+        endpoint.checked = time.monotonic()
+
+    # Function to health-check all endpoints in parallel
+    def refresh(self):
+        list(self._executor.map(self.check, self.endpoints))
+
+    def _ensure_monitor(self):
+        if self._monitor is not None or len(self.endpoints) == 1:
+            return
+        with self._lock:
+            if self._monitor is not None:
+                return
+            self._monitor = threading.Thread(target=self._monitor_loop, daemon=True, name="ollama-health")
+            self._monitor.start()
+
+    def _monitor_loop(self):
+        while not self._closed.is_set():
+            try:
+                self.refresh()
+            except RuntimeError:
+                return  # the executor was shut down (interpreter exit)
+            self._closed.wait(self.health_interval)
+
+    # Function to stop the health monitor and the worker threads
+    def close(self):
+        self._closed.set()
+        self._executor.shutdown(wait=False)
+
+    # Function to pick the endpoint for a request (see the module comment for the order)
+    def choose(self, model=None, exclude=()):
+        self._ensure_monitor()
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.url not in exclude]
+            if not candidates:
+                return None
+            healthy = [endpoint for endpoint in candidates if endpoint.healthy] or candidates
+
+            def rank(endpoint):
+                affinity = 0 if model in endpoint.loaded else 1 if model in endpoint.installed else 2
+                return (affinity if model else 0, endpoint.outstanding, endpoint.latency or 0.0)
+
+            return min(healthy, key=rank)
+
+    # Context manager that counts a request against an endpoint while it runs
+    @contextmanager
+    def acquire(self, model=None, exclude=()):
+        endpoint = self.choose(model, exclude)
+        if endpoint is None:
+            raise requests.ConnectionError("No Ollama endpoint available")
+        with self._lock:
+            endpoint.outstanding += 1
+        started = time.perf_counter()
+        try:
+            yield endpoint
+        except requests.ConnectionError:
+            self.mark_failed(endpoint)
+            raise
+        else:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                endpoint.latency = elapsed if endpoint.latency is None else 0.3 * elapsed + 0.7 * endpoint.latency
+                if model:
+                    endpoint.loaded.add(model)  # Ollama keeps the model in memory after serving it
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def mark_failed(self, endpoint):
+        with self._lock:
+            endpoint.failures += 1
+            if endpoint.healthy and len(self.endpoints) > 1:
+                add_log("WARNING", f"Ollama endpoint {endpoint.url} marked unhealthy")
+                endpoint.healthy = False
+
+    def _send(self, method, path, model, exclude, kwargs):
+        with self.acquire(model, exclude) as endpoint:
+            return requests.request(method, f"{endpoint.url}{path}", **kwargs)
+
+    # Function to send a request, failing over to the next endpoint on
+    # connection errors (a slow answer is not retried elsewhere). With
+    # hedge=True (and hedging configured) a slow call is duplicated to a
+    # second endpoint and the first answer wins.
+    def request(self, method, path, model=None, hedge=False, **kwargs):
+        if hedge and self.hedge_after is not None and len(self.endpoints) > 1:
+            return self._hedged(method, path, model, kwargs)
+
+        tried = []
+        while True:
+            with self.acquire(model, tuple(tried)) as endpoint:
+                tried.append(endpoint.url)
+                try:
+                    return requests.request(method, f"{endpoint.url}{path}", **kwargs)
+                except requests.ConnectionError as e:
+                    if len(tried) >= len(self.endpoints):
+                        raise
+                    self.mark_failed(endpoint)
+                    add_log("WARNING", f"Ollama request {path} failed on {endpoint.url} ({str(e)}), trying another endpoint")
+
+    def _hedged(self, method, path, model, kwargs):
+        first = self.choose(model)
+        futures = {self._executor.submit(self._send, method, path, model, (), kwargs)}
+        done, _ = wait(futures, timeout=self.hedge_after)
+        if not done:
+            second = self.choose(model, exclude=(first.url,))
+            if second is not None:
+                add_log("INFO", f"Hedging {path}: no answer from {first.url} after {self.hedge_after}s, also asking {second.url}")
+                futures.add(self._executor.submit(self._send, method, path, model, (first.url,), kwargs))
+
+        error = None
+        pending = futures
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+        raise error
+
+    # Context manager for a streaming request; fails over only before the
+    # response starts, and keeps the endpoint counted until the stream closes
+    @contextmanager
+    def stream(self, path, model=None, **kwargs):
+        tried = []
+        while True:
+            with self.acquire(model, tuple(tried)) as endpoint:
+                tried.append(endpoint.url)
+                try:
+                    response = requests.post(f"{endpoint.url}{path}", stream=True, **kwargs)
+                except requests.ConnectionError as e:
+                    if len(tried) >= len(self.endpoints):
+                        raise
+                    self.mark_failed(endpoint)
+                    add_log("WARNING", f"Ollama stream {path} failed on {endpoint.url} ({str(e)}), trying another endpoint")
+                    continue
+                with response:
+                    yield response
+                return
+
+    # Function to list installed models across healthy endpoints
+    def models(self):
+        self.refresh()
+        with self._lock:
+            return sorted({name for endpoint in self.endpoints if endpoint.healthy for name in endpoint.installed})
+
+    def describe(self):
+        with self._lock:
+            return [endpoint.describe() for endpoint in self.endpoints]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Function to get the process-wide pool shared by every Ollama call. It is
+# built from the environment on first use, so importing this module neither
+# reads the configuration nor starts anything.
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = EndpointPool.from_env()
+    return _pool
@@ -0,0 +1,168 @@
+import re
+
+# Line-oriented scanner for fenced code blocks in model responses, shared by
+# the chat, the generators and the HTTP API. Fences follow CommonMark: a line
+# of three or more backticks (or tildes), indented at most three spaces, opens
+# a block; a line of the same character, at least as long and with nothing
+# after it, closes it. A longer fence can therefore wrap shorter ones. The
+# info string after the opening fence gives the language and an optional
+# file path hint, e.g. ```java:src/main/java/com/example/Foo.java or
+# ```yaml application.yml.
+#
+# Only fence lines are looked at one by one (found with a single multiline
+# search), the text between them is taken as it is, so scanning is linear in
+# the response size. The scanner can be fed a stream chunk by chunk.
+
+# Matched from the newline before the fence line, which lets the regex engine
+# skip ahead to candidate lines instead of trying every position
+_FENCE = re.compile(r"\n( {0,3})(`{3,}|~{3,})([^\n]*)")
+# Languages whose blocks may themselves contain fenced examples (a README);
+# inside them a fence with an info string opens a nested level
+NESTING_LANGUAGES = {"markdown", "md"}
+
+
+# Function to split a fence's info string into (language, path hint)
+def parse_info(info):
+    words = info.split()
+    if not words:
+        return "text", None
+    language, path = words[0], None
+    if ":" in language:
+        language, path = language.split(":", 1)
+    for word in words[1:]:
+        if path:
+            break
+        if "=" in word:
+            key, value = word.split("=", 1)
+            if key.lower() in ("file", "filename", "path", "title"):
+                path = value.strip("\"'")
+        elif "/" in word or "." in word:
+            path = word.strip("\"'")
+    return language.strip("{}.").lower() or "text", path or None
+
+
+class FenceScanner:
+    # prose=True also keeps the text outside the blocks, in self.prose
+    def __init__(self, prose=False):
+        self.prose = [] if prose else None
+        self._pending = []  # pieces of the current, unfinished line
+        self._open = None  # (character, length, indent, language, path) of the open fence
+        self._parts = []  # content of the open block so far
+        self._depth = 0  # nested fences inside a markdown block
+
+    # Function to feed the next piece of a response; returns the blocks
+    # completed by it, as {"language", "path", "code", "complete"}
+    def feed(self, chunk):
+        end = chunk.rfind("\n")
+        if end < 0:
+            self._pending.append(chunk)
+            return []
+        self._pending.append(chunk[:end + 1])
+        text = "".join(self._pending)
+        self._pending = [chunk[end + 1:]]
+        return self._scan(text)
+
+    # Function to end the response; returns the blocks completed by its last
+    # line and, if a fence is still open, that block with complete=False
+    def finish(self):
+        blocks = self._scan("".join(self._pending) + "\n")
+        self._pending = []
+        if self._open is not None:
+            blocks.append(self._block(complete=False))
+            self._open = None
+        return blocks
+
+    # Function to get the block still open, as received so far
+    def current(self):
+        if self._open is None:
+            return None
+        return self._block(complete=False)
+
+    # Function to scan whole lines (text ends with a newline)
+    def _scan(self, text):
+        text = "\n" + text
+        blocks = []
+        position = 1
+        for match in _FENCE.finditer(text):
+            if self._open is not None:
+                self._parts.append(text[position:match.start() + 1])
+            elif self.prose is not None:
+                self.prose.append(text[position:match.start() + 1])
+            position = match.end() + 1
+            block = self._fence(match)
+            if block is not None:
+                blocks.append(block)
+        if self._open is not None:
+            self._parts.append(text[position:])
+        elif self.prose is not None:
+            self.prose.append(text[position:])
+        return blocks
+
+    # Function to handle a fence line; returns the block it closes, if any
+    def _fence(self, match):
+        indent, fence, info = match.group(1, 2, 3)
+        info = info.strip()
+        if self._open is None:
+            if fence[0] == "`" and "`" in info:
+                if self.prose is not None:
+                    self.prose.append(match.group(0)[1:] + "\n")
+                return None  # inline code, not a fence
+            language, path = parse_info(info)
+            self._open = (fence[0], len(fence), len(indent), language, path)
+            self._parts = []
+            self._depth = 0
+            return None
+
+        character, length, _, language, _ = self._open
+        if fence[0] == character and len(fence) >= length:
+            if language in NESTING_LANGUAGES and info:
+                self._depth += 1
+            elif not info and self._depth:
+                self._depth -= 1
+            elif not info:
+                block = self._block(complete=True)
+                self._open = None
+                return block
+        # Anything else is content of the open block
+        self._parts.append(match.group(0)[1:] + "\n")
+        return None
+
+    def _block(self, complete):
+        _, _, indent, language, path = self._open
+        code = "".join(self._parts)
+        if indent:
+            # Drop the opening fence's indentation from the content, as CommonMark does
+            code = "\n".join(line[min(indent, len(line) - len(line.lstrip(" "))):] for line in code.split("\n"))
+        return {
+            "language": language,
+            "path": path,
+            "code": code.replace("\r\n", "\n").strip("\n").rstrip(),
+            "complete": complete,
+        }
+
+
+# Function to scan a complete response; returns every fenced block in order,
+# the last one with complete=False if the response ends inside it
+def scan_fences(text):
+    scanner = FenceScanner()
+    blocks = scanner.feed(text or "")
+    blocks.extend(scanner.finish())
+    return blocks
+
+
+# Function to split a complete response into the text outside its blocks
+# and the blocks; returns (prose, blocks)
+def split_fences(text):
+    scanner = FenceScanner(prose=True)
+    blocks = scanner.feed(text or "")
+    blocks.extend(scanner.finish())
+    return "".join(scanner.prose), blocks
+
+
+# Function to get the code of the first block in one of the given languages
+# (partial=True also accepts a block cut off before its closing fence)
+def first_block(text, languages, partial=False):
+    for block in scan_fences(text):
+        if block["language"] in languages and (block["complete"] or partial):
+            return block["code"]
+    return None
@@ -0,0 +1,531 @@
+import threading
+import time
+from collections import OrderedDict
+
+from .browser import file_type_of
+from .context import DEFAULT_CONTEXT_BUDGET, build_context
+from .core import detect_file_type, file_category, project_files, register_blocks, update_file
+from .fences import first_block, scan_fences
+from .java_index import parse_java_cached, primary_type
+from .llm import DEFAULT_MODEL, DEFAULT_TEMPERATURE, PartialResponse
+from .logs import add_log
+from .openapi import build_openapi_spec, render_openapi_yaml
+from .patches import EDIT_SYSTEM_PROMPT, apply_edits, describe_edit, parse_edits
+from .retrieval import DEFAULT_FILES_BUDGET, select_relevant_files
+from .router import routed_completion
+from .store import content_hash
+from .structured import STRUCTURED_SYSTEM_PROMPT
+from .templates import render_artifact
+
+CHAT_SYSTEM_PROMPT = """
+You are an expert Java Spring Boot developer assistant.
+Your task is to help developers by generating Java Spring Boot code examples, explaining concepts, and answering questions.
+When generating code, make sure it's complete, well-commented, and follows best practices.
+For larger applications, organize your response to show the file structure and explain how the components work together.
+Always provide complete file contents rather than snippets.
+Put each file in its own code block and name it after the language tag, like ```java:src/main/java/com/example/demo/BookController.java
+When generating code with multiple files, ensure the names are consistent across files (package names, class names, etc.)
+Use the latest Spring Boot conventions and practices.
+"""
+
+
+# Share of the chat context budget that may go to retrieved project files
+CHAT_FILES_SHARE = 0.4
+# In edit mode, where the model copies excerpts of the files it edits
+EDIT_FILES_SHARE = 0.6
+
+
+# Function to build the chat payload from the conversation so far, keeping
+# the most recent turns that fit the token budget and summarising the rest.
+# With project files, the classes most relevant to the prompt are included too.
+# structured=True asks for the JSON answer of structured.py instead of Markdown,
+# edit=True for edits to the included files (patches.py) instead of whole files.
+def build_chat_messages(history, prompt, budget=DEFAULT_CONTEXT_BUDGET, summarizer=None, model=DEFAULT_MODEL,
+                        project_files=None, retriever=None, structured=False, edit=False):
+    if edit:
+        system_prompt = EDIT_SYSTEM_PROMPT
+    else:
+        system_prompt = STRUCTURED_SYSTEM_PROMPT if structured else CHAT_SYSTEM_PROMPT
+    if project_files:
+        # Recent turns help resolve follow-ups such as "add validation to it"
+        query = " ".join([message["content"] for message in history[-2:]] + [prompt, prompt])
+        share = EDIT_FILES_SHARE if edit else CHAT_FILES_SHARE
+        relevant = select_relevant_files(query, project_files, retriever, int(budget * share), k=4)
+        if relevant:
+            files_content = "".join(
+                f"\n\n{filename}:\n```{detect_file_type(content)}\n{content}\n```" for filename, content in relevant.items()
+            )
+            system_prompt += f"\nCurrent project files relevant to this request:{files_content}\n"
+    return build_context(system_prompt, history, prompt, budget=budget, summarizer=summarizer, model=model)
+
+
+# Function to register an edit-mode answer: its edits are applied to the
+# project's files and its whole-file blocks registered as new files. A file
+# whose edits conflict is asked for again in full, with the failed edits as
+# the change to make. Returns (file_info as from register_blocks, with an
+# "edit" status on edited files, and apply_edits' results).
+def register_edits(project, response, prompt, base_hashes=None, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    edits, blocks = parse_edits(response)
+    file_info = register_blocks(project, blocks)
+    results = apply_edits(project, edits, base_hashes)
+    files = project_files(project)
+    for edit, result in zip(edits, results):
+        if result["status"] == "conflict" and result["filename"] in files:
+            add_log("WARNING", f"Edit of {result['filename']} did not apply ({result['detail']}), asking for the whole file")
+            content = rewrite_file(result["filename"], files[result["filename"]], describe_edit(edit), prompt,
+                                   model=model, temperature=temperature)
+            if content:
+                update_file(project, result["filename"], content)
+                result.update(status="rewritten", content=content)
+        if result["status"] in ("patched", "rewritten", "created"):
+            file_type = detect_file_type(result["content"], file_type_of(result["filename"]))
+            file_info.append({
+                "filename": result["filename"],
+                "type": file_type,
+                "category": file_category(project, result["filename"]),
+                "original_name": result["filename"],
+                "code": result["content"],
+                "edit": result["status"],
+            })
+
+    edited = [result for result in results if result["status"] in ("patched", "created")]
+    if edited:
+        add_log("INFO", f"Applied edits to {len(edited)} files: {len(response)} characters of answer for "
+                        f"{sum(len(result['content']) for result in edited)} characters of files")
+    return file_info, results
+
+
+# Function to ask for the whole of a file whose edits did not apply
+def rewrite_file(filename, content, change, instructions, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    file_type = detect_file_type(content, file_type_of(filename))
+    system_prompt = """
+    You are an expert Java Spring Boot developer assistant.
+    Apply the requested change to the file and return the complete updated file in one code block, without explanations.
+    """
+    rewrite_prompt = f"""
+    Request: {instructions}
+
+    Current {filename}:
+    ```{file_type}
+    {content}
+    ```
+
+    Change to make (an edit that no longer matches the file exactly):
+    {change}
+    """
+    try:
+        add_log("INFO", f"Rewriting {filename} in full")
+        response = routed_completion(
+            "chat",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": rewrite_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description=f"rewrite of {filename}"
+        )
+        blocks = [block for block in scan_fences(response) if block["complete"]]
+        return blocks[0]["code"] if blocks else response.strip()
+    except Exception as e:
+        add_log("ERROR", f"Rewriting {filename} failed: {str(e)}")
+        return None
+
+
+# Marker on the first line of output kept from an interrupted generation
+INCOMPLETE_MARKER = "INCOMPLETE:"
+
+
+# Function to keep the output of an interrupted generation, flagged in a
+# comment of the file's own syntax so it is not mistaken for a finished file
+def _incomplete(content, reason, comment="//"):
+    return f"{comment} {INCOMPLETE_MARKER} generation stopped early ({reason}), review and complete before use\n{content}"
+
+
+# Function to check whether generated content was kept from an interrupted generation
+def is_incomplete(content):
+    return bool(content) and INCOMPLETE_MARKER in content.split("\n", 1)[0]
+
+
+TEST_SYSTEM_PROMPT = """
+    You are an expert Java Spring Boot test generator.
+    Generate complete {test_type} for the following Java class.
+    The test class should follow best practices and include meaningful assertions.
+    Format the response as pure Java code without any explanations or markdown.
+    """
+
+TEST_PROMPT = """
+    Generate Spring Boot tests for this class:
+
+    ```java
+    {java_file_content}
+    ```
+
+    Requirements:
+    1. Name the test class {test_class_name}
+    2. Use appropriate testing libraries (JUnit 5, Mockito, etc.)
+    3. Test all public methods with good coverage
+    4. Include proper mocking of dependencies
+    5. Follow standard test naming conventions (given/when/then)
+    6. Include detailed comments explaining each test case{mocks}
+    """
+
+# Hash of the test prompt templates; tests generated with other templates are out of date
+TEST_PROMPT_HASH = content_hash(TEST_SYSTEM_PROMPT + TEST_PROMPT)[:16]
+
+
+# Function to generate tests for a Java file
+def generate_tests(java_file_content, filename, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    # Find the class to test and its role from the symbol index
+    declaration = primary_type(parse_java_cached(java_file_content))
+    if not declaration or not declaration["name"]:
+        return None, "Couldn't identify a class name to test"
+
+    class_name = declaration["name"]
+    test_class_name = f"{class_name}Test"
+
+    # Prepare system prompt based on the class type
+    role = declaration["role"]
+    if role == "controller":
+        test_type = "MockMvc controller tests"
+    elif role == "service":
+        test_type = "service unit tests with Mockito"
+    elif role == "repository":
+        test_type = "repository tests with @DataJpaTest"
+    elif role == "entity":
+        test_type = "entity class validation tests"
+    elif declaration["kind"] == "record":
+        test_type = "JUnit tests for the record's accessors, equality and validation"
+    elif declaration["kind"] == "enum":
+        test_type = "JUnit tests for the enum's constants and behaviour"
+    else:
+        test_type = "JUnit tests"
+
+    mocks = ""
+    if declaration["dependencies"]:
+        mocks = f"\n    7. Mock these injected dependencies: {', '.join(declaration['dependencies'])}"
+
+    system_prompt = TEST_SYSTEM_PROMPT.format(test_type=test_type)
+    test_prompt = TEST_PROMPT.format(java_file_content=java_file_content, test_class_name=test_class_name, mocks=mocks)
+
+    try:
+        add_log("INFO", f"Generating tests for {filename}")
+        test_code = routed_completion(
+            "tests",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": test_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description="tests"
+        )
+
+        # Extract only the Java code if it's wrapped in markdown code blocks
+        if "```java" in test_code:
+            test_code = first_block(test_code, ["java"]) or test_code
+
+        return test_code, test_class_name
+    except PartialResponse as e:
+        add_log("WARNING", f"Test generation for {filename} was interrupted, keeping {len(e.content)} characters")
+        return _incomplete(first_block(e.content, ["java"], partial=True) or e.content, e.reason), test_class_name
+    except Exception as e:
+        add_log("ERROR", f"Error generating tests: {str(e)}")
+        return None, f"Error generating tests: {str(e)}"
+
+
+INTEGRATION_TEST_QUERY = "RestController Controller RequestMapping GetMapping PostMapping PutMapping DeleteMapping endpoint request response DTO Entity Service"
+DOCUMENTATION_QUERY = "SpringBootApplication RestController RequestMapping endpoint Entity Repository Service Configuration application properties pom dependency"
+
+
+# Function to generate integration tests for a REST API
+def generate_integration_tests(generated_files, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                               retriever=None, files_budget=DEFAULT_FILES_BUDGET):
+    # Create a prompt for generating comprehensive integration tests from the most relevant classes
+    relevant = select_relevant_files(INTEGRATION_TEST_QUERY, generated_files, retriever, files_budget,
+                                     include=lambda filename: filename.endswith(".java"))
+    files_content = ""
+    for filename, content in relevant.items():
+        files_content += f"\n\n{filename}:\n```java\n{content}\n```"
+
+    system_prompt = """
+    You are an expert Spring Boot integration test generator.
+    Generate a comprehensive integration test class that tests the REST APIs defined in the provided files.
+    The test should use MockMvc, @SpringBootTest, and include HTTP requests to test endpoints.
+    Format the response as pure Java code without any explanations or markdown.
+    """
+
+    integration_test_prompt = f"""
+    Generate Spring Boot integration tests for the following files:
+    {files_content}
+
+    Requirements:
+    1. Name the test class ApplicationIntegrationTest
+    2. Use @SpringBootTest and TestRestTemplate or WebTestClient
+    3. Test all REST API endpoints
+    4. Include tests for success, validation and error conditions
+    5. Add appropriate assertions for response status and body
+    6. Include detailed comments explaining the test setup and assertions
+    """
+
+    try:
+        test_code = routed_completion(
+            "integration-tests",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": integration_test_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description="integration tests"
+        )
+
+        # Extract only the Java code if it's wrapped in markdown code blocks
+        if "```java" in test_code:
+            test_code = first_block(test_code, ["java"]) or test_code
+
+        return test_code, "ApplicationIntegrationTest"
+    except PartialResponse as e:
+        add_log("WARNING", f"Integration test generation was interrupted, keeping {len(e.content)} characters")
+        return (_incomplete(first_block(e.content, ["java"], partial=True) or e.content, e.reason),
+                "ApplicationIntegrationTest")
+    except Exception as e:
+        add_log("ERROR", f"Error generating integration tests: {str(e)}")
+        return None, f"Error generating integration tests: {str(e)}"
+
+
+# Function to generate documentation for a Spring Boot project
+def generate_documentation(generated_files, project_metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                           retriever=None, files_budget=DEFAULT_FILES_BUDGET):
+    # Collect the most relevant generated files for the documentation
+    files_content = ""
+    for filename, content in select_relevant_files(DOCUMENTATION_QUERY, generated_files, retriever, files_budget).items():
+        files_content += f"\n\n{filename}:\n```{detect_file_type(content)}\n{content}\n```"
+
+    system_prompt = """
+    You are an expert Spring Boot developer and technical writer.
+    Generate comprehensive documentation for the provided Spring Boot project.
+    The documentation should include:
+    1. Overview of the project architecture
+    2. API documentation for all REST endpoints
+    3. Description of key components and their relationships
+    4. Setup and configuration instructions
+    5. Examples of API usage with curl commands
+
+    Format the response in clean, well-structured Markdown.
+    """
+
+    documentation_prompt = f"""
+    Create comprehensive documentation for this Spring Boot project:
+    {files_content}
+
+    Project Details:
+    - Name: {project_metadata['app_name']}
+    - Group ID: {project_metadata['group_id']}
+    - Artifact ID: {project_metadata['artifact_id']}
+    - Description: {project_metadata['description']}
+    - Java Version: {project_metadata['java_version']}
+    - Spring Boot Version: {project_metadata['spring_boot_version']}
+
+    Include:
+    1. Project overview and architecture diagram (described in text)
+    2. API documentation with endpoints, methods, request/response examples
+    3. Database schema description (if applicable)
+    4. Setup and configuration guide
+    5. Sample curl commands for testing APIs
+    """
+
+    try:
+        return routed_completion(
+            "documentation",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": documentation_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description="documentation"
+        )
+    except PartialResponse as e:
+        add_log("WARNING", f"Documentation generation was interrupted, keeping {len(e.content)} characters")
+        return _incomplete(e.content, e.reason, comment=">")
+    except Exception as e:
+        add_log("ERROR", f"Error generating documentation: {str(e)}")
+        return f"Error generating documentation: {str(e)}"
+
+
+# Function to generate Docker files for the project. Rendered from templates
+# (metadata plus the services detected in the build file); with customise=True
+# the model adapts the rendered files to the given instructions.
+def generate_docker_files(project_metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                          files=None, customise=False, instructions=""):
+    dockerfile = render_artifact("dockerfile", project_metadata, files)
+    docker_compose = render_artifact("docker-compose", project_metadata, files)
+    if not customise:
+        return dockerfile, docker_compose
+
+    system_prompt = """
+    You are an expert in containerization for Spring Boot applications.
+    You adapt an existing Dockerfile and docker-compose.yml to the developer's requirements.
+    Answer with the complete Dockerfile in a ```dockerfile block and docker-compose.yml in a ```yaml block.
+    """
+
+    docker_prompt = f"""
+    Adapt these files for the Spring Boot project {project_metadata['app_name']}
+    (Spring Boot {project_metadata['spring_boot_version']}, Java {project_metadata['java_version']}).
+
+    ```dockerfile
+    {dockerfile}
+    ```
+
+    ```yaml
+    {docker_compose}
+    ```
+
+    Requirements:
+    {instructions or "Review the files and improve JVM tuning, security and health checks where useful."}
+    """
+
+    try:
+        docker_response = routed_completion(
+            "docker",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": docker_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description="Docker files"
+        )
+
+        # Keep the rendered file for any part the model did not return
+        dockerfile = first_block(docker_response, ["dockerfile"]) or dockerfile
+        docker_compose = first_block(docker_response, ["yaml", "yml"]) or docker_compose
+    except Exception as e:
+        add_log("ERROR", f"Error customising Docker files, using the templates: {str(e)}")
+    return dockerfile, docker_compose
+
+
+# Enriched specs by (skeleton hash, model); the least recently used go first
+ENRICHED_SPECS_SIZE = 32
+_enriched_specs = OrderedDict()
+_enriched_lock = threading.Lock()
+
+
+# Function for generating an OpenAPI specification. The spec is extracted
+# statically from the controllers; with enrich=True the model then adds
+# descriptions and examples to that skeleton.
+def generate_openapi_spec(generated_files, project_metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                          symbol_index=None, enrich=False):
+    started = time.perf_counter()
+    spec = build_openapi_spec(generated_files, project_metadata, symbol_index)
+    if spec is None:
+        return "No controller files found in the project"
+
+    skeleton = render_openapi_yaml(spec)
+    add_log("INFO", f"Extracted OpenAPI specification: {len(spec['paths'])} paths, "
+                    f"{len(spec.get('components', {}).get('schemas', {}))} schemas "
+                    f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+    if not enrich:
+        return skeleton
+    return enrich_openapi_spec(skeleton, list(spec["paths"]), model, temperature)
+
+
+# Function to let the model add descriptions and examples to an extracted spec.
+# Falls back to the skeleton if the answer drops any path.
+def enrich_openapi_spec(skeleton, paths, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    key = (content_hash(skeleton), model)
+    with _enriched_lock:
+        if key in _enriched_specs:
+            _enriched_specs.move_to_end(key)
+            return _enriched_specs[key]
+
+    system_prompt = """
+    You are an expert in OpenAPI specification documentation.
+    You improve an existing OpenAPI 3.0 YAML specification without changing its structure.
+    Format the response as a YAML OpenAPI specification.
+    """
+
+    enrich_prompt = f"""
+    Add documentation to this OpenAPI 3.0 specification, which was extracted from the controller code:
+
+    ```yaml
+    {skeleton}
+    ```
+
+    Requirements:
+    1. Add a description to every operation, parameter, response and schema property
+    2. Add realistic example values to schemas and parameters
+    3. Do not add, remove or rename paths, operations, parameters or schemas
+    4. Keep every type, format and $ref exactly as given
+    5. Answer with the complete YAML specification only
+    """
+
+    try:
+        openapi_spec = routed_completion(
+            "openapi",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": enrich_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description="OpenAPI enrichment"
+        )
+        openapi_spec = first_block(openapi_spec, ["yaml", "yml"]) or openapi_spec
+    except Exception as e:
+        add_log("ERROR", f"Error enriching OpenAPI specification: {str(e)}")
+        return skeleton
+
+    missing = [path for path in paths if path not in openapi_spec]
+    if missing or "openapi:" not in openapi_spec:
+        add_log("WARNING", f"Enriched OpenAPI specification dropped {len(missing)} paths, keeping the extracted one")
+        return skeleton
+    with _enriched_lock:
+        _enriched_specs[key] = openapi_spec
+        while len(_enriched_specs) > ENRICHED_SPECS_SIZE:
+            _enriched_specs.popitem(last=False)
+    return openapi_spec
+
+
+# Function to generate GitHub Actions workflow for CI/CD. Rendered from a
+# template; customise=True lets the model adapt it to the given instructions.
+def generate_github_actions(project_metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                            files=None, customise=False, instructions=""):
+    workflow = render_artifact("github-actions", project_metadata, files)
+    if not customise:
+        return workflow
+
+    system_prompt = """
+    You are an expert in CI/CD for Java Spring Boot applications.
+    You adapt an existing GitHub Actions workflow to the developer's requirements.
+    Answer with the complete workflow in a ```yaml block.
+    """
+
+    github_actions_prompt = f"""
+    Adapt this GitHub Actions workflow for the Spring Boot project {project_metadata['app_name']}
+    (Spring Boot {project_metadata['spring_boot_version']}, Java {project_metadata['java_version']}):
+
+    ```yaml
+    {workflow}
+    ```
+
+    Requirements:
+    {instructions or "Review the workflow and improve caching, test reporting and the deployment step where useful."}
+    """
+
+    try:
+        response = routed_completion(
+            "ci",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": github_actions_prompt}
+            ],
+            model=model,
+            temperature=temperature,
+            description="GitHub Actions workflow"
+        )
+        return first_block(response, ["yaml", "yml"]) or workflow
+    except Exception as e:
+        add_log("ERROR", f"Error customising GitHub Actions workflow, using the template: {str(e)}")
+        return workflow
@@ -0,0 +1,55 @@
+import os
+
+# Syntax highlighting for the UI. Pygments is imported on first use, and each
+# lexer, the formatter and its CSS are built once per Highlighter; the
+# Streamlit script keeps one Highlighter for the whole process.
+
+# Pygments lexer names by detected file type; other types use the Java lexer
+LEXER_NAMES = {
+    "java": "java",
+    "xml": "xml",
+    "properties": "properties",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "json": "json",
+    "dockerfile": "docker",
+    "sql": "sql",
+    "groovy": "groovy",
+    "kotlin": "kotlin",
+    "bash": "bash",
+    "markdown": "markdown",
+}
+DEFAULT_LEXER = "java"
+STYLE = "friendly"
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+
+class Highlighter:
+    def __init__(self, style=STYLE):
+        from pygments.formatters import HtmlFormatter
+
+        self._formatter = HtmlFormatter(style=style)
+        self.css = self._formatter.get_style_defs('.highlight')
+        self._lexers = {}
+
+    def lexer(self, file_type):
+        name = LEXER_NAMES.get(file_type, DEFAULT_LEXER)
+        lexer = self._lexers.get(name)
+        if lexer is None:
+            from pygments.lexers import get_lexer_by_name
+
+            lexer = self._lexers[name] = get_lexer_by_name(name)
+        return lexer
+
+    # Function to highlight code as HTML; returns (html, css)
+    def highlight(self, code, file_type):
+        from pygments import highlight
+
+        return highlight(code, self.lexer(file_type), self._formatter), self.css
+
+
+# Function to read a file shipped in springboot_assistant/static
+def read_static(name):
+    with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,36 @@
+import re
+
+from .fences import split_fences
+
+# Function to split the chat history into what a rerun has to draw: the number
+# of messages still hidden behind "load more", the older messages shown in
+# collapsed form, and the most recent messages shown in full
+def history_window(messages, recent_count, pages_loaded, page_size):
+    recent_start = max(0, len(messages) - recent_count)
+    collapsed_start = max(0, recent_start - pages_loaded * page_size)
+    collapsed = [(index, messages[index]) for index in range(collapsed_start, recent_start)]
+    recent = [(index, messages[index]) for index in range(recent_start, len(messages))]
+    return collapsed_start, collapsed, recent
+
+
+# Function to build a one-line summary of a chat message for collapsed history
+def summarize_message(content, max_chars=160):
+    outside, blocks = split_fences(content)
+    prose = [line.strip().lstrip("#*-> ").strip() for line in outside.splitlines() if line.strip()]
+    code_blocks = len(blocks)
+
+    text = re.sub(r"\s+", " ", " ".join(prose)).strip()
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0] + "…"
+
+    classes = re.findall(r"\b(?:class|interface|record|enum)\s+([A-Z]\w*)", content)
+    details = []
+    if code_blocks:
+        details.append(f"{code_blocks} code block{'s' if code_blocks != 1 else ''}")
+    if classes:
+        unique = list(dict.fromkeys(classes))
+        details.append(", ".join(unique[:4]) + (" …" if len(unique) > 4 else ""))
+
+    if details:
+        return f"{text} [{'; '.join(details)}]" if text else f"[{'; '.join(details)}]"
+    return text or "(empty message)"
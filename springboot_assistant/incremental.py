@@ -0,0 +1,97 @@
+from .core import add_test_file
+from .generators import TEST_PROMPT_HASH, is_incomplete
+from .java_index import parse_java_cached, primary_type
+from .store import file_hash
+
+# Incremental test generation. Each generated test records what it was
+# generated from: the source file, the hash of its content, the model and the
+# hash of the test prompt templates. A batch run then only generates tests
+# for classes that are new or changed since their test was written, and
+# reports tests whose class is gone from the project (orphaned tests).
+#
+# Records live in project["test_sources"] as test filename ->
+# {"source", "source_hash", "model", "prompt_hash"}.
+
+
+# Function to get a project's test records, adding the mapping to projects
+# (or sessions) from before records were kept
+def test_sources(project):
+    if "test_sources" not in project:
+        project["test_sources"] = {}
+    return project["test_sources"]
+
+
+# Function to store a generated test and record what it was generated from.
+# Tests kept from an interrupted generation are stored but not recorded, so
+# the next batch generates them again.
+def add_generated_test(project, test_filename, test_code, source_filename, model):
+    add_test_file(project, test_filename, test_code)
+    records = test_sources(project)
+    if is_incomplete(test_code):
+        records.pop(test_filename, None)
+        return
+    records[test_filename] = {
+        "source": source_filename,
+        "source_hash": file_hash(project["generated_files"], source_filename),
+        "model": model,
+        "prompt_hash": TEST_PROMPT_HASH,
+    }
+
+
+# Function to check whether a main file has a class to test (not a test itself)
+def is_test_target(project, filename):
+    if not filename.endswith(".java") or filename not in project["generated_files"]:
+        return False
+    declaration = primary_type(parse_java_cached(project["generated_files"][filename]))
+    return declaration is not None and bool(declaration["name"]) and declaration["role"] != "test"
+
+
+# Function to sort a batch into work and skips. Returns {"generate": [(filename,
+# reason)], "unchanged": [filename], "orphaned": [(test filename, reason)]}:
+# a class is generated when it has no recorded test, or when its content, the
+# model or the prompt templates differ from the record; a recorded test is
+# orphaned when its source file or class is gone.
+def plan_tests(project, targets, model):
+    records = test_sources(project)
+    tests = project["test_files"]
+    by_source = {}
+    for test_filename, record in records.items():
+        if test_filename in tests:
+            by_source.setdefault(record["source"], []).append(test_filename)
+
+    plan = {"generate": [], "unchanged": [], "orphaned": []}
+    for filename in targets:
+        if not is_test_target(project, filename):
+            continue
+        current = file_hash(project["generated_files"], filename)
+        recorded = [records[test_filename] for test_filename in by_source.get(filename, [])]
+        if not recorded:
+            plan["generate"].append((filename, "new"))
+        elif any(record["source_hash"] == current and record["model"] == model and
+                 record["prompt_hash"] == TEST_PROMPT_HASH for record in recorded):
+            plan["unchanged"].append(filename)
+        elif all(record["source_hash"] == current for record in recorded):
+            plan["generate"].append((filename, "model or prompt changed"))
+        else:
+            plan["generate"].append((filename, "source changed"))
+
+    for test_filename in sorted(test_filename for filenames in by_source.values() for test_filename in filenames):
+        source = records[test_filename]["source"]
+        if source not in project["generated_files"]:
+            plan["orphaned"].append((test_filename, f"{source} was removed"))
+        elif not is_test_target(project, source):
+            plan["orphaned"].append((test_filename, f"{source} no longer has a class to test"))
+        elif (primary_type(parse_java_cached(project["generated_files"][source]))["name"] + "Test.java"
+              != test_filename):
+            plan["orphaned"].append((test_filename, f"the class in {source} was renamed"))
+    return plan
+
+
+# Function to delete orphaned tests and their records
+def remove_tests(project, test_filenames):
+    records = test_sources(project)
+    for test_filename in test_filenames:
+        project["test_files"].pop(test_filename, None)
+        records.pop(test_filename, None)
+        if test_filename in project["file_categories"]["test"]:
+            project["file_categories"]["test"].remove(test_filename)
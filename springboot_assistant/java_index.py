@@ -0,0 +1,694 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Declaration-level Java parser and per-project symbol index. Parses package,
+# imports, types (class/interface/enum/record/@interface), fields, methods,
+# constructors and annotations; method bodies are skipped, which keeps it fast
+# and tolerant of the incomplete code models sometimes produce. Results are
+# cached by content hash, so each file version is parsed once.
+
+MODIFIERS = {
+    "public", "protected", "private", "static", "abstract", "final", "native", "synchronized",
+    "transient", "volatile", "strictfp", "default", "sealed", "non-sealed",
+}
+TYPE_KEYWORDS = {"class", "interface", "enum", "record"}
+HTTP_MAPPINGS = {
+    "GetMapping": "GET",
+    "PostMapping": "POST",
+    "PutMapping": "PUT",
+    "DeleteMapping": "DELETE",
+    "PatchMapping": "PATCH",
+}
+ROLE_ANNOTATIONS = [
+    ("RestController", "controller"),
+    ("Controller", "controller"),
+    ("ControllerAdvice", "controller-advice"),
+    ("RestControllerAdvice", "controller-advice"),
+    ("Service", "service"),
+    ("Repository", "repository"),
+    ("Entity", "entity"),
+    ("Document", "entity"),
+    ("Embeddable", "entity"),
+    ("Configuration", "configuration"),
+    ("SpringBootApplication", "application"),
+    ("Component", "component"),
+]
+TEST_ANNOTATIONS = {"Test", "ParameterizedTest", "SpringBootTest", "WebMvcTest", "DataJpaTest", "ExtendWith"}
+INJECT_ANNOTATIONS = {"Autowired", "Inject", "Resource", "MockBean", "Mock", "InjectMocks"}
+PRIMITIVES = {"byte", "short", "int", "long", "float", "double", "boolean", "char", "void", "var"}
+# Parsed files kept in memory, keyed by content hash
+PARSE_CACHE_SIZE = 2048
+
+
+# Function to split Java source into (kind, text) tokens, dropping comments
+def tokenize_java(source):
+    tokens = []
+    i = 0
+    length = len(source)
+    while i < length:
+        char = source[i]
+        if char.isspace():
+            i += 1
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = length if end == -1 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+        elif source.startswith('"""', i):
+            end = source.find('"""', i + 3)
+            end = length if end == -1 else end + 3
+            tokens.append(("string", source[i + 3:end - 3]))
+            i = end
+        elif char == '"' or char == "'":
+            j = i + 1
+            while j < length and source[j] != char and source[j] != "\n":
+                j += 2 if source[j] == "\\" else 1
+            tokens.append(("string" if char == '"' else "char", source[i + 1:j]))
+            i = j + 1
+        elif char.isalpha() or char in "_$":
+            j = i + 1
+            while j < length and (source[j].isalnum() or source[j] in "_$"):
+                j += 1
+            tokens.append(("name", source[i:j]))
+            i = j
+        elif char.isdigit():
+            j = i + 1
+            while j < length and (source[j].isalnum() or source[j] in "._"):
+                j += 1
+            tokens.append(("number", source[i:j]))
+            i = j
+        elif source.startswith("...", i):
+            tokens.append(("op", "..."))
+            i += 3
+        else:
+            tokens.append(("op", char))
+            i += 1
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index][1] if index < len(self.tokens) else None
+
+    def kind(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index][0] if index < len(self.tokens) else None
+
+    # Operator or separator at the offset, or None: string and char literals
+    # holding a brace or separator are not delimiters
+    def op(self, offset=0):
+        return self.peek(offset) if self.kind(offset) == "op" else None
+
+    def advance(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, text):
+        if self.peek() == text and self.kind() not in ("string", "char"):
+            self.position += 1
+            return True
+        return False
+
+    def at_end(self):
+        return self.position >= len(self.tokens)
+
+    # Skip a balanced (), {} or [] group starting at the current token
+    def skip_group(self):
+        opening = self.advance()
+        closing = {"(": ")", "{": "}", "[": "]"}[opening]
+        depth = 1
+        while not self.at_end() and depth:
+            token = self.advance()
+            if self.kind(-1) == "op":
+                if token == opening:
+                    depth += 1
+                elif token == closing:
+                    depth -= 1
+
+    # Skip to the next ';' (or an unbalanced '}') at nesting depth zero
+    def skip_statement(self):
+        while not self.at_end():
+            token = self.peek()
+            if self.kind() == "op" and token in "({[":
+                self.skip_group()
+            elif self.kind() == "op" and token == ";":
+                self.advance()
+                return
+            elif self.kind() == "op" and token == "}":
+                return
+            else:
+                self.advance()
+
+    def qualified_name(self):
+        if self.kind() != "name":
+            return ""
+        parts = [self.advance()]
+        while self.op() == "." and self.kind(1) == "name":
+            self.advance()
+            parts.append(self.advance())
+        return ".".join(parts)
+
+    # Skip a generic <...> section, returning its text
+    def type_arguments(self):
+        text = ""
+        depth = 0
+        while not self.at_end():
+            token = self.advance()
+            text += token if token not in ("extends", "super") else f" {token} "
+            if token == "<":
+                depth += 1
+            elif token == ">":
+                depth -= 1
+                if depth == 0:
+                    break
+            elif token == ",":
+                text += " "
+        return text
+
+    def parse_type(self):
+        while self.op() == "@":
+            self.annotation()
+        if self.kind() != "name":
+            return None
+        name = self.qualified_name()
+        if self.op() == "<":
+            name += self.type_arguments()
+            while self.op() == "." and self.kind(1) == "name":
+                self.advance()
+                name += "." + self.qualified_name()
+                if self.op() == "<":
+                    name += self.type_arguments()
+        while self.op() == "[" and self.op(1) == "]":
+            self.position += 2
+            name += "[]"
+        if self.accept("..."):
+            name += "..."
+        return name
+
+    def annotation_value(self):
+        if self.op() == "{":
+            values = []
+            self.advance()
+            while not self.at_end() and self.op() != "}":
+                if self.accept(","):
+                    continue
+                start = self.position
+                values.append(self.annotation_value())
+                if self.position == start:
+                    break
+            self.accept("}")
+            return values
+        if self.op() == "@":
+            return self.annotation()
+
+        parts = []
+        depth = 0
+        while not self.at_end():
+            token = self.peek()
+            if self.kind() == "op" and depth == 0 and token in ",)}":
+                break
+            if self.kind() == "op" and token in "([{":
+                depth += 1
+            elif self.kind() == "op" and token in ")]}":
+                depth -= 1
+            parts.append((self.kind(), self.advance()))
+        if len(parts) == 1 and parts[0][0] == "string":
+            return parts[0][1]
+        if parts and all(kind == "string" or text == "+" for kind, text in parts):
+            return "".join(text for kind, text in parts if kind == "string")
+        return "".join(text for _, text in parts)
+
+    def annotation(self):
+        self.advance()  # '@'
+        name = self.qualified_name().split(".")[-1]
+        arguments = {}
+        if self.op() == "(":
+            self.advance()
+            while not self.at_end() and self.op() != ")":
+                if self.accept(","):
+                    continue
+                if self.kind() == "name" and self.op(1) == "=":
+                    key = self.advance()
+                    self.advance()
+                    arguments[key] = self.annotation_value()
+                else:
+                    start = self.position
+                    arguments["value"] = self.annotation_value()
+                    if self.position == start:
+                        break
+            self.accept(")")
+        return {"name": name, "args": arguments}
+
+    def modifiers(self):
+        annotations = []
+        modifiers = []
+        while not self.at_end():
+            if self.op() == "@" and self.peek(1) != "interface":
+                annotations.append(self.annotation())
+            elif self.peek() in MODIFIERS and self.peek(1) not in ("(", "=", ";"):
+                modifiers.append(self.advance())
+            elif self.peek() == "non" and self.op(1) == "-" and self.peek(2) == "sealed":
+                self.position += 3
+                modifiers.append("non-sealed")
+            else:
+                break
+        return annotations, modifiers
+
+    def parameters(self):
+        parameters = []
+        self.advance()  # '('
+        while not self.at_end() and self.op() != ")":
+            if self.accept(","):
+                continue
+            annotations, _ = self.modifiers()
+            param_type = self.parse_type()
+            if param_type is None or self.kind() != "name":
+                self.skip_statement_in_parameters()
+                continue
+            name = self.advance()
+            while self.op() == "[" and self.op(1) == "]":
+                self.position += 2
+                param_type += "[]"
+            parameters.append({"name": name, "type": param_type, "annotations": annotations})
+        self.accept(")")
+        return parameters
+
+    def skip_statement_in_parameters(self):
+        while not self.at_end() and self.op() not in (",", ")"):
+            if self.op() in ("(", "{", "["):
+                self.skip_group()
+            else:
+                self.advance()
+
+    def type_declaration(self, annotations, modifiers, package, outer=None):
+        keyword = self.advance()
+        if keyword == "@":
+            self.advance()  # 'interface'
+            keyword = "annotation"
+        name = self.advance() if self.kind() == "name" else None
+        declaration = {
+            "name": name,
+            "qualified_name": ".".join(part for part in (package, outer, name) if part),
+            "kind": keyword,
+            "modifiers": modifiers,
+            "annotations": annotations,
+            "extends": [],
+            "implements": [],
+            "fields": [],
+            "methods": [],
+            "constructors": [],
+            "nested": [],
+            "constants": [],
+        }
+        if self.op() == "<":
+            self.type_arguments()
+        if keyword == "record" and self.op() == "(":
+            for component in self.parameters():
+                declaration["fields"].append(dict(component, record_component=True))
+        while not self.at_end() and self.op() != "{":
+            token = self.advance()
+            if token in ("extends", "implements", "permits"):
+                target = declaration["extends"] if token == "extends" else declaration["implements"]
+                if token == "permits":
+                    target = []
+                while not self.at_end() and self.peek() not in ("{", "implements", "permits"):
+                    if self.accept(","):
+                        continue
+                    parsed = self.parse_type()
+                    if parsed is None:
+                        self.advance()
+                    else:
+                        target.append(parsed)
+        if self.op() == "{":
+            self.type_body(declaration, package)
+        return declaration
+
+    def type_body(self, declaration, package):
+        self.advance()  # '{'
+        if declaration["kind"] == "enum":
+            # Enum constants run until the first ';' (or the closing brace)
+            while not self.at_end() and self.op() not in (";", "}"):
+                if self.op() in ("(", "{"):
+                    self.skip_group()
+                elif self.op() == "@":
+                    self.annotation()
+                elif self.kind() == "name":
+                    declaration["constants"].append(self.advance())
+                else:
+                    self.advance()
+            self.accept(";")
+
+        while not self.at_end():
+            if self.accept("}"):
+                return
+            if self.accept(";"):
+                continue
+            if self.op() == "{":
+                self.skip_group()  # initializer block
+                continue
+            if self.peek() == "static" and self.op(1) == "{":
+                self.advance()
+                self.skip_group()
+                continue
+
+            annotations, modifiers = self.modifiers()
+            if self.peek() in TYPE_KEYWORDS and self.kind(1) == "name" or (self.op() == "@" and self.peek(1) == "interface"):
+                declaration["nested"].append(
+                    self.type_declaration(annotations, modifiers, package, outer=declaration["name"]))
+                continue
+            if self.op() == "<":
+                self.type_arguments()
+
+            start = self.position
+            member_type = self.parse_type()
+            if member_type is None:
+                self.position = max(self.position, start + 1)
+                continue
+            if self.op() == "(" and member_type.split("<")[0] == declaration["name"]:
+                parameters = self.parameters()
+                self.skip_to_body()
+                declaration["constructors"].append({
+                    "parameters": parameters, "annotations": annotations, "modifiers": modifiers})
+                continue
+            if self.kind() != "name":
+                self.skip_statement()
+                continue
+
+            name = self.advance()
+            if self.op() == "(":
+                parameters = self.parameters()
+                while self.op() == "[" and self.op(1) == "]":
+                    self.position += 2
+                    member_type += "[]"
+                self.skip_to_body()
+                declaration["methods"].append({
+                    "name": name,
+                    "return_type": member_type,
+                    "parameters": parameters,
+                    "annotations": annotations,
+                    "modifiers": modifiers,
+                })
+                continue
+
+            # Field declaration, possibly declaring several names
+            while True:
+                while self.op() == "[" and self.op(1) == "]":
+                    self.position += 2
+                declaration["fields"].append({
+                    "name": name, "type": member_type, "annotations": annotations, "modifiers": modifiers,
+                    "initialized": self.op() == "="})
+                while not self.at_end() and self.op() not in (",", ";", "}"):
+                    if self.op() in ("(", "{", "["):
+                        self.skip_group()
+                    else:
+                        self.advance()
+                if self.accept(",") and self.kind() == "name":
+                    name = self.advance()
+                    continue
+                self.accept(";")
+                break
+
+    # Skip 'throws ...', 'default value' and the method body (or ';')
+    def skip_to_body(self):
+        while not self.at_end():
+            if self.op() == "{":
+                self.skip_group()
+                return
+            if self.accept(";"):
+                return
+            if self.op() == "}":
+                return
+            if self.op() in ("(", "["):
+                self.skip_group()
+            else:
+                self.advance()
+
+
+# Function to parse a Java source file into its declarations
+def parse_java(content):
+    parser = _Parser(tokenize_java(content))
+    result = {"package": None, "imports": [], "types": []}
+
+    while not parser.at_end():
+        if parser.peek() == "package" and parser.kind(1) == "name":
+            parser.advance()
+            result["package"] = parser.qualified_name()
+            parser.accept(";")
+            continue
+        if parser.peek() == "import":
+            parser.advance()
+            parser.accept("static")
+            name = parser.qualified_name()
+            if parser.accept("."):
+                parser.accept("*")
+                name += ".*"
+            result["imports"].append(name)
+            parser.accept(";")
+            continue
+
+        annotations, modifiers = parser.modifiers()
+        if (parser.peek() in TYPE_KEYWORDS and parser.kind(1) == "name") or (parser.op() == "@" and parser.peek(1) == "interface"):
+            result["types"].append(parser.type_declaration(annotations, modifiers, result["package"]))
+        elif not parser.at_end():
+            parser.advance()
+
+    for declaration in result["types"]:
+        _annotate(declaration)
+    return result
+
+
+def _annotation(declaration, name):
+    for annotation in declaration["annotations"]:
+        if annotation["name"] == name:
+            return annotation
+    return None
+
+
+def _first_path(annotation):
+    if annotation is None:
+        return ""
+    value = annotation["args"].get("value", annotation["args"].get("path", ""))
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    return value if isinstance(value, str) else ""
+
+
+def _join_paths(base, path):
+    joined = "/" + "/".join(part.strip("/") for part in (base, path) if part and part.strip("/"))
+    return joined
+
+
+def _simple_type(type_name):
+    return type_name.split("<")[0].split(".")[-1].rstrip("[]").rstrip(".")
+
+
+# Function to derive Spring-specific facts (role, endpoints, injected
+# dependencies) from a parsed type declaration
+def _annotate(declaration):
+    names = {annotation["name"] for annotation in declaration["annotations"]}
+    declaration["role"] = None
+    for annotation, role in ROLE_ANNOTATIONS:
+        if annotation in names:
+            declaration["role"] = role
+            break
+    if declaration["role"] is None and declaration["kind"] == "interface" and any(
+            _simple_type(parent) in ("JpaRepository", "CrudRepository", "PagingAndSortingRepository",
+                                     "MongoRepository", "ReactiveCrudRepository", "JpaSpecificationExecutor")
+            for parent in declaration["extends"]):
+        declaration["role"] = "repository"
+    is_test = bool(names & TEST_ANNOTATIONS) or any(
+        annotation["name"] in TEST_ANNOTATIONS for method in declaration["methods"] for annotation in method["annotations"])
+    if is_test:
+        declaration["role"] = "test"
+
+    base_path = _first_path(_annotation(declaration, "RequestMapping"))
+    declaration["request_mapping"] = base_path
+    endpoints = []
+    if declaration["role"] == "controller":
+        for method in declaration["methods"]:
+            for annotation in method["annotations"]:
+                http_method = HTTP_MAPPINGS.get(annotation["name"])
+                if annotation["name"] == "RequestMapping":
+                    requested = annotation["args"].get("method", "GET")
+                    requested = requested[0] if isinstance(requested, list) and requested else requested
+                    http_method = str(requested).split(".")[-1] or "GET"
+                if http_method:
+                    endpoints.append({
+                        "method": http_method,
+                        "path": _join_paths(base_path, _first_path(annotation)),
+                        "handler": method["name"],
+                        "return_type": method["return_type"],
+                        "parameters": method["parameters"],
+                        "annotations": method["annotations"],
+                        "consumes": annotation["args"].get("consumes"),
+                        "produces": annotation["args"].get("produces"),
+                    })
+    declaration["endpoints"] = endpoints
+
+    # Injected dependencies: annotated fields, plus constructor parameters
+    # (constructor injection, including Lombok's @RequiredArgsConstructor on final fields)
+    dependencies = []
+    for field in declaration["fields"]:
+        if field.get("record_component"):
+            continue
+        if {annotation["name"] for annotation in field["annotations"]} & INJECT_ANNOTATIONS:
+            dependencies.append(_simple_type(field["type"]))
+        elif ("RequiredArgsConstructor" in names or "AllArgsConstructor" in names) and "final" in field["modifiers"] \
+                and "static" not in field["modifiers"] and not field.get("initialized"):
+            dependencies.append(_simple_type(field["type"]))
+    managed = declaration["kind"] == "class" and declaration["role"] not in (None, "entity", "test")
+    for constructor in declaration["constructors"]:
+        if managed or any(annotation["name"] in INJECT_ANNOTATIONS for annotation in constructor["annotations"]):
+            dependencies.extend(_simple_type(parameter["type"]) for parameter in constructor["parameters"])
+    declaration["dependencies"] = list(dict.fromkeys(
+        dependency for dependency in dependencies if dependency not in PRIMITIVES))
+
+    for nested in declaration["nested"]:
+        _annotate(nested)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+# Function to parse a file, reusing the result for content already seen
+def parse_java_cached(content, content_hash=None):
+    key = content_hash or _hash(content)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    parsed = parse_java(content)
+    _store(key, parsed)
+    return parsed
+
+
+def _store(key, parsed):
+    with _cache_lock:
+        _cache[key] = parsed
+        while len(_cache) > PARSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+# Function to return the main type of a file: the public top-level type, else the first one
+def primary_type(parsed):
+    for declaration in parsed["types"]:
+        if "public" in declaration["modifiers"]:
+            return declaration
+    return parsed["types"][0] if parsed["types"] else None
+
+
+def _all_types(declarations):
+    for declaration in declarations:
+        yield declaration
+        yield from _all_types(declaration["nested"])
+
+
+# Symbol index over a project's Java files. update() parses only files whose
+# content hash changed, in-process (a typical class parses in under a millisecond); the query
+# methods below are what generators and views use instead of regexes.
+class JavaSymbolIndex:
+    def __init__(self, files=None):
+        self._files = {}  # filename -> (hash, parsed)
+        self._lock = threading.Lock()
+        if files is not None:
+            self.update(files)
+
+    def update(self, files):
+        pending = {}
+        seen = set()
+        for filename in list(files):
+            if not filename.endswith(".java"):
+                continue
+            seen.add(filename)
+            file_hash = files.hash_of(filename) if hasattr(files, "hash_of") else _hash(files[filename])
+            current = self._files.get(filename)
+            if current is not None and current[0] == file_hash:
+                continue
+            with _cache_lock:
+                cached = _cache.get(file_hash)
+            if cached is not None:
+                self._files[filename] = (file_hash, cached)
+            else:
+                pending[filename] = (file_hash, files[filename])
+
+        for filename, (file_hash, content) in pending.items():
+            self._files[filename] = (file_hash, parse_java_cached(content, file_hash))
+
+        with self._lock:
+            for filename in [name for name in self._files if name not in seen]:
+                del self._files[filename]
+        return self
+
+    def hash_of(self, filename):
+        entry = self._files.get(filename)
+        return entry[0] if entry else None
+
+    def parsed(self, filename):
+        entry = self._files.get(filename)
+        return entry[1] if entry else None
+
+    def primary_type(self, filename):
+        parsed = self.parsed(filename)
+        return primary_type(parsed) if parsed else None
+
+    # Function to list (filename, type) for every type, nested ones included
+    def types(self):
+        for filename, (_, parsed) in list(self._files.items()):
+            for declaration in _all_types(parsed["types"]):
+                yield filename, declaration
+
+    def find_type(self, name):
+        for filename, declaration in self.types():
+            if declaration["name"] == name or declaration["qualified_name"] == name:
+                return filename, declaration
+        return None, None
+
+    def files_with_role(self, role):
+        return [filename for filename in self._files
+                if (self.primary_type(filename) or {}).get("role") == role]
+
+    def controllers(self):
+        return [(filename, declaration) for filename, declaration in self.types() if declaration["role"] == "controller"]
+
+    def endpoints(self):
+        return [dict(endpoint, controller=declaration["name"], file=filename)
+                for filename, declaration in self.controllers() for endpoint in declaration["endpoints"]]
+
+    # Function to map each project type to the project types it uses
+    # (injected dependencies, field types, supertypes and method signatures)
+    def dependency_graph(self):
+        known = {declaration["name"] for _, declaration in self.types()}
+        graph = {}
+        for _, declaration in self.types():
+            referenced = set(declaration["dependencies"])
+            referenced.update(_simple_type(parent) for parent in declaration["extends"] + declaration["implements"])
+            for field in declaration["fields"]:
+                referenced.update(_type_names(field["type"]))
+            for method in declaration["methods"]:
+                referenced.update(_type_names(method["return_type"]))
+                for parameter in method["parameters"]:
+                    referenced.update(_type_names(parameter["type"]))
+            graph[declaration["name"]] = sorted(name for name in referenced & known if name != declaration["name"])
+        return graph
+
+
+# Function to list every simple type name mentioned in a (generic) type
+def _type_names(type_name):
+    names = []
+    for part in type_name.replace("<", " ").replace(">", " ").replace(",", " ").replace("[]", " ").split():
+        if part not in ("extends", "super", "?"):
+            names.append(part.split(".")[-1].rstrip("."))
+    return names
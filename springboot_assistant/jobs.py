@@ -0,0 +1,91 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .cancel import CancelToken, cancel_token
+from .logs import add_log
+from .scheduler import queue_observer
+
+
+# Runs long generations (builds, tests, docs) in worker threads and keeps
+# their status so clients can poll instead of holding a request open. A
+# cancelled job keeps whatever it finished before the cancel as its result.
+class JobManager:
+    def __init__(self, max_workers=4, keep=500):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._tokens = {}  # job id -> CancelToken, while queued or running
+        self._lock = threading.Lock()
+        self._keep = keep
+
+    def submit(self, kind, func, *args, **kwargs):
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "result": None,
+            "error": None,
+            "queue_position": None,
+        }
+        token = CancelToken()
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._tokens[job["id"]] = token
+            self._prune()
+
+        def run():
+            if token.cancelled:
+                job["status"], job["finished"] = "cancelled", time.time()
+                return
+            job["status"] = "running"
+            job["started"] = time.time()
+            queue_observer.set(lambda position: job.update(queue_position=position or None))
+            cancel_token.set(token)
+            try:
+                job["result"] = func(*args, **kwargs)
+                job["status"] = "cancelled" if token.cancelled else "done"
+            except Exception as e:
+                if token.cancelled:
+                    add_log("INFO", f"Job {job['id']} ({kind}) cancelled")
+                    job["status"] = "cancelled"
+                else:
+                    add_log("ERROR", f"Job {job['id']} ({kind}) failed: {str(e)}")
+                    job["error"] = str(e)
+                    job["status"] = "failed"
+            job["finished"] = time.time()
+            with self._lock:
+                self._tokens.pop(job["id"], None)
+
+        self._executor.submit(run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    # Function to cancel a queued or running job; False if it already finished
+    def cancel(self, job_id):
+        with self._lock:
+            token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    # Drop the oldest finished jobs once more than `keep` are tracked
+    def _prune(self):
+        if len(self._jobs) <= self._keep:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job["finished"]),
+            key=lambda job: job["finished"]
+        )
+        for job in finished[:len(self._jobs) - self._keep]:
+            del self._jobs[job["id"]]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,413 @@
+import json
+import math
+import socket
+import time
+from contextvars import ContextVar
+from functools import lru_cache, partial
+
+import requests
+
+from .endpoints import get_pool
+from .logs import add_log
+from .timeouts import policy, prompt_tokens, request_timeout
+
+DEFAULT_MODEL = "mistral:latest"
+DEFAULT_TEMPERATURE = 0.7
+
+# Called with the text received so far while a streamed completion runs (UI progress)
+stream_observer = ContextVar("stream_observer", default=None)
+
+
+# Function to get the ollama library's client for an endpoint, created once per
+# host and timeout (whole seconds). The library, and httpx under it, is only
+# imported when the first client is needed.
+@lru_cache(maxsize=32)
+def ollama_client(host, timeout):
+    import ollama
+
+    return ollama.Client(host=host, timeout=timeout)
+
+
+# Raised when a streamed completion stops early; `content` holds what arrived
+class PartialResponse(Exception):
+    def __init__(self, content, reason):
+        super().__init__(f"Response interrupted after {len(content)} characters: {reason}")
+        self.content = content
+        self.reason = reason
+
+
+# Function to test Ollama connection directly
+def test_ollama_connection():
+    try:
+        add_log("INFO", "Testing Ollama connection...")
+        model_names = get_pool().models()
+        endpoints = get_pool().describe()
+        healthy = [endpoint["url"] for endpoint in endpoints if endpoint["healthy"]]
+        if healthy:
+            add_log("INFO", f"Ollama connection successful ({len(healthy)}/{len(endpoints)} endpoints). "
+                            f"Available models: {', '.join(model_names)}")
+            return True, model_names
+        else:
+            add_log("ERROR", f"No Ollama endpoint reachable: {', '.join(endpoint['url'] for endpoint in endpoints)}")
+            return False, []
+    except requests.exceptions.Timeout:
+        add_log("ERROR", f"Ollama connection test timed out after {request_timeout('health')} seconds")
+        return False, []
+    except Exception as e:
+        add_log("ERROR", f"Ollama connection test failed: {str(e)}")
+        return False, []
+
+
+# Function to list the models installed on the Ollama servers (empty if unreachable)
+def list_models():
+    return get_pool().models()
+
+
+# Function to check if a specific model is loaded
+def check_model_loaded(model_name):
+    try:
+        add_log("INFO", f"Checking if model '{model_name}' is loaded...")
+        response = get_pool().request("GET", f"/api/show?name={model_name}", model=model_name,
+                                timeout=request_timeout("model-info"))
+        if response.status_code == 200:
+            add_log("INFO", f"Model '{model_name}' is loaded")
+            return True
+        add_log("WARNING", f"Model '{model_name}' may not be loaded. Status code: {response.status_code}")
+        return False
+    except Exception as e:
+        add_log("ERROR", f"Error checking model status: {str(e)}")
+        return False
+
+
+# Function to send a simple test message to check model is working
+def test_model(model_name):
+    try:
+        add_log("INFO", f"Testing model '{model_name}' with a simple message...")
+        payload = {
+            "model": model_name,
+            "messages": [{"role": "user", "content": "Hello, are you working?"}],
+            "stream": False,
+            "options": {"temperature": 0.1}
+        }
+        response = get_pool().request("POST", "/api/chat", model=model_name, hedge=True, json=payload,
+                                timeout=request_timeout("model-test"))
+
+        if response.status_code == 200:
+            try:
+                content = response.json().get("message", {}).get("content", "")
+                if content:
+                    add_log("INFO", f"Model test successful. Response: {content[:50]}...")
+                    return True, content[:100] + "..." if len(content) > 100 else content
+                else:
+                    add_log("WARNING", "Model returned empty content")
+                    return False, "Empty response"
+            except Exception as e:
+                add_log("ERROR", f"Error parsing model response: {str(e)}")
+                return False, f"Error parsing response: {str(e)}"
+        else:
+            add_log("ERROR", f"Model test failed with status code {response.status_code}")
+            return False, f"Failed with status code {response.status_code}"
+    except requests.exceptions.Timeout:
+        add_log("ERROR", f"Model test timed out after {request_timeout('model-test')} seconds")
+        return False, f"Request timed out after {request_timeout('model-test')} seconds"
+    except Exception as e:
+        add_log("ERROR", f"Model test failed: {str(e)}")
+        return False, str(e)
+
+
+# Function to run a non-streaming chat request: direct API first, then the ollama library
+# (hedge=True allows a duplicate request to a second endpoint, for short interactive calls)
+def chat_completion(messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, timeout=None, task="response",
+                    options=None, hedge=False):
+    timeout = timeout or policy.for_generation(model, prompt_tokens(messages))["total"]
+    try:
+        add_log("INFO", f"Generating {task} using direct API call")
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "options": {"temperature": temperature, **(options or {})}
+        }
+
+        response = get_pool().request(
+            "POST",
+            "/api/chat",
+            model=model,
+            hedge=hedge,
+            json=payload,
+            timeout=timeout
+        )
+
+        if response.status_code == 200:
+            content = response.json().get("message", {}).get("content", "")
+            if content:
+                return content
+            else:
+                add_log("WARNING", f"Empty response when generating {task}")
+    except Exception as direct_e:
+        add_log("WARNING", f"Direct API {task} generation failed: {str(direct_e)}")
+
+    # Fall back to ollama library
+    add_log("INFO", f"Falling back to ollama library for {task} generation")
+    with get_pool().acquire(model) as endpoint:
+        response = ollama_client(endpoint.url, math.ceil(timeout)).chat(
+            model=model,
+            messages=messages,
+            options={"temperature": temperature, **(options or {})}
+        )
+    return response['message']['content']
+
+
+# Function to fill in the generation timeouts the caller did not set from the
+# timeout policy: (idle seconds, first token seconds, total seconds)
+def _limits(model, messages, timeout=None, first_token_timeout=None):
+    limits = policy.for_generation(model, prompt_tokens(messages))
+    return timeout or limits["idle"], first_token_timeout or limits["first_token"], limits["total"]
+
+
+# Function to run a chat request as a stream and return the whole answer. The
+# timeout is the longest wait for the next token (first_token_timeout for the
+# first one), so a slow model has as long as it needs while tokens keep
+# arriving; both default to the timeout policy's figures for the model and
+# prompt. If the stream breaks or is cancelled after some output,
+# PartialResponse carries that output instead of it being lost.
+def stream_completion(messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, timeout=None, task="response",
+                      options=None, cancel=None, first_token_timeout=None):
+    timeout, first_token_timeout, _ = _limits(model, messages, timeout, first_token_timeout)
+    add_log("INFO", f"Generating {task} by streaming (first token within {first_token_timeout}s, "
+                    f"then at most {timeout}s between tokens)")
+    observer = stream_observer.get()
+    started = time.perf_counter()
+    content = ""
+    try:
+        for chunk in stream_chat(messages, model=model, temperature=temperature, options=options, cancel=cancel,
+                                 timeout=timeout, first_token_timeout=first_token_timeout):
+            content += chunk
+            if observer is not None:
+                observer(content)
+    except Exception as e:
+        if content:
+            add_log("WARNING", f"Stream for {task} broke off after {len(content)} characters: {str(e)}")
+            reason = f"no token for {timeout}s" if "timed out" in str(e).lower() else type(e).__name__
+            raise PartialResponse(content, reason) from e
+        raise
+    if cancel is not None and cancel.cancelled and content:
+        raise PartialResponse(content, "cancelled")
+    if not content:
+        raise RuntimeError(f"Empty response when generating {task}")
+    add_log("INFO", f"Generated {task}: {len(content)} characters in {time.perf_counter() - started:.1f}s")
+    return content
+
+
+# Function to stream a chat response as text chunks. Tries the ollama library,
+# then direct API streaming, then a single non-streaming call; a cancellable
+# generation skips the library. Cancelling the `cancel` token (CancelToken)
+# closes the connection at once, even while waiting for the next chunk.
+# `timeout` is the longest wait for the next chunk and `first_token_timeout`
+# for the first (see stream_completion). A stream that breaks after some
+# output raises rather than starting the answer again. `format` is passed to
+# Ollama as is: "json" or a JSON schema the answer must follow.
+def stream_chat(messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, options=None, cancel=None,
+                timeout=None, first_token_timeout=None, format=None):
+    timeout, first_token_timeout, total_timeout = _limits(model, messages, timeout, first_token_timeout)
+    received = False
+
+    streams = [("Ollama library", _stream_library), ("direct API", _stream_direct)]
+    if cancel is not None:
+        # Only the direct stream can be aborted from the cancelling thread, which
+        # stops Ollama decoding and frees the scheduler slot at once
+        streams = streams[1:]
+    for name, stream in streams:
+        try:
+            add_log("INFO", f"Trying {name} streaming...")
+            for content in stream(messages, model, temperature, options, cancel, timeout, first_token_timeout,
+                                  format):
+                received = True
+                yield content
+            add_log("INFO", f"Streaming with the {name} complete")
+            break
+        except Exception as e:
+            add_log("WARNING", f"Streaming with the {name} failed: {str(e)}")
+            if received:
+                raise
+
+    # Last resort: try non-streaming if we still have no content
+    if not received and not (cancel is not None and cancel.cancelled):
+        add_log("INFO", "Falling back to non-streaming API call...")
+        non_stream_payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "options": {"temperature": temperature, **(options or {})}
+        }
+        if format is not None:
+            non_stream_payload["format"] = format
+
+        fallback_response = get_pool().request(
+            "POST",
+            "/api/chat",
+            model=model,
+            json=non_stream_payload,
+            timeout=total_timeout
+        )
+
+        if fallback_response.status_code == 200:
+            data = fallback_response.json()
+            policy.record(model, fallback_response.url.split("/api/")[0], data)
+            content = data.get("message", {}).get("content", "")
+            add_log("INFO", f"Non-streaming fallback successful. Length: {len(content)}")
+            if content:
+                yield content
+        else:
+            add_log("ERROR", f"Non-streaming fallback failed: {fallback_response.status_code}")
+
+
+# Function to stream a chat response with the ollama library. The library has
+# one read timeout for the whole stream, and its stream cannot be closed from
+# another thread, so it is only used for generations that cannot be cancelled.
+def _stream_library(messages, model, temperature, options=None, cancel=None, timeout=120, first_token_timeout=None,
+                    format=None):
+    with get_pool().acquire(model) as endpoint:
+        response = ollama_client(endpoint.url, math.ceil(max(timeout, first_token_timeout or 0))).chat(
+            model=model,
+            messages=messages,
+            stream=True,
+            format=format,
+            options={"temperature": temperature, **(options or {})}
+        )
+        try:
+            for chunk in response:
+                content = chunk["message"]["content"]
+                if content:
+                    add_log("DEBUG", f"Received chunk: {len(content)} chars")
+                    yield content
+                if chunk.get("done"):
+                    policy.record(model, endpoint.url, chunk)
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+
+
+# Function to stream a chat response straight from the Ollama HTTP API
+# (the read timeout starts at first_token_timeout and drops to timeout once tokens flow)
+def _stream_direct(messages, model, temperature, options=None, cancel=None, timeout=120, first_token_timeout=None,
+                   format=None):
+    stream_payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        "options": {"temperature": temperature, **(options or {})}
+    }
+    if format is not None:
+        stream_payload["format"] = format
+
+    with get_pool().stream(
+        "/api/chat",
+        model=model,
+        json=stream_payload,
+        timeout=(request_timeout("connect"), first_token_timeout or timeout)
+    ) as stream_response:
+        add_log("INFO", f"Stream API call response code: {stream_response.status_code}")
+
+        if stream_response.status_code != 200:
+            add_log("ERROR", f"Stream API call failed with status: {stream_response.status_code}")
+            return
+
+        add_log("INFO", "Direct API stream started successfully")
+        if cancel is not None:
+            # Closing the connection from the cancelling thread stops Ollama at once
+            abort = partial(_abort, stream_response)
+            cancel.on_cancel(abort)
+
+        host = stream_response.url.split("/api/")[0]
+        try:
+            first = True
+            for content in _read_stream(stream_response, cancel, lambda data: policy.record(model, host, data)):
+                if first:
+                    _set_read_timeout(stream_response, timeout)
+                    first = False
+                yield content
+        except Exception:
+            if cancel is None or not cancel.cancelled:
+                raise
+            add_log("INFO", "Generation cancelled, stream closed")
+        finally:
+            if cancel is not None:
+                cancel.discard(abort)
+
+
+# Function to get the socket under a streaming response, through the public
+# connection attributes of urllib3 and http.client. A response that is read
+# until the server closes the connection (no keep-alive) is detached from it;
+# its socket is then only reachable through private attributes, so that path
+# is a guarded fallback. None if neither is available.
+def _response_socket(stream_response):
+    connection = getattr(stream_response.raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        try:
+            sock = stream_response.raw._fp.fp.raw._sock
+        except AttributeError:
+            return None
+    return sock
+
+
+# Function to close a streaming response from another thread. Closing alone does
+# not wake a thread blocked reading the socket; shutting the socket down does.
+# Without the socket it falls back to closing, which stops the stream at the
+# next chunk.
+def _abort(stream_response):
+    sock = _response_socket(stream_response)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # already closed
+    stream_response.close()
+
+
+# Function to change the read timeout of a streaming response that has started
+# (without the socket it keeps the first-token timeout)
+def _set_read_timeout(stream_response, seconds):
+    sock = _response_socket(stream_response)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+
+# Function to yield the content chunks of an Ollama streaming response;
+# on_done gets the final message, which carries Ollama's timings
+def _read_stream(stream_response, cancel=None, on_done=None):
+    empty_chunk_count = 0
+
+    for line in stream_response.iter_lines():
+        if cancel is not None and cancel.cancelled:
+            add_log("INFO", "Generation cancelled, closing the stream")
+            return
+        if line:
+            try:
+                data = json.loads(line)
+                if "message" in data and "content" in data["message"]:
+                    chunk_content = data["message"]["content"]
+                    if chunk_content:
+                        add_log("DEBUG", f"Received chunk: {len(chunk_content)} chars")
+                        yield chunk_content
+                        empty_chunk_count = 0
+                    else:
+                        empty_chunk_count += 1
+
+                # Check for done message
+                if data.get("done", False):
+                    add_log("INFO", "Stream completed (done=true)")
+                    if on_done is not None:
+                        on_done(data)
+                    break
+            except json.JSONDecodeError:
+                pass
+        else:
+            empty_chunk_count += 1
+
+        # Break if too many empty chunks
+        if empty_chunk_count > 50:
+            add_log("WARNING", "Too many empty chunks, stopping stream")
+            break
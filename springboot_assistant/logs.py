@@ -0,0 +1,16 @@
+from contextvars import ContextVar
+from datetime import datetime
+
+# Where log entries go for the current run. The Streamlit script points this at
+# st.session_state.logs, the CLI at a per-project list; unset means console only.
+log_sink = ContextVar("log_sink", default=None)
+
+
+# Function to add log entries
+def add_log(level, message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_entry = f"{timestamp} [{level}] {message}"
+    sink = log_sink.get()
+    if sink is not None:
+        sink(log_entry)
+    print(log_entry)  # Also print to console for debugging
@@ -0,0 +1,511 @@
+import json
+import re
+import threading
+
+from .java_index import JavaSymbolIndex, TYPE_KEYWORDS
+
+# Static OpenAPI 3.0 extraction from Spring controllers. Paths, parameters,
+# request bodies and responses come from the mapping annotations; schemas come
+# from the DTO/entity fields in the symbol index. Operations are cached per
+# controller content hash and schemas per hash of the declaring file and of
+# the files declaring its supertypes.
+
+SCALAR_SCHEMAS = {
+    "String": {"type": "string"},
+    "CharSequence": {"type": "string"},
+    "char": {"type": "string"},
+    "Character": {"type": "string"},
+    "int": {"type": "integer", "format": "int32"},
+    "Integer": {"type": "integer", "format": "int32"},
+    "short": {"type": "integer", "format": "int32"},
+    "Short": {"type": "integer", "format": "int32"},
+    "byte": {"type": "integer", "format": "int32"},
+    "Byte": {"type": "integer", "format": "int32"},
+    "long": {"type": "integer", "format": "int64"},
+    "Long": {"type": "integer", "format": "int64"},
+    "BigInteger": {"type": "integer"},
+    "float": {"type": "number", "format": "float"},
+    "Float": {"type": "number", "format": "float"},
+    "double": {"type": "number", "format": "double"},
+    "Double": {"type": "number", "format": "double"},
+    "BigDecimal": {"type": "number"},
+    "Number": {"type": "number"},
+    "boolean": {"type": "boolean"},
+    "Boolean": {"type": "boolean"},
+    "LocalDate": {"type": "string", "format": "date"},
+    "LocalDateTime": {"type": "string", "format": "date-time"},
+    "OffsetDateTime": {"type": "string", "format": "date-time"},
+    "ZonedDateTime": {"type": "string", "format": "date-time"},
+    "Instant": {"type": "string", "format": "date-time"},
+    "Date": {"type": "string", "format": "date-time"},
+    "Timestamp": {"type": "string", "format": "date-time"},
+    "LocalTime": {"type": "string", "format": "time"},
+    "Duration": {"type": "string"},
+    "UUID": {"type": "string", "format": "uuid"},
+    "URI": {"type": "string", "format": "uri"},
+    "URL": {"type": "string", "format": "uri"},
+    "MultipartFile": {"type": "string", "format": "binary"},
+    "Resource": {"type": "string", "format": "binary"},
+    "InputStreamResource": {"type": "string", "format": "binary"},
+    "Object": {"type": "object"},
+    "JsonNode": {"type": "object"},
+    "ObjectNode": {"type": "object"},
+}
+WRAPPER_TYPES = {"ResponseEntity", "HttpEntity", "Optional", "Mono", "CompletableFuture", "Future",
+                 "CompletionStage", "Callable", "DeferredResult", "EntityModel", "WebAsyncTask"}
+COLLECTION_TYPES = {"List", "ArrayList", "LinkedList", "Collection", "Iterable", "Set", "HashSet", "LinkedHashSet",
+                    "TreeSet", "SortedSet", "Flux", "Stream", "CollectionModel"}
+MAP_TYPES = {"Map", "HashMap", "LinkedHashMap", "TreeMap", "SortedMap", "ConcurrentHashMap", "MultiValueMap"}
+PAGE_TYPES = {"Page", "Slice", "PagedModel"}
+EMPTY_TYPES = {"void", "Void"}
+# Handler arguments Spring resolves itself; they are not part of the HTTP contract
+FRAMEWORK_PARAMETERS = {
+    "HttpServletRequest", "HttpServletResponse", "ServletRequest", "ServletResponse", "HttpSession", "Model",
+    "ModelMap", "BindingResult", "Errors", "Principal", "Authentication", "Locale", "WebRequest",
+    "NativeWebRequest", "UriComponentsBuilder", "RedirectAttributes", "ServerWebExchange", "ServerHttpRequest",
+    "ServerHttpResponse", "SessionStatus", "TimeZone", "ZoneId",
+}
+HTTP_STATUS_CODES = {
+    "OK": "200", "CREATED": "201", "ACCEPTED": "202", "NO_CONTENT": "204", "MOVED_PERMANENTLY": "301",
+    "FOUND": "302", "NOT_MODIFIED": "304", "BAD_REQUEST": "400", "UNAUTHORIZED": "401", "FORBIDDEN": "403",
+    "NOT_FOUND": "404", "CONFLICT": "409", "UNPROCESSABLE_ENTITY": "422", "INTERNAL_SERVER_ERROR": "500",
+}
+STATUS_DESCRIPTIONS = {
+    "200": "OK", "201": "Created", "202": "Accepted", "204": "No Content", "301": "Moved Permanently",
+    "302": "Found", "304": "Not Modified", "400": "Bad Request", "401": "Unauthorized", "403": "Forbidden",
+    "404": "Not Found", "409": "Conflict", "422": "Unprocessable Entity", "500": "Internal Server Error",
+}
+REQUIRED_ANNOTATIONS = {"NotNull", "NotBlank", "NotEmpty", "NonNull"}
+IGNORED_FIELD_ANNOTATIONS = {"JsonIgnore", "Transient"}
+CACHE_SIZE = 1024
+
+_operation_cache = {}
+_schema_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(cache, key, build):
+    with _cache_lock:
+        if key in cache:
+            return cache[key]
+    value = build()
+    with _cache_lock:
+        if len(cache) >= CACHE_SIZE:
+            cache.clear()
+        cache[key] = value
+    return value
+
+
+# Function to split "Map<String, List<Book>>" into ("Map", ["String", "List<Book>"])
+def split_generic(type_name):
+    type_name = type_name.strip()
+    start = type_name.find("<")
+    if start == -1 or not type_name.endswith(">"):
+        return type_name, []
+    arguments = []
+    depth = 0
+    current = ""
+    for char in type_name[start + 1:-1]:
+        if char == "<":
+            depth += 1
+        elif char == ">":
+            depth -= 1
+        if char == "," and depth == 0:
+            arguments.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        arguments.append(current.strip())
+    return type_name[:start].strip(), arguments
+
+
+def _wildcard_bound(type_name):
+    type_name = type_name.strip()
+    if type_name.startswith("?"):
+        bound = type_name[1:].strip()
+        for keyword in ("extends", "super"):
+            if bound.startswith(keyword):
+                return bound[len(keyword):].strip()
+        return "Object"
+    return type_name
+
+
+# Function to map a Java type to an OpenAPI schema. Non-library types become
+# component references; `refs` collects their names.
+def schema_for(type_name, refs):
+    type_name = _wildcard_bound(type_name)
+    if type_name.endswith("..."):
+        return {"type": "array", "items": schema_for(type_name[:-3], refs)}
+    if type_name.endswith("[]"):
+        if type_name[:-2] == "byte":
+            return {"type": "string", "format": "byte"}
+        return {"type": "array", "items": schema_for(type_name[:-2], refs)}
+
+    base, arguments = split_generic(type_name)
+    simple = base.split(".")[-1]
+    if simple in WRAPPER_TYPES:
+        return schema_for(arguments[0], refs) if arguments else {}
+    if simple in COLLECTION_TYPES:
+        schema = {"type": "array", "items": schema_for(arguments[0], refs) if arguments else {}}
+        if "Set" in simple:
+            schema["uniqueItems"] = True
+        return schema
+    if simple in MAP_TYPES:
+        values = schema_for(arguments[1], refs) if len(arguments) > 1 else {}
+        return {"type": "object", "additionalProperties": values or True}
+    if simple in PAGE_TYPES:
+        return {
+            "type": "object",
+            "properties": {
+                "content": {"type": "array", "items": schema_for(arguments[0], refs) if arguments else {}},
+                "totalElements": {"type": "integer", "format": "int64"},
+                "totalPages": {"type": "integer", "format": "int32"},
+                "number": {"type": "integer", "format": "int32"},
+                "size": {"type": "integer", "format": "int32"},
+            },
+        }
+    if simple in SCALAR_SCHEMAS:
+        return dict(SCALAR_SCHEMAS[simple])
+    if simple in EMPTY_TYPES or simple == "?":
+        return {}
+    refs.add(simple)
+    return {"$ref": f"#/components/schemas/{simple}"}
+
+
+def _annotation(annotations, *names):
+    for annotation in annotations:
+        if annotation["name"] in names:
+            return annotation
+    return None
+
+
+def _argument(annotation, *keys, default=None):
+    for key in keys:
+        value = annotation["args"].get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def _is_false(value):
+    return str(value).strip().lower() == "false"
+
+
+def _status_code(value):
+    value = value[0] if isinstance(value, list) and value else value
+    name = str(value).split(".")[-1]
+    if name.isdigit():
+        return name
+    return HTTP_STATUS_CODES.get(name, "200")
+
+
+# Function to normalise Spring path templates ("{id:\\d+}" -> "{id}")
+def normalize_path(path):
+    path = re.sub(r"\{(\w+):[^}]*\}", r"{\1}", path or "/")
+    return path if path.startswith("/") else "/" + path
+
+
+def _humanize(name):
+    words = re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+", name)
+    return " ".join(words).capitalize() if words else name
+
+
+def _controller_tag(declaration):
+    tag = _annotation(declaration["annotations"], "Tag", "Api")
+    if tag:
+        name = _argument(tag, "name", "value", "tags")
+        if isinstance(name, list):
+            name = name[0] if name else None
+        if isinstance(name, str) and name:
+            return name
+    name = declaration["name"] or "default"
+    return name[:-len("Controller")] if name.endswith("Controller") and len(name) > len("Controller") else name
+
+
+def _parameter_spec(parameter, refs):
+    annotations = parameter["annotations"]
+    simple_type = split_generic(parameter["type"])[0].split(".")[-1]
+    if simple_type in FRAMEWORK_PARAMETERS or _annotation(annotations, "AuthenticationPrincipal", "RequestAttribute", "SessionAttribute"):
+        return []
+    if simple_type == "Pageable":
+        return [
+            {"name": "page", "in": "query", "required": False, "schema": {"type": "integer", "format": "int32", "minimum": 0}},
+            {"name": "size", "in": "query", "required": False, "schema": {"type": "integer", "format": "int32", "minimum": 1}},
+            {"name": "sort", "in": "query", "required": False, "schema": {"type": "array", "items": {"type": "string"}}},
+        ]
+    if simple_type == "Sort":
+        return [{"name": "sort", "in": "query", "required": False, "schema": {"type": "array", "items": {"type": "string"}}}]
+
+    for annotation_name, location in (("PathVariable", "path"), ("RequestParam", "query"),
+                                      ("RequestHeader", "header"), ("CookieValue", "cookie")):
+        annotation = _annotation(annotations, annotation_name)
+        if annotation is None:
+            continue
+        name = _argument(annotation, "value", "name", default=parameter["name"])
+        if simple_type in MAP_TYPES and location != "path":
+            return []  # a map of all query parameters/headers
+        required = location == "path" or not (
+            _is_false(annotation["args"].get("required", "true")) or "defaultValue" in annotation["args"]
+            or simple_type == "Optional")
+        spec = {"name": name, "in": location, "required": required, "schema": schema_for(parameter["type"], refs)}
+        if "defaultValue" in annotation["args"]:
+            spec["schema"]["default"] = annotation["args"]["defaultValue"]
+        return [spec]
+
+    # Spring binds unannotated simple arguments to query parameters
+    if simple_type in SCALAR_SCHEMAS and not _annotation(annotations, "RequestBody", "RequestPart", "ModelAttribute"):
+        return [{"name": parameter["name"], "in": "query", "required": False, "schema": schema_for(parameter["type"], refs)}]
+    return []
+
+
+# Function to build the operations of one controller:
+# [(path, http method, operation)] plus the component names they reference
+def controller_operations(declaration):
+    operations = []
+    refs = set()
+    tag = _controller_tag(declaration)
+
+    for endpoint in declaration["endpoints"]:
+        operation = {"tags": [tag], "operationId": endpoint["handler"]}
+        documented = _annotation(endpoint["annotations"], "Operation", "ApiOperation")
+        summary = documented and _argument(documented, "summary", "value")
+        operation["summary"] = summary if isinstance(summary, str) and summary else _humanize(endpoint["handler"])
+        description = documented and _argument(documented, "description", "notes")
+        if isinstance(description, str) and description:
+            operation["description"] = description
+
+        parameters = []
+        for parameter in endpoint["parameters"]:
+            parameters.extend(_parameter_spec(parameter, refs))
+            body = _annotation(parameter["annotations"], "RequestBody")
+            part = _annotation(parameter["annotations"], "RequestPart")
+            if body is not None:
+                consumes = endpoint.get("consumes") or ["application/json"]
+                consumes = consumes if isinstance(consumes, list) else [consumes]
+                operation["requestBody"] = {
+                    "required": not _is_false(body["args"].get("required", "true")),
+                    "content": {_media_type(media): {"schema": schema_for(parameter["type"], refs)} for media in consumes},
+                }
+            elif part is not None:
+                form = operation.setdefault("requestBody", {"content": {"multipart/form-data": {"schema": {
+                    "type": "object", "properties": {}}}}})
+                schema = form["content"].setdefault("multipart/form-data", {"schema": {"type": "object", "properties": {}}})["schema"]
+                schema.setdefault("properties", {})[_argument(part, "value", "name", default=parameter["name"])] = \
+                    schema_for(parameter["type"], refs)
+
+        path = normalize_path(endpoint["path"])
+        declared = {parameter["name"] for parameter in parameters if parameter["in"] == "path"}
+        for name in re.findall(r"\{(\w+)\}", path):
+            if name not in declared:
+                parameters.append({"name": name, "in": "path", "required": True, "schema": {"type": "string"}})
+        if parameters:
+            operation["parameters"] = parameters
+
+        status = _annotation(endpoint["annotations"], "ResponseStatus")
+        code = _status_code(_argument(status, "value", "code", default="OK")) if status else "200"
+        response = {"description": STATUS_DESCRIPTIONS.get(code, "Response")}
+        schema = schema_for(endpoint["return_type"], refs)
+        if schema and code != "204":
+            produces = endpoint.get("produces") or ["application/json"]
+            produces = produces if isinstance(produces, list) else [produces]
+            response["content"] = {_media_type(media): {"schema": schema} for media in produces}
+        operation["responses"] = {code: response}
+        operations.append((path, endpoint["method"].lower(), operation))
+
+    return operations, sorted(refs)
+
+
+def _media_type(media):
+    media = str(media)
+    if media.startswith("MediaType."):
+        constant = media.split(".")[-1].replace("_VALUE", "")
+        return constant.lower().replace("_", "/", 1).replace("_", "-")
+    return media
+
+
+def _field_schema(field, refs):
+    schema = schema_for(field["type"], refs)
+    annotations = field["annotations"]
+    size = _annotation(annotations, "Size", "Length")
+    if size is not None and "$ref" not in schema:
+        prefix = "Items" if schema.get("type") == "array" else "Length"
+        for key, target in (("min", f"min{prefix}"), ("max", f"max{prefix}")):
+            if str(size["args"].get(key, "")).isdigit():
+                schema[target] = int(size["args"][key])
+    for name, target in (("Min", "minimum"), ("Max", "maximum"), ("DecimalMin", "minimum"), ("DecimalMax", "maximum")):
+        annotation = _annotation(annotations, name)
+        value = annotation and _argument(annotation, "value")
+        if isinstance(value, str):
+            try:
+                schema[target] = int(value.strip('"').rstrip("Ll"))
+            except ValueError:
+                try:
+                    schema[target] = float(value.strip('"'))
+                except ValueError:
+                    pass
+    if _annotation(annotations, "Positive"):
+        schema.update({"minimum": 0, "exclusiveMinimum": True})
+    if _annotation(annotations, "Email"):
+        schema["format"] = "email"
+    pattern = _annotation(annotations, "Pattern")
+    if pattern and isinstance(_argument(pattern, "regexp"), str):
+        schema["pattern"] = _argument(pattern, "regexp")
+    if _annotation(annotations, "GeneratedValue"):
+        schema["readOnly"] = True
+    return schema
+
+
+# Function to build the component schema for a project type
+def type_schema(declaration, symbol_index, refs, seen=None):
+    if declaration["kind"] == "enum":
+        return {"type": "string", "enum": list(declaration["constants"])}
+
+    seen = (seen or set()) | {declaration["name"]}
+    properties = {}
+    required = []
+    for parent in declaration["extends"]:
+        parent_name = split_generic(parent)[0].split(".")[-1]
+        _, parent_declaration = symbol_index.find_type(parent_name)
+        if parent_declaration is not None and parent_name not in seen and parent_declaration["kind"] in TYPE_KEYWORDS:
+            inherited = type_schema(parent_declaration, symbol_index, refs, seen)
+            properties.update(inherited.get("properties", {}))
+            required.extend(inherited.get("required", []))
+
+    for field in declaration["fields"]:
+        if "static" in field.get("modifiers", []):
+            continue
+        if _annotation(field["annotations"], *IGNORED_FIELD_ANNOTATIONS) or "transient" in field.get("modifiers", []):
+            continue
+        renamed = _annotation(field["annotations"], "JsonProperty")
+        name = _argument(renamed, "value", default=field["name"]) if renamed else field["name"]
+        properties[name] = _field_schema(field, refs)
+        if _annotation(field["annotations"], *REQUIRED_ANNOTATIONS):
+            required.append(name)
+
+    schema = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = list(dict.fromkeys(required))
+    return schema
+
+
+# Function to list the hashes of the files declaring a type's supertypes
+# (inherited fields are part of its schema), resolved as type_schema() does
+def _supertype_hashes(declaration, symbol_index, seen=None):
+    seen = (seen or set()) | {declaration["name"]}
+    hashes = []
+    for parent in declaration["extends"]:
+        parent_name = split_generic(parent)[0].split(".")[-1]
+        filename, parent_declaration = symbol_index.find_type(parent_name)
+        if parent_declaration is not None and parent_name not in seen and parent_declaration["kind"] in TYPE_KEYWORDS:
+            hashes.append(symbol_index.hash_of(filename))
+            hashes.extend(_supertype_hashes(parent_declaration, symbol_index, seen))
+    return hashes
+
+
+def _components(names, symbol_index):
+    schemas = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in schemas:
+            continue
+        filename, declaration = symbol_index.find_type(name)
+        if declaration is None:
+            schemas[name] = {"type": "object"}
+            continue
+
+        def build():
+            refs = set()
+            return type_schema(declaration, symbol_index, refs), sorted(refs)
+
+        key = (symbol_index.hash_of(filename), declaration["qualified_name"],
+               tuple(_supertype_hashes(declaration, symbol_index)))
+        schema, refs = _cached(_schema_cache, key, build)
+        schemas[name] = schema
+        pending.extend(ref for ref in refs if ref not in schemas)
+    return dict(sorted(schemas.items()))
+
+
+# Function to extract an OpenAPI 3.0 document (as a dict) from the project's
+# controllers; returns None when the project has no controllers
+def build_openapi_spec(generated_files, project_metadata, symbol_index=None):
+    symbol_index = (symbol_index or JavaSymbolIndex()).update(generated_files)
+    controllers = symbol_index.controllers()
+    if not controllers:
+        return None
+
+    paths = {}
+    refs = set()
+    operation_ids = set()
+    for filename, declaration in sorted(controllers, key=lambda item: (item[0], item[1]["name"] or "")):
+        key = (symbol_index.hash_of(filename), declaration["qualified_name"])
+        operations, controller_refs = _cached(_operation_cache, key, lambda: controller_operations(declaration))
+        refs.update(controller_refs)
+        for path, method, operation in operations:
+            operation = dict(operation)
+            if operation["operationId"] in operation_ids:
+                operation["operationId"] = f"{operation['operationId']}{operation['tags'][0].replace(' ', '')}"
+            operation_ids.add(operation["operationId"])
+            paths.setdefault(path, {})[method] = operation
+
+    spec = {
+        "openapi": "3.0.3",
+        "info": {
+            "title": project_metadata.get("app_name", "Spring Boot API"),
+            "description": project_metadata.get("description", ""),
+            "version": "1.0.0",
+        },
+        "servers": [{"url": "http://localhost:8080"}],
+        "paths": dict(sorted(paths.items())),
+    }
+    if refs:
+        spec["components"] = {"schemas": _components(refs, symbol_index)}
+    return spec
+
+
+_PLAIN_SCALAR = re.compile(r"^[A-Za-z_/$][\w ./{}$()-]*$")
+_RESERVED_SCALARS = {"true", "false", "null", "yes", "no", "on", "off", "y", "n", "~"}
+
+
+def _yaml_scalar(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, dict):
+        return "{}"
+    if isinstance(value, list):
+        return "[]"
+    text = str(value)
+    if _PLAIN_SCALAR.match(text) and text.lower() not in _RESERVED_SCALARS and text == text.strip():
+        return text
+    return json.dumps(text)
+
+
+def _yaml_lines(value, indent):
+    pad = "  " * indent
+    lines = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)) and item:
+                lines.append(f"{pad}{_yaml_scalar(key)}:")
+                lines.extend(_yaml_lines(item, indent + 1))
+            else:
+                lines.append(f"{pad}{_yaml_scalar(key)}: {_yaml_scalar(item)}")
+    else:
+        for item in value:
+            if isinstance(item, (dict, list)) and item:
+                nested = _yaml_lines(item, indent + 1)
+                lines.append(f"{pad}- {nested[0].lstrip()}")
+                lines.extend(nested[1:])
+            else:
+                lines.append(f"{pad}- {_yaml_scalar(item)}")
+    return lines
+
+
+# Function to render a spec as YAML; output is deterministic for a given spec
+def render_openapi_yaml(spec):
+    return "\n".join(_yaml_lines(spec, 0)) + "\n"
@@ -0,0 +1,36 @@
+# When the Streamlit app saves its project and releases file contents. Each tab
+# section is a fragment: using its widgets reruns only that section, without
+# the top or the end of the script. A full run saves the project at the end of
+# the script; a fragment that reran on its own saves it when it finishes.
+# Changing the project's files invalidates the whole page: the project is
+# saved and the page reruns in full, so every section shows the new files.
+# The store and the rerun function are passed in, so this runs without Streamlit.
+class PageRun:
+    def __init__(self, store, rerun):
+        self.store = store
+        self.rerun = rerun
+        # True while the whole script runs; a fragment rerunning on its own finds it False
+        self.full_run = True
+
+    # Function to call when a section has rendered
+    def fragment_done(self, project):
+        if not self.full_run:
+            self._persist(project)
+
+    # Function to call at the end of the script
+    def page_done(self, project):
+        self._persist(project)
+        self.full_run = False
+
+    # Function to invalidate the page after the project's files changed.
+    # `notice` is a (kind, text) pair shown at the top of the page after the rerun.
+    def project_changed(self, project, notice=None):
+        if notice:
+            project["notices"].append(notice)
+        self.store.save(project)
+        self.rerun()
+
+    # Persist the run's changes and release file contents until they are next needed
+    def _persist(self, project):
+        self.store.save(project)
+        self.store.evict(project)
@@ -0,0 +1,226 @@
+import difflib
+import re
+
+from .browser import file_type_of
+from .core import project_files, register_blocks, update_file
+from .fences import scan_fences
+from .store import file_hash
+
+# Edit mode for follow-up changes. Instead of writing whole files again, the
+# model answers with edits to the project's current files, as search/replace
+# blocks or unified diffs, which are applied here. Each edit is located in
+# the file exactly, then ignoring whitespace, then by fuzzy matching; an edit
+# that cannot be placed, or that is ambiguous, is a conflict, and the file is
+# left as it was so the caller can ask for the whole file instead.
+
+EDIT_SYSTEM_PROMPT = """
+You are an expert Java Spring Boot developer assistant editing an existing project.
+The current contents of the relevant project files are given below.
+To change an existing file, do not repeat the whole file. Answer with edits in a code block named after the file,
+each edit replacing an exact excerpt of the current file:
+
+```java:src/main/java/com/example/demo/BookService.java
+<<<<<<< SEARCH
+    public List<Book> findAll() {
+        return repository.findAll();
+    }
+=======
+    public List<Book> findAll() {
+        return repository.findAll(Sort.by("title"));
+    }
+>>>>>>> REPLACE
+```
+
+Copy the SEARCH lines exactly, with a few unchanged lines around the change so they match only one place.
+Use several SEARCH/REPLACE pairs in the block for several changes to the file. A unified diff in a ```diff block
+is accepted as well. Write new files in full, each in its own code block named after its path.
+Briefly explain the changes after the code blocks.
+"""
+
+# Lowest similarity for a fuzzy match of an edit's lines
+FUZZY_THRESHOLD = 0.85
+
+_SEARCH_REPLACE = re.compile(
+    r"^<{5,9} ?SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} ?REPLACE[^\n]*$", re.MULTILINE | re.DOTALL)
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+# Raised when an edit cannot be applied to a file
+class PatchConflict(Exception):
+    pass
+
+
+# Function to split an edit-mode answer into edits and whole files. Edits are
+# {"filename", "path", "hunks"} with hunks as {"old", "new", "line"} (lists
+# of lines, and the line number a diff gives, if any); whole files are
+# fenced blocks as from fences.py.
+def parse_edits(response):
+    edits, blocks = [], []
+    for block in scan_fences(response):
+        if not block["complete"]:
+            continue
+        code = block["code"]
+        if _SEARCH_REPLACE.search(code):
+            edits.append(_edit(block["path"], [
+                {"old": _lines(search), "new": _lines(replace), "line": None}
+                for search, replace in _SEARCH_REPLACE.findall(code)
+            ]))
+        elif block["language"] in ("diff", "patch") or code.startswith(("--- ", "@@")):
+            edits.extend(_parse_unified_diff(code, block["path"]))
+        else:
+            blocks.append(block)
+    return edits, blocks
+
+
+def _edit(path, hunks):
+    path = (path or "").strip()
+    return {"filename": path.rstrip("/").rsplit("/", 1)[-1], "path": path, "hunks": hunks}
+
+
+def _lines(text):
+    return text[:-1].split("\n") if text.endswith("\n") else ([] if not text else text.split("\n"))
+
+
+def _parse_unified_diff(code, path=None):
+    edits, edit, hunk = [], None, None
+    lines = code.split("\n")
+    for index, line in enumerate(lines):
+        if line.startswith("--- ") and index + 1 < len(lines) and lines[index + 1].startswith("+++ "):
+            continue  # file header; the +++ line names the file
+        if line.startswith("+++ ") and (index == 0 or lines[index - 1].startswith("--- ")):
+            target = line[4:].split("\t")[0].strip()
+            target = target[2:] if target.startswith("b/") else target
+            edit, hunk = _edit(target, []), None
+            edits.append(edit)
+        elif line.startswith("@@"):
+            if edit is None:
+                edit = _edit(path, [])
+                edits.append(edit)
+            match = _HUNK_HEADER.match(line)
+            hunk = {"old": [], "new": [], "line": int(match.group(1)) if match else None}
+            edit["hunks"].append(hunk)
+        elif hunk is not None:
+            if line.startswith("+"):
+                hunk["new"].append(line[1:])
+            elif line.startswith("-"):
+                hunk["old"].append(line[1:])
+            elif not line.startswith("\\"):  # "\ No newline at end of file"
+                text = line[1:] if line.startswith(" ") else line
+                hunk["old"].append(text)
+                hunk["new"].append(text)
+    return [edit for edit in edits if edit["filename"] and edit["filename"] != "null" and edit["hunks"]]
+
+
+# Function to find where a hunk's old lines are in a file; returns
+# (start, end, how) with how "exact", "whitespace" or "fuzzy". Several
+# equally good places are a conflict unless a line number picks one.
+def locate(lines, old, line=None, fuzzy=True):
+    if not old:
+        position = len(lines) if line is None else min(max(line - 1, 0), len(lines))
+        return position, position, "exact"
+
+    size = len(old)
+    for how, normalise in (("exact", None), ("whitespace", _squash)):
+        target = old if normalise is None else [normalise(text) for text in old]
+        candidates = lines if normalise is None else [normalise(text) for text in lines]
+        found = [start for start in range(len(candidates) - size + 1)
+                 if candidates[start] == target[0] and candidates[start:start + size] == target]
+        if found:
+            return _pick(found, size, line, how)
+    if not fuzzy:
+        raise PatchConflict("excerpt not found in the current file")
+
+    target = "\n".join(_squash(text) for text in old)
+    matcher = difflib.SequenceMatcher(autojunk=False)
+    matcher.set_seq2(target)
+    best, best_ratio = [], FUZZY_THRESHOLD
+    for start in range(max(1, len(lines) - size + 1)):
+        matcher.set_seq1("\n".join(_squash(text) for text in lines[start:start + size]))
+        if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best_ratio + 1e-9:
+            best, best_ratio = [start], ratio
+        elif abs(ratio - best_ratio) <= 1e-9:
+            best.append(start)
+    if not best:
+        raise PatchConflict(f"excerpt not found in the current file (no match above {FUZZY_THRESHOLD:.0%})")
+    return _pick(best, size, line, "fuzzy")
+
+
+def _squash(text):
+    return " ".join(text.split())
+
+
+def _pick(found, size, line, how):
+    if len(found) > 1:
+        if line is None:
+            raise PatchConflict(f"excerpt matches {len(found)} places")
+        found = [min(found, key=lambda start: abs(start + 1 - line))]
+    return found[0], found[0] + size, how
+
+
+# Function to apply hunks to a file's content; returns (content, how each
+# hunk was placed). Raises PatchConflict, naming the hunk, when one fails;
+# fuzzy=False only accepts exact and whitespace-insensitive matches.
+def apply_hunks(content, hunks, fuzzy=True):
+    lines = content.split("\n")
+    offset = 0
+    placed = []
+    for number, hunk in enumerate(hunks, 1):
+        line = hunk["line"] + offset if hunk["line"] is not None else None
+        try:
+            start, end, how = locate(lines, hunk["old"], line, fuzzy=fuzzy)
+        except PatchConflict as e:
+            raise PatchConflict(f"edit {number} of {len(hunks)}: {e}") from None
+        lines[start:end] = hunk["new"]
+        offset += len(hunk["new"]) - (end - start)
+        placed.append(how)
+    return "\n".join(lines), placed
+
+
+# Function to apply parsed edits to a project's files. `base_hashes` are the
+# files' content hashes when the request was sent: a file changed since then
+# (other than by earlier edits of the same answer) only takes edits that match
+# it exactly or up to whitespace. Files are only written when all their edits
+# apply. Returns one result per edit: {"filename", "status"
+# (patched, created, conflict), "path", "detail", "placed", "content"}.
+def apply_edits(project, edits, base_hashes=None):
+    files = project_files(project)
+    stale = {}  # filename -> changed since the request, checked before this answer's edits touch it
+    results = []
+    for edit in edits:
+        filename = edit["filename"]
+        result = {"filename": filename, "path": edit["path"], "status": "conflict", "detail": "", "placed": [],
+                  "content": None}
+        results.append(result)
+        if filename not in files:
+            if all(not hunk["old"] for hunk in edit["hunks"]):
+                # Edits of a file that is not there yet, with nothing to search for: a new file
+                content = "\n".join("\n".join(hunk["new"]) for hunk in edit["hunks"])
+                register_blocks(project, [{"language": file_type_of(filename), "path": edit["path"], "code": content}])
+                result.update(status="created", content=content)
+            else:
+                result["detail"] = "no such file in the project"
+            continue
+
+        if filename not in stale:
+            stale[filename] = base_hashes is not None and base_hashes.get(filename) not in (
+                None, file_hash(files, filename))
+        try:
+            content, placed = apply_hunks(files[filename], edit["hunks"], fuzzy=not stale[filename])
+        except PatchConflict as e:
+            result["detail"] = f"{e}{' (the file changed since the request)' if stale[filename] else ''}"
+            continue
+        result.update(status="patched", content=content, placed=placed)
+        update_file(project, filename, content)
+    return results
+
+
+# Function to describe an edit as text, for asking for the whole file instead
+def describe_edit(edit):
+    parts = []
+    for hunk in edit["hunks"]:
+        parts.append("<<<<<<< SEARCH\n" + "\n".join(hunk["old"]) + "\n=======\n" + "\n".join(hunk["new"]) +
+                     "\n>>>>>>> REPLACE")
+    return "\n".join(parts)
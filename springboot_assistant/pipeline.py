@@ -0,0 +1,187 @@
+import time
+
+from .cancel import cancel_token
+from .core import (
+    add_config_file,
+    add_test_file,
+    generate_zip_file,
+    new_project,
+    project_files,
+    register_blocks,
+    register_code_blocks,
+)
+from .generators import (
+    build_chat_messages,
+    generate_docker_files,
+    generate_documentation,
+    generate_github_actions,
+    generate_integration_tests,
+    generate_openapi_spec,
+    generate_tests,
+)
+from .incremental import add_generated_test, is_test_target, plan_tests
+from .llm import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from .logs import add_log
+from .router import routed_stream
+from .speculative import pregenerator, project_key, tests_key
+from .structured import CODE_SCHEMA, parse_structured, to_markdown
+
+PIPELINE_STAGES = ["generation", "tests", "documentation", "openapi", "zip"]
+
+
+# Function to check whether the generation running in this context was cancelled
+def cancelled():
+    token = cancel_token.get()
+    return token is not None and token.cancelled
+
+
+# Function to run the full generation pipeline for one prompt without any UI.
+# Returns the project, the ZIP bytes and a report with per-stage timings.
+# structured=True generates the code in structured output mode (structured.py).
+def run_pipeline(prompt, metadata=None, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                 stages=None, include_spring_initializr=False, structured=False):
+    stages = stages or PIPELINE_STAGES
+    project = new_project(metadata)
+    report = {"prompt": prompt, "model": model, "timings": {}, "files": 0, "test_files": 0}
+    zip_data = None
+    started = time.perf_counter()
+
+    def timed(stage, func):
+        stage_start = time.perf_counter()
+        result = func()
+        report["timings"][stage] = round(time.perf_counter() - stage_start, 3)
+        return result
+
+    if "generation" in stages:
+        def generate():
+            messages = build_chat_messages(project["messages"], prompt, structured=structured)
+            response = "".join(routed_stream("chat", messages, model=model, temperature=temperature,
+                                             format=CODE_SCHEMA if structured else None))
+            answer = parse_structured(response) if structured else None
+            project["messages"].append({"role": "user", "content": prompt})
+            project["messages"].append({"role": "assistant", "content": to_markdown(answer) if answer else response})
+            return register_blocks(project, answer["files"]) if answer else register_code_blocks(project, response)
+
+        file_info = timed("generation", generate)
+        add_log("INFO", f"Pipeline generated {len(file_info)} files")
+
+    if "tests" in stages:
+        def tests():
+            for filename, _ in plan_tests(project, list(project["file_categories"]["main"]), model)["generate"]:
+                if cancelled():
+                    break
+                content = project["generated_files"][filename]
+                test_code, test_class_name = generate_tests(content, filename, model=model, temperature=temperature)
+                if test_code:
+                    add_generated_test(project, f"{test_class_name}.java", test_code, filename, model)
+
+        timed("tests", tests)
+
+    if "documentation" in stages and project["generated_files"]:
+        documentation = timed("documentation", lambda: generate_documentation(
+            project["generated_files"], project["project_metadata"], model=model, temperature=temperature))
+        if documentation:
+            add_config_file(project, "README.md", documentation)
+
+    if "openapi" in stages and project["generated_files"]:
+        openapi_spec = timed("openapi", lambda: generate_openapi_spec(
+            project["generated_files"], project["project_metadata"], model=model, temperature=temperature))
+        if openapi_spec:
+            add_config_file(project, "openapi.yml", openapi_spec)
+
+    if "zip" in stages:
+        all_files = project_files(project)
+        zip_data = timed("zip", lambda: generate_zip_file(
+            all_files, project["project_metadata"], include_spring_initializr=include_spring_initializr))
+
+    report["timings"]["total"] = round(time.perf_counter() - started, 3)
+    report["files"] = len(project["generated_files"])
+    report["test_files"] = len(project["test_files"])
+    return project, zip_data, report
+
+
+# Function to run a single generator against an existing project and store its
+# output there. Returns the names of the files written (or the ZIP bytes).
+# `enrich` adds the optional LLM pass to extracted or templated artifacts
+# (OpenAPI, Docker, CI). Without a filename, the tests task skips classes
+# whose recorded test is up to date (see incremental.py). A class whose test
+# generation fails doesn't stop the others: the tests task returns the files
+# written and the failures ({"written": [...], "failed": {filename: error}}),
+# and only raises when every class failed.
+def run_task(project, task, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, filename=None,
+             include_spring_initializr=False, enrich=False):
+    metadata = project["project_metadata"]
+
+    if task == "tests":
+        written, failed = [], {}
+        if filename:
+            targets = [filename] if is_test_target(project, filename) else []
+        else:
+            plan = plan_tests(project, list(project["file_categories"]["main"]), model)
+            targets = [target for target, _ in plan["generate"]]
+            add_log("INFO", f"Generating tests for {len(targets)} classes, {len(plan['unchanged'])} unchanged")
+            for test_filename, reason in plan["orphaned"]:
+                add_log("WARNING", f"Orphaned test {test_filename}: {reason}")
+        for target in targets:
+            if cancelled():
+                add_log("INFO", f"Test generation cancelled after {len(written)} files")
+                break
+            content = project["generated_files"][target]
+            test_code, test_class_name = (
+                pregenerator.result(tests_key(content, model, temperature)) or
+                generate_tests(content, target, model=model, temperature=temperature))
+            if not test_code:
+                add_log("ERROR", f"Test generation for {target} failed: {test_class_name}")
+                failed[target] = test_class_name
+                continue
+            add_generated_test(project, f"{test_class_name}.java", test_code, target, model)
+            written.append(f"{test_class_name}.java")
+        if failed and not written:
+            raise RuntimeError("; ".join(f"{target}: {error}" for target, error in failed.items()))
+        return {"written": written, "failed": failed}
+
+    if task == "integration-tests":
+        test_code, test_class_name = generate_integration_tests(
+            project["generated_files"], model=model, temperature=temperature)
+        if not test_code:
+            raise RuntimeError(test_class_name)
+        add_test_file(project, f"{test_class_name}.java", test_code)
+        return [f"{test_class_name}.java"]
+
+    if task == "documentation":
+        documentation = pregenerator.result(project_key(
+            "documentation", project["generated_files"], metadata, model, temperature))
+        add_config_file(project, "README.md", documentation or generate_documentation(
+            project["generated_files"], metadata, model=model, temperature=temperature))
+        return ["README.md"]
+
+    if task == "openapi":
+        add_config_file(project, "openapi.yml", generate_openapi_spec(
+            project["generated_files"], metadata, model=model, temperature=temperature, enrich=enrich))
+        return ["openapi.yml"]
+
+    if task == "docker":
+        dockerfile, docker_compose = generate_docker_files(
+            metadata, model=model, temperature=temperature, files=project["generated_files"], customise=enrich)
+        if not dockerfile:
+            raise RuntimeError(docker_compose or "Failed to generate Docker configuration")
+        add_config_file(project, "Dockerfile", dockerfile)
+        written = ["Dockerfile"]
+        if docker_compose:
+            add_config_file(project, "docker-compose.yml", docker_compose)
+            written.append("docker-compose.yml")
+        return written
+
+    if task == "ci":
+        add_config_file(project, ".github/workflows/ci-cd.yml", generate_github_actions(
+            metadata, model=model, temperature=temperature, files=project["generated_files"], customise=enrich))
+        return [".github/workflows/ci-cd.yml"]
+
+    if task == "zip":
+        all_files = project_files(project)
+        return generate_zip_file(all_files, metadata, include_spring_initializr=include_spring_initializr)
+
+    raise ValueError(f"Unknown task: {task}")
+
+
+PROJECT_TASKS = ["tests", "integration-tests", "documentation", "openapi", "docker", "ci", "zip"]
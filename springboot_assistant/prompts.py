@@ -0,0 +1,42 @@
+# Quick prompts offered in the UI sidebar, by category. Users' own prompts
+# are kept per session and shown under "Custom".
+
+QUICK_PROMPTS = {
+    "General": [
+        "Create a Spring Boot REST API for a blog with posts and comments",
+        "Show me how to implement JWT authentication with Spring Security",
+        "Generate a Spring Boot application with Spring Data JPA and PostgreSQL",
+        "Create a microservice for user management with validation",
+        "Build a Spring WebFlux reactive REST API",
+        "Generate a simple Spring Boot CRUD API with Swagger documentation",
+        "Create a Spring Boot application with Redis caching",
+        "Show me how to implement rate limiting in Spring Boot",
+        "Build a file upload/download service with Spring Boot",
+        "Create a Spring Boot application with Kafka integration"
+    ],
+    # Database relationship prompts
+    "Database Relationships": [
+        "Create a Spring Boot entity model with One-to-One relationship between User and UserProfile",
+        "Generate entities with One-to-Many relationship between Department and Employee",
+        "Implement Many-to-Many relationship between Student and Course with JPA",
+        "Create a bidirectional One-to-Many relationship between Order and OrderItem entities",
+        "Generate a self-referencing entity relationship for an Employee hierarchy"
+    ],
+    # MVC structure prompts
+    "MVC Structure": [
+        "Generate a complete controller-service-repository structure for a Product entity",
+        "Create a REST controller with CRUD operations for a Customer entity",
+        "Implement a service layer with business logic for Order processing",
+        "Build a repository with custom query methods for advanced data filtering",
+        "Create a complete MVC structure with DTO pattern and mappers"
+    ],
+    # Database prompts
+    "Database Config": [
+        "Configure Spring Boot with MySQL database and connection pooling",
+        "Set up PostgreSQL with Spring Boot including migrations with Flyway",
+        "Implement MongoDB repositories in Spring Boot for a Document entity",
+        "Configure multiple datasources in a Spring Boot application",
+        "Set up an in-memory H2 database for testing with Spring Boot"
+    ],
+}
+CUSTOM_CATEGORY = "Custom"
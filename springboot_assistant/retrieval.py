@@ -0,0 +1,257 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+
+from .context import estimate_tokens, truncate_message
+from .endpoints import get_pool
+from .logs import add_log
+from .store import content_hash
+from .timeouts import request_timeout
+
+# Tokens of project code a prompt builder may pull in by default
+DEFAULT_FILES_BUDGET = 6000
+DEFAULT_TOP_K = 8
+DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"
+
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "for", "on", "with", "is", "it", "this", "that",
+    "public", "private", "protected", "return", "new", "import", "package", "void", "final", "static",
+}
+
+
+# Function to split text into search terms: whole identifiers plus their
+# camelCase/snake_case parts, lower-cased
+def tokenize(text):
+    terms = []
+    for identifier in _IDENTIFIER_PATTERN.findall(text):
+        lowered = identifier.lower()
+        if lowered not in _STOPWORDS:
+            terms.append(lowered)
+        parts = _WORD_PATTERN.findall(identifier)
+        if len(parts) > 1:
+            terms.extend(part.lower() for part in parts if part.lower() not in _STOPWORDS)
+    return terms
+
+
+# Persists embeddings by (model, content hash) so each file version is only
+# embedded once, across reruns and restarts
+class EmbeddingCache:
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("ASSISTANT_DB", "assistant.db")
+        self._local = threading.local()
+        self._memory = {}
+        if self.path != ":memory:":
+            with self._connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, PRIMARY KEY (model, hash))"
+                )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, model, key):
+        if self.path == ":memory:":
+            return self._memory.get((model, key))
+        row = self._connection().execute(
+            "SELECT vector FROM embeddings WHERE model = ? AND hash = ?", (model, key)
+        ).fetchone()
+        return array("f", row[0]).tolist() if row else None
+
+    def put(self, model, key, vector):
+        if self.path == ":memory:":
+            self._memory[(model, key)] = vector
+            return
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                (model, key, array("f", vector).tobytes())
+            )
+
+
+# Function to embed a text with Ollama's /api/embeddings endpoint (hedged:
+# embeddings are short and sit in front of every chat turn)
+def embed_text(text, model=DEFAULT_EMBEDDING_MODEL, timeout=None):
+    response = get_pool().request(
+        "POST",
+        "/api/embeddings",
+        model=model,
+        hedge=True,
+        json={"model": model, "prompt": text},
+        timeout=timeout or request_timeout("embedding")
+    )
+    response.raise_for_status()
+    return response.json()["embedding"]
+
+
+def _cosine(left, right):
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+# BM25 index over project files, updated incrementally by content hash. With an
+# embedding model configured, scores blend BM25 with embedding similarity.
+# Embedding requests are made outside the index lock, so searches never wait
+# for them.
+class RetrievalIndex:
+    def __init__(self, embedding_model=None, embedding_cache=None, k1=1.5, b=0.75, embedding_weight=0.5):
+        self.embedding_cache = embedding_cache
+        self.k1 = k1
+        self.b = b
+        self.embedding_weight = embedding_weight
+        self._docs = {}  # filename -> {"hash", "terms": Counter, "length"}
+        self._document_frequency = Counter()
+        self._total_length = 0
+        self._vectors = {}  # filename -> (embedding model, embedding)
+        self._embedding_model = embedding_model
+        self._lock = threading.Lock()
+
+    # Embedding model, or None for BM25 only. Vectors of another model are
+    # dropped when it changes: their dimensions and space differ.
+    @property
+    def embedding_model(self):
+        return self._embedding_model
+
+    @embedding_model.setter
+    def embedding_model(self, model):
+        with self._lock:
+            if model != self._embedding_model:
+                self._vectors.clear()
+            self._embedding_model = model
+
+    # Function to sync the index with the given files. Only new or changed
+    # files are re-tokenised; files without a vector of the current embedding
+    # model are embedded (again). Removed files are dropped.
+    def update(self, files):
+        to_embed = []
+        with self._lock:
+            model = self._embedding_model
+            seen = set()
+            for filename in list(files):
+                seen.add(filename)
+                file_hash = files.hash_of(filename) if hasattr(files, "hash_of") else content_hash(files[filename])
+                doc = self._docs.get(filename)
+                if doc is None or doc["hash"] != file_hash:
+                    if doc is not None:
+                        self._remove(filename)
+                    self._add(filename, files[filename], file_hash)
+                if model and self._vectors.get(filename, (None,))[0] != model:
+                    to_embed.append((filename, file_hash))
+
+            for filename in [name for name in self._docs if name not in seen]:
+                self._remove(filename)
+
+        for filename, file_hash in to_embed:
+            vector = self._embed_file(filename, files[filename], file_hash, model)
+            with self._lock:
+                # Keep it unless the file or the model changed meanwhile
+                doc = self._docs.get(filename)
+                if vector is not None and doc is not None and doc["hash"] == file_hash and model == self._embedding_model:
+                    self._vectors[filename] = (model, vector)
+
+    def _add(self, filename, content, file_hash):
+        # The filename counts twice so class names rank strongly
+        terms = Counter(tokenize(content) + tokenize(filename) * 2)
+        self._docs[filename] = {"hash": file_hash, "terms": terms, "length": sum(terms.values())}
+        self._document_frequency.update(terms.keys())
+        self._total_length += self._docs[filename]["length"]
+
+    # Function to get a file version's embedding, from the cache or Ollama
+    def _embed_file(self, filename, content, file_hash, model):
+        vector = self.embedding_cache.get(model, file_hash) if self.embedding_cache else None
+        if vector is None:
+            try:
+                vector = embed_text(truncate_message(content, 2048), model=model)
+                if self.embedding_cache:
+                    self.embedding_cache.put(model, file_hash, vector)
+            except Exception as e:
+                add_log("WARNING", f"Embedding {filename} failed: {str(e)}")
+        return vector
+
+    def _remove(self, filename):
+        doc = self._docs.pop(filename)
+        self._document_frequency.subtract(doc["terms"].keys())
+        self._document_frequency += Counter()  # drop zero counts
+        self._total_length -= doc["length"]
+        self._vectors.pop(filename, None)
+
+    # Function to rank indexed files for a query; returns [(filename, score)]
+    def search(self, query, k=DEFAULT_TOP_K):
+        with self._lock:
+            if not self._docs:
+                return []
+            query_terms = set(tokenize(query))
+            count = len(self._docs)
+            average_length = self._total_length / count or 1
+
+            scores = {}
+            for filename, doc in self._docs.items():
+                score = 0.0
+                for term in query_terms:
+                    frequency = doc["terms"].get(term)
+                    if not frequency:
+                        continue
+                    df = self._document_frequency[term]
+                    idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                    norm = frequency + self.k1 * (1 - self.b + self.b * doc["length"] / average_length)
+                    score += idf * frequency * (self.k1 + 1) / norm
+                scores[filename] = score
+            model = self._embedding_model
+            vectors = {filename: vector for filename, (vector_model, vector) in self._vectors.items()
+                       if vector_model == model}
+
+        if model and vectors:
+            try:
+                query_vector = embed_text(query, model=model)
+                top = max(scores.values()) or 1.0
+                for filename in scores:
+                    similarity = _cosine(query_vector, vectors[filename]) if filename in vectors else 0.0
+                    scores[filename] = (1 - self.embedding_weight) * scores[filename] / top + self.embedding_weight * similarity
+            except Exception as e:
+                add_log("WARNING", f"Query embedding failed, using BM25 only: {str(e)}")
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+    # Function to pick the most relevant files for a prompt within a token budget
+    # (optionally only among the files accepted by `include`)
+    def select(self, query, files, budget=DEFAULT_FILES_BUDGET, k=DEFAULT_TOP_K, include=None):
+        self.update(files)
+        ranked = self.search(query, k=len(files))
+        if include is not None:
+            ranked = [(filename, score) for filename, score in ranked if include(filename)]
+        selected = {}
+        remaining = budget
+        for filename, score in ranked[:k]:
+            if score <= 0 and selected:
+                break
+            content = files[filename]
+            cost = estimate_tokens(content)
+            if cost > remaining:
+                if selected or remaining < 256:
+                    continue
+                content = truncate_message(content, remaining)
+                cost = estimate_tokens(content)
+            selected[filename] = content
+            remaining -= cost
+        add_log("INFO", f"Retrieval selected {len(selected)}/{len(files)} files (~{budget - remaining} tokens)")
+        return selected
+
+
+# Function to select relevant files with the given index, or a throwaway BM25 index
+def select_relevant_files(query, files, retriever=None, budget=DEFAULT_FILES_BUDGET, k=DEFAULT_TOP_K, include=None):
+    if not files:
+        return {}
+    return (retriever or RetrievalIndex()).select(query, files, budget=budget, k=k, include=include)
@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+import time
+
+from . import llm
+from .cancel import cancel_token
+from .llm import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from .logs import add_log
+from .scheduler import scheduler
+from .timeouts import policy, prompt_tokens
+
+# Task-aware model routing. Each task has a policy entry:
+#
+#     {"model": None, "fallback": None, "slo_seconds": 90, "options": {}}
+#
+# `model` None means the model the user selected; `fallback` is a smaller
+# (e.g. quantised) model used while the primary's measured latency for the task
+# is over `slo_seconds`; `options` are extra Ollama options (num_ctx, top_p,
+# temperature, ...). Latency is the full request time for completions and the
+# time to first token for streams. Overrides are read from the JSON file named
+# by ASSISTANT_ROUTING: {"fallback": "...", "tasks": {"ci": {"model": "..."}}}.
+# Requests wait for a scheduler slot first; queueing time is not counted.
+
+ROUTED_TASKS = ["chat", "tests", "integration-tests", "documentation", "openapi", "docker", "ci", "summary"]
+DEFAULT_POLICY = {
+    "chat": {"slo_seconds": 15},
+    "tests": {"slo_seconds": 90},
+    "integration-tests": {"slo_seconds": 180},
+    "documentation": {"slo_seconds": 180},
+    "openapi": {"slo_seconds": 120},
+    "docker": {"slo_seconds": 60},
+    "ci": {"slo_seconds": 60},
+    "summary": {"slo_seconds": 60},
+}
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.3
+# While degraded, send one request to the primary this often to re-measure it
+PROBE_INTERVAL = 120
+# How long the list of installed models is trusted
+MODELS_TTL = 60
+
+
+# Function to load the routing policy: defaults, then the ASSISTANT_ROUTING file,
+# then ASSISTANT_FALLBACK_MODEL as the fallback for every task
+def load_policy(path=None):
+    policy = {task: {"model": None, "fallback": None, "options": {}, **entry} for task, entry in DEFAULT_POLICY.items()}
+    path = path or os.environ.get("ASSISTANT_ROUTING")
+    overrides = {}
+    if path:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                overrides = json.load(handle)
+        except (OSError, ValueError) as e:
+            add_log("ERROR", f"Could not read routing policy {path}: {str(e)}")
+
+    fallback = overrides.get("fallback") or os.environ.get("ASSISTANT_FALLBACK_MODEL")
+    if fallback:
+        for entry in policy.values():
+            entry["fallback"] = fallback
+    for task, entry in overrides.get("tasks", {}).items():
+        policy.setdefault(task, {"model": None, "fallback": fallback, "slo_seconds": 120, "options": {}}).update(entry)
+    return policy
+
+
+class ModelRouter:
+    def __init__(self, policy=None):
+        self.policy = policy if policy is not None else load_policy()
+        self._latency = {}  # (model, task) -> {"average", "last", "samples", "failures"}
+        self._last_primary = {}  # (model, task) -> time of the last request sent to the primary
+        self._models = (0.0, [])
+        self._lock = threading.Lock()
+
+    def _entry(self, task):
+        return self.policy.get(task) or {"model": None, "fallback": None, "slo_seconds": 120, "options": {}}
+
+    def _installed_models(self):
+        checked, models = self._models
+        if time.monotonic() - checked > MODELS_TTL:
+            models = llm.list_models()
+            self._models = (time.monotonic(), models)
+        return models
+
+    # Function to pick the model and options for a task; returns
+    # {"task", "model", "primary", "options", "reason"}
+    def route(self, task, model=DEFAULT_MODEL):
+        entry = self._entry(task)
+        primary = entry.get("model") or model
+        fallback = entry.get("fallback")
+        route = {"task": task, "model": primary, "primary": primary, "options": dict(entry.get("options") or {}),
+                 "reason": "policy" if entry.get("model") else "selected"}
+
+        slo = entry.get("slo_seconds")
+        average = None
+        with self._lock:
+            stats = self._latency.get((primary, task))
+            if fallback and fallback != primary and stats is not None and slo is not None and stats["average"] > slo:
+                average = stats["average"]
+                since_primary = time.monotonic() - self._last_primary.get((primary, task), 0.0)
+                if since_primary >= PROBE_INTERVAL:
+                    route["reason"] = f"probe (avg {average:.1f}s > SLO {slo}s)"
+                    average = None
+            if average is None:
+                self._last_primary[(primary, task)] = time.monotonic()
+
+        # Over the SLO: send the request to the fallback if it is installed.
+        # Listing the models may go to the server, so it is not under the lock.
+        if average is not None:
+            if fallback in self._installed_models():
+                route["model"] = fallback
+                route["reason"] = f"fallback (avg {average:.1f}s > SLO {slo}s)"
+            else:
+                with self._lock:
+                    self._last_primary[(primary, task)] = time.monotonic()
+
+        add_log("INFO", f"Route {task} -> {route['model']} [{route['reason']}]")
+        return route
+
+    # Function to record a request's latency (or failure) for a model and task
+    def record(self, task, model, seconds, ok=True):
+        with self._lock:
+            stats = self._latency.setdefault((model, task), {"average": seconds, "last": seconds, "samples": 0, "failures": 0})
+            stats["average"] = seconds if stats["samples"] == 0 else (
+                LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * stats["average"])
+            stats["last"] = seconds
+            stats["samples"] += 1
+            if not ok:
+                stats["failures"] += 1
+            average = stats["average"]
+        slo = self._entry(task).get("slo_seconds")
+        add_log("INFO" if ok else "WARNING",
+                f"Routed {task} on {model}: {seconds:.2f}s{'' if ok else ' (failed)'}, avg {average:.2f}s, SLO {slo}s")
+
+    # Function to describe measured latencies per task and model, for tuning the policy
+    def stats(self):
+        with self._lock:
+            return [
+                {"task": task, "model": model, "slo_seconds": self._entry(task).get("slo_seconds"),
+                 "average_seconds": round(stats["average"], 2), "last_seconds": round(stats["last"], 2),
+                 "samples": stats["samples"], "failures": stats["failures"]}
+                for (model, task), stats in sorted(self._latency.items(), key=lambda item: (item[0][1], item[0][0]))
+            ]
+
+    # Function to run a routed completion (streamed, returned whole). Timeouts
+    # and the number of retries come from the timeout policy for the model,
+    # task and prompt size; `timeout` overrides the wait between tokens. A
+    # failed attempt counts against the model's latency and is retried, on the
+    # fallback model when there is one; a cancelled one counts for nothing. An
+    # attempt that broke off after some output raises PartialResponse instead,
+    # keeping that output.
+    def complete(self, task, messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, timeout=None,
+                 description=None, session=None, cancel=None):
+        cancel = cancel or cancel_token.get()
+        with scheduler.slot(task, session, cancel=cancel):
+            return self._complete(task, messages, model, temperature, timeout, description, cancel)
+
+    def _complete(self, task, messages, model, temperature, timeout, description, cancel):
+        route = self.route(task, model)
+        options = dict(route["options"])
+        temperature = options.pop("temperature", temperature)
+        tokens = prompt_tokens(messages)
+        fallback = self._entry(task).get("fallback")
+        retries = policy.retries(route["model"], tokens, task, fallback)
+
+        attempt_model = route["model"]
+        for attempt in range(retries + 1):
+            limits = policy.for_generation(attempt_model, tokens, task)
+            started = time.perf_counter()
+            try:
+                content = llm.stream_completion(
+                    messages, model=attempt_model, temperature=temperature, timeout=timeout or limits["idle"],
+                    task=description or task, options=options, cancel=cancel,
+                    first_token_timeout=limits["first_token"]
+                )
+            except llm.PartialResponse:
+                if not (cancel is not None and cancel.cancelled):
+                    self.record(task, attempt_model, time.perf_counter() - started, ok=False)
+                raise
+            except Exception:
+                if cancel is not None and cancel.cancelled:
+                    raise  # stopped or preempted: not the model's fault
+                self.record(task, attempt_model, time.perf_counter() - started, ok=False)
+                if attempt == retries:
+                    raise
+                attempt_model = fallback or attempt_model
+                add_log("WARNING", f"Retrying {task} on {attempt_model} ({attempt + 1} of {retries} retries, "
+                                   f"expected {limits['estimate']:.0f}s per attempt)")
+                continue
+            self.record(task, attempt_model, time.perf_counter() - started)
+            return content
+
+    # Function to stream a routed chat response; latency is time to first token.
+    # A stream stopped by its consumer or cancelled is not held against the model.
+    # `format` constrains the answer (see llm.stream_chat).
+    def stream(self, task, messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, session=None,
+               cancel=None, format=None):
+        cancel = cancel or cancel_token.get()
+        with scheduler.slot(task, session, cancel=cancel):
+            route = self.route(task, model)
+            options = dict(route["options"])
+            temperature = options.pop("temperature", temperature)
+            started = time.perf_counter()
+            first_token = None
+            limits = policy.for_generation(route["model"], prompt_tokens(messages), task)
+            try:
+                for chunk in llm.stream_chat(messages, model=route["model"], temperature=temperature, options=options,
+                                             cancel=cancel, timeout=limits["idle"],
+                                             first_token_timeout=limits["first_token"], format=format):
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                        self.record(task, route["model"], first_token)
+                    yield chunk
+            except GeneratorExit:
+                raise
+            except Exception:
+                if first_token is None and not (cancel is not None and cancel.cancelled):
+                    self.record(task, route["model"], time.perf_counter() - started, ok=False)
+                raise
+            if first_token is None and not (cancel is not None and cancel.cancelled):
+                self.record(task, route["model"], time.perf_counter() - started, ok=False)
+
+
+# Process-wide router shared by the UI, the CLI and the HTTP server
+router = ModelRouter()
+
+
+def routed_completion(task, messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, timeout=None,
+                      description=None, session=None, cancel=None):
+    return router.complete(task, messages, model=model, temperature=temperature, timeout=timeout,
+                           description=description, session=session, cancel=cancel)
+
+
+def routed_stream(task, messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, session=None, cancel=None,
+                  format=None):
+    return router.stream(task, messages, model=model, temperature=temperature, session=session, cancel=cancel,
+                         format=format)
@@ -0,0 +1,175 @@
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .cancel import GenerationCancelled
+from .endpoints import configured_hosts
+from .logs import add_log
+
+# Process-wide scheduler for generation requests. At most `max_concurrent`
+# requests run at once (the backend's parallel slots: OLLAMA_NUM_PARALLEL per
+# endpoint), a session runs at most `per_session` of them, and waiting requests
+# are started interactive first, then in arrival order. When the queue is full
+# new background requests are refused; interactive ones are refused only when
+# the queue is full of interactive requests. Speculative requests (work done
+# ahead of being asked for) only start when nothing else runs or waits, and
+# are cancelled as soon as any other request arrives.
+
+INTERACTIVE = 0
+BACKGROUND = 1
+SPECULATIVE = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", SPECULATIVE: "speculative"}
+# Tasks a user is waiting on; everything else (tests, docs, specs, summaries) is background
+INTERACTIVE_TASKS = {"chat"}
+# Seconds between queue position updates while waiting
+WAIT_POLL = 0.5
+
+# Who is asking, for the per-session quota. The Streamlit script sets the
+# browser session, the HTTP server the project; unset means one shared session.
+current_session = ContextVar("current_session", default="default")
+# Called with the request's queue position while it waits, then with 0 once it runs
+queue_observer = ContextVar("queue_observer", default=None)
+# Priority for requests made in this context; unset means by task
+current_priority = ContextVar("current_priority", default=None)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class RequestScheduler:
+    def __init__(self, max_concurrent=1, per_session=2, max_queue=32):
+        self.max_concurrent = max_concurrent
+        self.per_session = per_session
+        self.max_queue = max_queue
+        self._waiting = []  # (priority, sequence, session), kept sorted
+        self._running = {}  # session -> requests running
+        self._speculative = {}  # running speculative ticket -> its cancel token
+        self._preempted = 0
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls):
+        parallel = int(os.environ.get("OLLAMA_NUM_PARALLEL", "1"))
+        return cls(
+            max_concurrent=int(os.environ.get("ASSISTANT_MAX_CONCURRENT", parallel * len(configured_hosts()))),
+            per_session=int(os.environ.get("ASSISTANT_SESSION_CONCURRENCY", "2")),
+            max_queue=int(os.environ.get("ASSISTANT_MAX_QUEUE", "32"))
+        )
+
+    # Function to check whether a waiting ticket may start now: a free slot,
+    # room in its session's quota and no runnable ticket ahead of it
+    def _runnable(self, ticket):
+        if sum(self._running.values()) >= self.max_concurrent:
+            return False
+        if ticket[0] == SPECULATIVE and (
+                len(self._speculative) < sum(self._running.values()) or
+                any(waiting[0] != SPECULATIVE for waiting in self._waiting)):
+            return False
+        for waiting in self._waiting:
+            if self._running.get(waiting[2], 0) < self.per_session:
+                return waiting == ticket
+        return False
+
+    # Function to give a ticket's 1-based position among the waiting requests
+    def _position(self, ticket):
+        return self._waiting.index(ticket) + 1
+
+    def _admit(self, ticket):
+        if ticket[0] == INTERACTIVE:
+            full = sum(1 for waiting in self._waiting if waiting[0] == INTERACTIVE) >= self.max_queue
+        else:
+            full = len(self._waiting) >= self.max_queue
+        if full:
+            raise QueueFull(f"The generation queue is full ({len(self._waiting)} waiting), try again shortly")
+        self._waiting.append(ticket)
+        self._waiting.sort()
+        self._cond.notify_all()  # positions behind the new ticket moved
+        if ticket[0] == SPECULATIVE:
+            return []
+        # Real work arrived: speculative requests give up their slots
+        preempted = [token for token in self._speculative.values() if token is not None and not token.cancelled]
+        self._preempted += len(preempted)
+        return preempted
+
+    # Context manager holding one backend slot for the duration of a request;
+    # a cancelled `cancel` token takes a waiting request out of the queue
+    @contextmanager
+    def slot(self, task=None, session=None, priority=None, cancel=None):
+        session = session or current_session.get()
+        if priority is None:
+            priority = current_priority.get()
+        if priority is None:
+            priority = INTERACTIVE if task in INTERACTIVE_TASKS else BACKGROUND
+        observer = queue_observer.get()
+        ticket = (priority, next(self._sequence), session)
+
+        with self._cond:
+            preempted = self._admit(ticket)
+        for token in preempted:
+            token.cancel()
+        last = None
+        try:
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    raise GenerationCancelled(f"{task or 'Request'} cancelled while queued")
+                with self._cond:
+                    if self._runnable(ticket):
+                        self._waiting.remove(ticket)
+                        self._running[session] = self._running.get(session, 0) + 1
+                        if priority == SPECULATIVE:
+                            self._speculative[ticket] = cancel
+                        self._cond.notify_all()
+                        break
+                    position = self._position(ticket)
+                    if position == last:
+                        self._cond.wait(WAIT_POLL)
+                        continue
+                if last is None:
+                    add_log("INFO", f"Queued {task or 'request'} ({PRIORITY_NAMES[priority]}) at position {position}")
+                last = position
+                if observer is not None:
+                    observer(position)
+        except BaseException:
+            with self._cond:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                self._cond.notify_all()
+            raise
+
+        if observer is not None and last is not None:
+            observer(0)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running[session] -= 1
+                if not self._running[session]:
+                    del self._running[session]
+                self._speculative.pop(ticket, None)
+                self._cond.notify_all()
+
+    # Function to check whether nothing runs or waits
+    def idle(self):
+        with self._cond:
+            return not self._running and not self._waiting
+
+    # Function to describe the scheduler's load
+    def stats(self):
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "per_session": self.per_session,
+                "max_queue": self.max_queue,
+                "running": dict(self._running),
+                "waiting": {name: sum(1 for waiting in self._waiting if waiting[0] == priority)
+                            for priority, name in PRIORITY_NAMES.items()},
+                "preempted": self._preempted,
+            }
+
+
+# Process-wide scheduler shared by every routed request
+scheduler = RequestScheduler.from_env()
@@ -0,0 +1,359 @@
+# HTTP API for the assistant. Serves chat as Server-Sent Events, keeps projects
+# in a store and runs builds/generators as background jobs, so several clients
+# (the Streamlit UI, IDE plugins, scripts) can share one Ollama backend.
+#
+#     pip install fastapi uvicorn
+#     uvicorn springboot_assistant.server:app --workers 1 --port 8000
+
+import json
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from .cancel import CancelToken
+from .context import ConversationSummarizer
+from .core import project_files, register_blocks, register_code_blocks
+from .endpoints import get_pool
+from .fences import FenceScanner
+from .generators import build_chat_messages, register_edits
+from .jobs import JobManager
+from .llm import DEFAULT_MODEL, DEFAULT_TEMPERATURE, test_ollama_connection
+from .logs import add_log
+from .pipeline import PROJECT_TASKS, run_task
+from .retrieval import RetrievalIndex
+from .router import router, routed_stream
+from .scheduler import current_session, scheduler
+from .speculative import pregenerate_project, pregenerator
+from .store import export_project, file_hash, import_project, open_store
+from .structured import CODE_SCHEMA, StructuredParser, parse_structured, to_markdown
+from .timeouts import policy as timeout_policy
+
+store = open_store()
+jobs = JobManager()
+# Per-project chat state kept between turns, for at most MAX_PROJECT_STATE
+# projects each; the least recently used go first. Rolling conversation
+# summaries are built in the background; retrieval indexes rank the files
+# sent with chat turns.
+MAX_PROJECT_STATE = 64
+summarizers = OrderedDict()
+retrievers = OrderedDict()
+# Cancel tokens of the chat streams in progress, by generation id
+generations = {}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    jobs.shutdown()
+
+
+app = FastAPI(title="Spring Boot AI Code Assistant", lifespan=lifespan)
+
+
+class ProjectRequest(BaseModel):
+    metadata: dict = {}
+
+
+class ChatRequest(BaseModel):
+    prompt: str
+    project_id: Optional[str] = None
+    history: List[dict] = []
+    model: str = DEFAULT_MODEL
+    temperature: float = DEFAULT_TEMPERATURE
+    structured: bool = False
+    edit: bool = False
+    pregenerate: bool = False
+
+
+class TaskRequest(BaseModel):
+    task: str
+    filename: Optional[str] = None
+    model: str = DEFAULT_MODEL
+    temperature: float = DEFAULT_TEMPERATURE
+    include_spring_initializr: bool = False
+    enrich: bool = False
+
+
+# Function to format one Server-Sent Event
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Function to get a project's entry in one of the per-project state caches,
+# creating it on first use (a retrieval index kept between turns only indexes
+# new or changed files again)
+def project_state(cache, project_id, create):
+    entry = cache.pop(project_id, None)
+    if entry is None:
+        entry = create()
+    cache[project_id] = entry
+    while len(cache) > MAX_PROJECT_STATE:
+        cache.popitem(last=False)
+    return entry
+
+
+# Function to describe a project without its file contents
+def project_summary(project):
+    return {
+        "id": project["id"],
+        "project_metadata": project["project_metadata"],
+        "file_categories": project["file_categories"],
+        "files": sorted(project["generated_files"]),
+        "test_files": sorted(project["test_files"]),
+        "messages": len(project["messages"]),
+    }
+
+
+# Function to describe a job; binary results are exposed via /jobs/{id}/download
+def job_summary(job):
+    summary = {key: value for key, value in job.items() if key != "result"}
+    if isinstance(job["result"], bytes):
+        summary["result"] = {"download": f"/jobs/{job['id']}/download", "size": len(job["result"])}
+    else:
+        summary["result"] = job["result"]
+    return summary
+
+
+def require_project(project_id):
+    project = store.get(project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail=f"Unknown project: {project_id}")
+    return project
+
+
+@app.get("/health")
+def health():
+    connected, models = test_ollama_connection()
+    return {"ollama": connected, "models": models, "endpoints": get_pool().describe()}
+
+
+# Measured latency per task and model, for tuning the routing policy
+@app.get("/routing")
+def routing():
+    return {"policy": router.policy, "stats": router.stats(), "rates": timeout_policy.describe()}
+
+
+# Requests running and waiting for a backend slot, and the speculative pre-generation
+@app.get("/queue")
+def queue():
+    return {**scheduler.stats(), "pregeneration": pregenerator.stats()}
+
+
+@app.post("/projects", status_code=201)
+def create_project(request: ProjectRequest):
+    return project_summary(store.create(request.metadata))
+
+
+@app.get("/projects")
+def list_projects():
+    return [project_summary(project) for project in store.list()]
+
+
+@app.get("/projects/{project_id}")
+def get_project(project_id: str):
+    return project_summary(require_project(project_id))
+
+
+@app.delete("/projects/{project_id}", status_code=204)
+def delete_project(project_id: str):
+    if not store.delete(project_id):
+        raise HTTPException(status_code=404, detail=f"Unknown project: {project_id}")
+    summarizers.pop(project_id, None)
+    retrievers.pop(project_id, None)
+
+
+@app.get("/projects/{project_id}/export")
+def export(project_id: str):
+    project = require_project(project_id)
+    try:
+        data = export_project(project)
+    finally:
+        store.release(project)
+    return Response(
+        data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{project_id}.sbproj"'}
+    )
+
+
+@app.post("/projects/import", status_code=201)
+async def import_(request: Request):
+    try:
+        project = import_project(store, await request.body())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid project export: {str(e)}")
+    store.release(project)
+    return project_summary(project)
+
+
+# Serves one file; the ETag is the content hash, so clients can revalidate
+# with If-None-Match and only receive the bytes when the file changed
+@app.get("/projects/{project_id}/files/{filename:path}")
+def get_file(project_id: str, filename: str, request: Request):
+    project = require_project(project_id)
+    try:
+        files = project["generated_files"] if filename in project["generated_files"] else project["test_files"]
+        if filename not in files:
+            raise HTTPException(status_code=404, detail=f"Unknown file: {filename}")
+        etag = f'"{file_hash(files, filename)}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        content = files[filename]
+    finally:
+        store.release(project)
+    return Response(content, media_type="text/plain", headers={"ETag": etag})
+
+
+# Streams the assistant's answer as `chunk` events after a `start` event carrying
+# the generation id (for POST /chat/{id}/cancel), and a `block` event (language
+# and path hint) as soon as each code block closes. With a project_id the turn is
+# recorded in that project and a final `done` event lists the files extracted;
+# a cancelled turn keeps the partial answer and is marked `cancelled`. With
+# "structured": true the chunks are the JSON answer of structured.py, `block`
+# events come as each file object closes, and the turn is recorded as Markdown.
+# With "edit": true (and a project) the answer's edits are applied to the
+# project's files; `done` then also lists edits that did not apply. With
+# "pregenerate": true the new classes' tests, the documentation and the OpenAPI
+# spec are generated while the backend is idle, for the project's jobs to use.
+@app.post("/chat")
+def chat(request: ChatRequest):
+    project = require_project(request.project_id) if request.project_id else None
+    history = project["messages"] if project else request.history
+    summarizer = project_state(summarizers, project["id"], ConversationSummarizer) if project else None
+    edit = request.edit and project is not None
+    base_hashes = {filename: file_hash(files, filename)
+                   for files in (project["generated_files"], project["test_files"])
+                   for filename in files} if edit else None
+    # A project's code and tests that are relevant to the prompt go with every turn
+    messages = build_chat_messages(history, request.prompt, summarizer=summarizer, model=request.model,
+                                   project_files=project_files(project) if project else None,
+                                   retriever=project_state(retrievers, project["id"], RetrievalIndex) if project else None,
+                                   structured=request.structured and not edit, edit=edit)
+
+    generation_id = uuid.uuid4().hex
+    token = generations[generation_id] = CancelToken()
+
+    def turn():
+        full_response = ""
+        structured = request.structured and not edit
+        scanner = StructuredParser() if structured else FenceScanner()
+        yield sse_event("start", {"id": generation_id})
+        try:
+            for chunk in routed_stream("chat", messages, model=request.model, temperature=request.temperature,
+                                       session=request.project_id or "api", cancel=token,
+                                       format=CODE_SCHEMA if structured else None):
+                full_response += chunk
+                yield sse_event("chunk", {"content": chunk})
+                for block in scanner.feed(chunk):
+                    yield sse_event("block", {"language": block["language"], "path": block["path"],
+                                              "length": len(block["code"])})
+        except Exception as e:
+            if not token.cancelled:
+                add_log("ERROR", f"Error during response generation: {str(e)}")
+                yield sse_event("error", {"detail": str(e)})
+        finally:
+            generations.pop(generation_id, None)
+
+        files, conflicts = [], []
+        if project is not None and full_response.strip():
+            answer = parse_structured(full_response) if structured else None
+            project["messages"].append({"role": "user", "content": request.prompt})
+            project["messages"].append({"role": "assistant",
+                                        "content": to_markdown(answer) if answer else full_response})
+            if edit:
+                file_info, results = register_edits(project, full_response, request.prompt, base_hashes,
+                                                    model=request.model, temperature=request.temperature)
+                conflicts = [{"filename": result["filename"], "detail": result["detail"]}
+                             for result in results if result["status"] == "conflict"]
+            elif answer:
+                file_info = register_blocks(project, answer["files"])
+            else:
+                file_info = register_code_blocks(project, full_response)
+            files = [{key: info[key] for key in ("filename", "type", "category")} for info in file_info]
+            store.save(project)
+            if request.pregenerate and file_info:
+                pregenerate_project(project, [info["filename"] for info in file_info], model=request.model,
+                                    temperature=request.temperature, session=f"project:{project['id']}")
+        yield sse_event("done", {"length": len(full_response), "files": files, "conflicts": conflicts,
+                                 "cancelled": token.cancelled})
+
+    def events():
+        # The project's loaded contents go back when the turn ends, also when
+        # the client disconnects
+        try:
+            yield from turn()
+        finally:
+            if project is not None:
+                store.release(project)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/chat/{generation_id}/cancel", status_code=202)
+def cancel_chat(generation_id: str):
+    token = generations.get(generation_id)
+    if token is None:
+        raise HTTPException(status_code=404, detail=f"No chat in progress: {generation_id}")
+    token.cancel()
+    return {"id": generation_id, "cancelled": True}
+
+
+@app.post("/projects/{project_id}/jobs", status_code=202)
+def submit_job(project_id: str, request: TaskRequest):
+    project = require_project(project_id)
+    if request.task not in PROJECT_TASKS:
+        raise HTTPException(status_code=400, detail=f"Unknown task: {request.task}. Expected one of {PROJECT_TASKS}")
+
+    def run():
+        current_session.set(f"project:{project_id}")
+        try:
+            result = run_task(
+                project,
+                request.task,
+                model=request.model,
+                temperature=request.temperature,
+                filename=request.filename,
+                include_spring_initializr=request.include_spring_initializr,
+                enrich=request.enrich
+            )
+        finally:
+            # Whatever was written before a failure or cancel is kept
+            try:
+                store.save(project)
+            finally:
+                store.release(project)
+        return result
+
+    return job_summary(jobs.submit(request.task, run))
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job_summary(job)
+
+
+@app.post("/jobs/{job_id}/cancel", status_code=202)
+def cancel_job(job_id: str):
+    if jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"id": job_id, "cancelled": jobs.cancel(job_id)}
+
+
+@app.get("/jobs/{job_id}/download")
+def download_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None or not isinstance(job["result"], bytes):
+        raise HTTPException(status_code=404, detail=f"No downloadable result for job: {job_id}")
+    return Response(
+        job["result"],
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.zip"'}
+    )
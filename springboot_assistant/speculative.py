@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .cancel import CancelToken, cancel_token
+from .generators import enrich_openapi_spec, generate_documentation, generate_tests, is_incomplete
+from .incremental import plan_tests
+from .llm import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from .logs import add_log
+from .openapi import build_openapi_spec, render_openapi_yaml
+from .scheduler import SPECULATIVE, current_priority, current_session, scheduler
+from .store import content_hash, file_hash
+
+# Speculative pre-generation. When new classes appear in a project, their
+# tests, the documentation and the enriched OpenAPI spec are generated in the
+# background while the backend has nothing else to do, so the buttons that
+# ask for them can answer at once. Requests run at the scheduler's
+# SPECULATIVE priority: they only start when no other request runs or waits,
+# and any new request cancels them (they are queued again for the next idle
+# spell). Results are kept by the hash of what they were generated from, so
+# a result is only used while its source is unchanged.
+
+# Results kept; the least recently used go first
+MAX_RESULTS = 128
+# Jobs waiting; the oldest are dropped first
+MAX_PENDING = 64
+# Seconds the backend must stay idle before a job starts
+IDLE_DELAY = 2.0
+# Seconds between idle checks
+IDLE_POLL = 0.5
+
+
+# Function to get the result key of a class's tests
+def tests_key(content, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    return ("tests", content_hash(content), model, temperature)
+
+
+# Function to get the result key of a project-wide artifact (documentation,
+# openapi): the hashes of the project's files and its metadata
+def project_key(kind, files, metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    source = json.dumps([sorted((filename, file_hash(files, filename)) for filename in files), metadata],
+                        sort_keys=True, default=str)
+    return (kind, content_hash(source), model, temperature)
+
+
+# One worker thread running queued jobs while the backend is idle. A job is
+# a function returning the result to keep, or None when there is nothing to
+# keep (a failed or interrupted generation); it is queued once per key.
+class Pregenerator:
+    def __init__(self, max_results=MAX_RESULTS, max_pending=MAX_PENDING, idle_delay=IDLE_DELAY):
+        self.max_results = max_results
+        self.max_pending = max_pending
+        self.idle_delay = idle_delay
+        self._results = OrderedDict()  # key -> result
+        self._pending = OrderedDict()  # key -> (job, session)
+        self._running = None
+        self._thread = None
+        self._cond = threading.Condition()
+        self._counts = {"completed": 0, "discarded": 0, "preempted": 0, "hits": 0, "misses": 0}
+
+    # Function to queue a job unless its result is kept or it is queued already
+    def schedule(self, key, job, session=None):
+        with self._cond:
+            if key in self._results or key in self._pending or key == self._running:
+                return False
+            self._pending[key] = (job, session or current_session.get())
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="pregenerator", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return True
+
+    # Function to get a kept result, or None
+    def result(self, key):
+        with self._cond:
+            if key not in self._results:
+                self._counts["misses"] += 1
+                return None
+            self._counts["hits"] += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+
+    # Function to describe the queue and the kept results
+    def stats(self):
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "running": self._running[0] if self._running else None,
+                "results": len(self._results),
+                **self._counts,
+            }
+
+    # Function to wait until the backend has been idle for `idle_delay` seconds
+    def _wait_for_idle(self):
+        idle_since = None
+        while True:
+            if not scheduler.idle():
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= self.idle_delay:
+                return
+            time.sleep(IDLE_POLL)
+
+    def _work(self):
+        current_priority.set(SPECULATIVE)
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._thread = None
+                    return
+                key, (job, session) = self._pending.popitem(last=False)
+                self._running = key
+            self._wait_for_idle()
+
+            token = CancelToken()
+            cancel_token.set(token)
+            current_session.set(session)
+            try:
+                result = job()
+            except Exception as e:
+                add_log("WARNING", f"Pre-generation of {key[0]} failed: {str(e)}")
+                result = None
+
+            with self._cond:
+                self._running = None
+                if token.cancelled:
+                    # Preempted by real work: try again at the next idle spell
+                    self._counts["preempted"] += 1
+                    self._pending.setdefault(key, (job, session))
+                elif result is None:
+                    self._counts["discarded"] += 1
+                else:
+                    self._counts["completed"] += 1
+                    self._results[key] = result
+                    while len(self._results) > self.max_results:
+                        self._results.popitem(last=False)
+
+
+# Function to queue the pre-generation of a class's tests; the result is
+# generate_tests()'s (test code, test class name)
+def pregenerate_tests(content, filename, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, session=None):
+    def job():
+        test_code, test_class_name = generate_tests(content, filename, model=model, temperature=temperature)
+        if not test_code or is_incomplete(test_code):
+            return None
+        add_log("INFO", f"Pre-generated tests for {filename}")
+        return test_code, test_class_name
+
+    return pregenerator.schedule(tests_key(content, model, temperature), job, session)
+
+
+# Function to queue the pre-generation of the project documentation. Files
+# are ranked by keyword search, as the session's embeddings are not shared.
+def pregenerate_documentation(files, metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, session=None):
+    files, metadata = dict(files), dict(metadata)
+
+    def job():
+        documentation = generate_documentation(files, metadata, model=model, temperature=temperature)
+        if is_incomplete(documentation) or documentation.startswith("Error generating documentation"):
+            return None
+        add_log("INFO", "Pre-generated project documentation")
+        return documentation
+
+    return pregenerator.schedule(project_key("documentation", files, metadata, model, temperature), job, session)
+
+
+# Function to queue the enrichment of the project's OpenAPI spec; nothing is
+# queued for a project without controllers
+def pregenerate_openapi(files, metadata, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, session=None):
+    files, metadata = dict(files), dict(metadata)
+    spec = build_openapi_spec(files, metadata)
+    if spec is None:
+        return False
+    skeleton = render_openapi_yaml(spec)
+
+    def job():
+        enriched = enrich_openapi_spec(skeleton, list(spec["paths"]), model, temperature)
+        if enriched == skeleton:
+            return None  # the enrichment failed or dropped paths
+        add_log("INFO", "Pre-generated the enriched OpenAPI specification")
+        return enriched
+
+    return pregenerator.schedule(project_key("openapi", files, metadata, model, temperature), job, session)
+
+
+# Function to queue everything worth pre-generating after `filenames` were
+# added to or changed in a project: tests for its main classes without an
+# up-to-date test (see incremental.py), then the documentation and the
+# OpenAPI spec. Returns the number of jobs queued.
+def pregenerate_project(project, filenames, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, session=None):
+    files = project["generated_files"]
+    main = set(project["file_categories"]["main"])
+    queued = 0
+    # Classes whose recorded test is up to date need none
+    for filename, _ in plan_tests(project, [filename for filename in filenames if filename in main], model)["generate"]:
+        queued += pregenerate_tests(files[filename], filename, model, temperature, session)
+    queued += pregenerate_documentation(files, project["project_metadata"], model, temperature, session)
+    queued += pregenerate_openapi(files, project["project_metadata"], model, temperature, session)
+    return queued
+
+
+# Process-wide pre-generator shared by every session
+pregenerator = Pregenerator()
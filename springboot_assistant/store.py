@@ -0,0 +1,519 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import MutableMapping
+
+from .blobs import MAX_VERSIONS, VersionHistory, content_hash, default_blobs, make_delta
+from .core import new_project
+
+EXPORT_FORMAT_VERSION = 1
+
+
+# Function to get a file's content hash, without loading the file when the
+# store already knows it
+def file_hash(files, filename):
+    if hasattr(files, "hash_of"):
+        return files.hash_of(filename)
+    return content_hash(files[filename])
+
+
+# In-memory project store keyed by project ID. Projects use the same dict
+# layout as new_project(), so every core function accepts them directly.
+class MemoryProjectStore:
+    def __init__(self):
+        self._projects = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, metadata=None, project_id=None):
+        project_id = project_id or uuid.uuid4().hex
+        project = new_project(metadata)
+        project["id"] = project_id
+        with self._lock:
+            self._projects[project_id] = project
+        return project
+
+    def get(self, project_id):
+        with self._lock:
+            return self._projects.get(project_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._projects.values())
+
+    def delete(self, project_id):
+        with self._lock:
+            project = self._projects.pop(project_id, None)
+        if project is None:
+            return False
+        for key in ("generated_files", "test_files"):
+            project[key].close()
+        return True
+
+    # Persist changes made to a project; nothing to do for the in-memory store
+    def save(self, project):
+        with self._lock:
+            self._projects[project["id"]] = project
+
+    # Drop cached file contents; in-memory projects have nowhere to reload from
+    def evict(self, project):
+        pass
+
+    # Hand back the file contents of a project that is no longer used; the
+    # store keeps in-memory projects until delete(), which releases them
+    def release(self, project):
+        pass
+
+    # Function to map a client session to its project, creating one if needed
+    def session_project(self, session_id, metadata=None):
+        with self._lock:
+            project = self._projects.get(self._sessions.get(session_id))
+        if project is None:
+            project = self.create(metadata)
+        self.attach_session(session_id, project["id"])
+        return project
+
+    # Function to point a client session at another project (e.g. after an import)
+    def attach_session(self, session_id, project_id):
+        with self._lock:
+            self._sessions[session_id] = project_id
+
+
+# Dict of filename -> content whose contents are read from SQLite on first
+# access. Only the names and hashes are loaded up front; writes are tracked so
+# save() only touches the files that changed. Replaced contents become
+# earlier versions, stored as deltas in the file_versions table. Loaded
+# contents are held in the BlobStore, so sessions and requests reading the
+# same content share it; evict() and close() hand them back.
+class LazyFiles(VersionHistory, MutableMapping):
+    def __init__(self, store, project_id, kind, hashes, blobs=None):
+        self._store = store
+        self._project_id = project_id
+        self._kind = kind
+        self._blobs = default_blobs if blobs is None else blobs
+        self._hashes = dict(hashes)
+        self._loaded = set()
+        self._dirty = set()
+        self._deleted = set()
+        self._new_versions = {}  # filename -> [(hash, replaced, delta)] not saved yet
+
+    def __getitem__(self, filename):
+        if filename not in self._hashes:
+            raise KeyError(filename)
+        if filename not in self._loaded:
+            self._blobs.put(self._store._read_file(self._project_id, self._kind, filename), self._hashes[filename])
+            self._loaded.add(filename)
+        return self._blobs.get(self._hashes[filename])
+
+    def __setitem__(self, filename, content):
+        digest = content_hash(content)
+        previous = self._hashes.get(filename)
+        if previous == digest:
+            return
+        self._blobs.put(content, digest)
+        if previous is not None:
+            self._new_versions.setdefault(filename, []).append(
+                (previous, time.time(), make_delta(content, self[filename])))
+            self._blobs.release(previous)
+        self._hashes[filename] = digest
+        self._loaded.add(filename)
+        self._dirty.add(filename)
+
+    def __delitem__(self, filename):
+        digest = self._hashes.pop(filename)
+        if filename in self._loaded:
+            self._loaded.discard(filename)
+            self._blobs.release(digest)
+        self._new_versions.pop(filename, None)
+        self._dirty.discard(filename)
+        # Saving removes the stored file and its versions before writing
+        # anything added again under the same name
+        self._deleted.add(filename)
+
+    def __iter__(self):
+        return iter(list(self._hashes))
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, filename):
+        return filename in self._hashes
+
+    # Content hash of a file without loading it
+    def hash_of(self, filename):
+        return self._hashes[filename]
+
+    def _version_entries(self, filename):
+        if filename not in self._hashes:
+            raise KeyError(filename)
+        entries = [] if filename in self._deleted else self._store._read_versions(
+            self._project_id, self._kind, filename)
+        number = entries[-1][0] if entries else 0
+        for digest, replaced, delta in self._new_versions.get(filename, []):
+            number += 1
+            entries.append((number, digest, replaced, delta))
+        return entries[-MAX_VERSIONS:]
+
+    # Forget loaded contents that are already persisted
+    def evict(self):
+        for filename in list(self._loaded):
+            if filename not in self._dirty:
+                self._loaded.discard(filename)
+                self._blobs.release(self._hashes[filename])
+
+    # Function to hand back every loaded content when the project is dropped;
+    # changes not saved yet are lost and the mapping is empty afterwards
+    def close(self):
+        for filename in self._loaded:
+            self._blobs.release(self._hashes[filename])
+        self._hashes.clear()
+        self._loaded.clear()
+        self._dirty.clear()
+        self._deleted.clear()
+        self._new_versions.clear()
+
+
+# Function to hash a chat message, to tell which saved messages changed
+def _message_hash(message):
+    return content_hash(f"{message['role']}\0{message['content']}")
+
+
+# Durable project store in SQLite (WAL mode, one connection per thread).
+# Messages and metadata load eagerly; file contents are zlib-compressed and
+# loaded lazily through LazyFiles, with earlier versions kept as deltas.
+class SQLiteProjectStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS projects (
+                id TEXT PRIMARY KEY,
+                metadata TEXT NOT NULL,
+                file_categories TEXT NOT NULL,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                content BLOB NOT NULL,
+                PRIMARY KEY (project_id, kind, name)
+            );
+            CREATE TABLE IF NOT EXISTS file_versions (
+                project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                replaced REAL NOT NULL,
+                delta BLOB NOT NULL,
+                PRIMARY KEY (project_id, kind, name, version)
+            );
+            CREATE TABLE IF NOT EXISTS test_sources (
+                project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+                name TEXT NOT NULL,
+                source TEXT NOT NULL,
+                source_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                PRIMARY KEY (project_id, name)
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (project_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+                last_seen REAL NOT NULL
+            );
+        """)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def _read_file(self, project_id, kind, filename):
+        row = self._connection().execute(
+            "SELECT content FROM files WHERE project_id = ? AND kind = ? AND name = ?",
+            (project_id, kind, filename)
+        ).fetchone()
+        if row is None:
+            raise KeyError(filename)
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def _read_versions(self, project_id, kind, filename):
+        return self._connection().execute(
+            "SELECT version, hash, replaced, delta FROM file_versions "
+            "WHERE project_id = ? AND kind = ? AND name = ? ORDER BY version",
+            (project_id, kind, filename)
+        ).fetchall()
+
+    def create(self, metadata=None, project_id=None):
+        project = new_project(metadata)
+        project["id"] = project_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO projects (id, metadata, file_categories, created, updated) VALUES (?, ?, ?, ?, ?)",
+                (project["id"], json.dumps(project["project_metadata"]), json.dumps(project["file_categories"]), now, now)
+            )
+        return self.get(project["id"])
+
+    def get(self, project_id):
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT metadata, file_categories FROM projects WHERE id = ?", (project_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        hashes = {"generated": {}, "test": {}}
+        for kind, name, file_hash in connection.execute(
+                "SELECT kind, name, hash FROM files WHERE project_id = ? ORDER BY rowid", (project_id,)):
+            hashes[kind][name] = file_hash
+
+        messages = [
+            {"role": role, "content": content}
+            for role, content in connection.execute(
+                "SELECT role, content FROM messages WHERE project_id = ? ORDER BY seq", (project_id,))
+        ]
+
+        test_sources = {
+            name: {"source": source, "source_hash": source_hash, "model": model, "prompt_hash": prompt_hash}
+            for name, source, source_hash, model, prompt_hash in connection.execute(
+                "SELECT name, source, source_hash, model, prompt_hash FROM test_sources WHERE project_id = ?",
+                (project_id,))
+        }
+
+        return {
+            "id": project_id,
+            "messages": messages,
+            "saved_messages": [_message_hash(message) for message in messages],
+            "generated_files": LazyFiles(self, project_id, "generated", hashes["generated"]),
+            "test_files": LazyFiles(self, project_id, "test", hashes["test"]),
+            "file_categories": json.loads(row[1]),
+            "project_metadata": json.loads(row[0]),
+            "test_sources": test_sources,
+        }
+
+    def list(self):
+        rows = self._connection().execute("SELECT id FROM projects ORDER BY updated DESC").fetchall()
+        return [self.get(project_id) for (project_id,) in rows]
+
+    def delete(self, project_id):
+        with self._connection() as connection:
+            cursor = connection.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        return cursor.rowcount > 0
+
+    # Write metadata, new messages and changed files. Accepts any mapping with
+    # the project layout, including st.session_state. Messages are merged
+    # with what other copies of the project saved since this one was loaded
+    # (see _save_messages); the write lock is taken up front for that.
+    def save(self, project):
+        project_id = project["id"]
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT INTO projects (id, metadata, file_categories, created, updated) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET metadata = excluded.metadata, "
+                "file_categories = excluded.file_categories, updated = excluded.updated",
+                (project_id, json.dumps(project["project_metadata"]), json.dumps(project["file_categories"]),
+                 time.time(), time.time())
+            )
+
+            self._save_messages(connection, project)
+
+            for kind, key in (("generated", "generated_files"), ("test", "test_files")):
+                self._save_files(connection, project_id, kind, project[key])
+
+            # A handful of rows per project: rewritten whole
+            connection.execute("DELETE FROM test_sources WHERE project_id = ?", (project_id,))
+            connection.executemany(
+                "INSERT INTO test_sources (project_id, name, source, source_hash, model, prompt_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(project_id, name, record["source"], record["source_hash"], record["model"], record["prompt_hash"])
+                 for name, record in project.get("test_sources", {}).items()]
+            )
+
+    # Function to write a project's messages against the stored ones. The
+    # project's "saved_messages" hashes say what it last read or wrote:
+    # messages past them are new and go after whatever is stored now (another
+    # copy may have added its own turn meanwhile), messages that differ from
+    # them were edited and are rewritten, and a shorter list than them means
+    # the history was cut and the rest is deleted. The project's messages
+    # then become the merged list.
+    def _save_messages(self, connection, project):
+        project_id = project["id"]
+        messages = project["messages"]
+        base = project.get("saved_messages", [])
+        if len(messages) < len(base):
+            connection.execute("DELETE FROM messages WHERE project_id = ? AND seq >= ?", (project_id, len(messages)))
+        connection.executemany(
+            "UPDATE messages SET role = ?, content = ? WHERE project_id = ? AND seq = ?",
+            [(messages[seq]["role"], messages[seq]["content"], project_id, seq)
+             for seq in range(min(len(base), len(messages))) if _message_hash(messages[seq]) != base[seq]]
+        )
+        (stored,) = connection.execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        connection.executemany(
+            "INSERT INTO messages (project_id, seq, role, content) VALUES (?, ?, ?, ?)",
+            [(project_id, stored + offset, message["role"], message["content"])
+             for offset, message in enumerate(messages[len(base):])]
+        )
+        if stored > len(base) or len(messages) < len(base):
+            merged = [{"role": role, "content": content} for role, content in connection.execute(
+                "SELECT role, content FROM messages WHERE project_id = ? ORDER BY seq", (project_id,))]
+            messages[:] = merged
+        project["saved_messages"] = [_message_hash(message) for message in messages]
+
+    def _save_files(self, connection, project_id, kind, files):
+        new_versions = {}
+        if isinstance(files, LazyFiles):
+            changed = [(name, files[name]) for name in files._dirty]
+            removed = list(files._deleted)
+            new_versions = files._new_versions
+        else:
+            existing = dict(connection.execute(
+                "SELECT name, hash FROM files WHERE project_id = ? AND kind = ?", (project_id, kind)
+            ).fetchall())
+            changed = [(name, content) for name, content in files.items() if existing.get(name) != content_hash(content)]
+            removed = [name for name in existing if name not in files]
+            for name, content in changed:
+                # Versions kept in memory (VersionedFiles) since the stored
+                # content, or all of them for a file not stored yet
+                history = files._version_entries(name) if isinstance(files, VersionHistory) else []
+                hashes = [digest for _, digest, _, _ in history]
+                if name in existing and existing[name] in hashes:
+                    start = len(hashes) - 1 - hashes[::-1].index(existing[name])
+                    versions = history[start:]
+                elif name in existing:
+                    versions = [(None, existing[name], time.time(),
+                                 make_delta(content, self._read_file(project_id, kind, name)))]
+                else:
+                    versions = history
+                if versions:
+                    new_versions[name] = [(digest, replaced, delta) for _, digest, replaced, delta in versions]
+
+        # Removals first: a file deleted and added again starts a new history
+        for table in ("files", "file_versions"):
+            connection.executemany(
+                f"DELETE FROM {table} WHERE project_id = ? AND kind = ? AND name = ?",
+                [(project_id, kind, name) for name in removed]
+            )
+        connection.executemany(
+            "INSERT OR REPLACE INTO files (project_id, kind, name, hash, size, content) VALUES (?, ?, ?, ?, ?, ?)",
+            [(project_id, kind, name, content_hash(content), len(content), zlib.compress(content.encode("utf-8")))
+             for name, content in changed]
+        )
+        for name, versions in new_versions.items():
+            (number,) = connection.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM file_versions WHERE project_id = ? AND kind = ? AND name = ?",
+                (project_id, kind, name)
+            ).fetchone()
+            connection.executemany(
+                "INSERT INTO file_versions (project_id, kind, name, version, hash, replaced, delta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(project_id, kind, name, number + offset, digest, replaced, delta)
+                 for offset, (digest, replaced, delta) in enumerate(versions, 1)]
+            )
+            connection.execute(
+                "DELETE FROM file_versions WHERE project_id = ? AND kind = ? AND name = ? AND version <= ?",
+                (project_id, kind, name, number + len(versions) - MAX_VERSIONS)
+            )
+
+        if isinstance(files, LazyFiles):
+            files._dirty.clear()
+            files._deleted.clear()
+            files._new_versions.clear()
+
+    # Drop cached file contents of a saved project; they reload on next access
+    def evict(self, project):
+        for key in ("generated_files", "test_files"):
+            if isinstance(project[key], LazyFiles):
+                project[key].evict()
+
+    # Hand back the file contents of a project that is no longer used (a
+    # request done with it, a session switching projects). Save it first.
+    def release(self, project):
+        for key in ("generated_files", "test_files"):
+            if hasattr(project[key], "close"):
+                project[key].close()
+
+    # Function to map a client session to its project, creating one if needed
+    def session_project(self, session_id, metadata=None):
+        connection = self._connection()
+        row = connection.execute("SELECT project_id FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        project = self.get(row[0]) if row else None
+        if project is None:
+            project = self.create(metadata)
+        self.attach_session(session_id, project["id"])
+        return project
+
+    # Function to point a client session at another project (e.g. after an import)
+    def attach_session(self, session_id, project_id):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (id, project_id, last_seen) VALUES (?, ?, ?)",
+                (session_id, project_id, time.time())
+            )
+
+
+# Function to serialise a project into the compact export format
+# (zlib-compressed JSON with every file inlined)
+def export_project(project):
+    payload = {
+        "version": EXPORT_FORMAT_VERSION,
+        "project_metadata": project["project_metadata"],
+        "file_categories": project["file_categories"],
+        "messages": list(project["messages"]),
+        "generated_files": dict(project["generated_files"].items()),
+        "test_files": dict(project["test_files"].items()),
+        "test_sources": dict(project.get("test_sources", {})),
+    }
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 9)
+
+
+# Function to load an exported project into a store as a new project
+def import_project(store, data, project_id=None):
+    payload = json.loads(zlib.decompress(data).decode("utf-8"))
+    if payload.get("version") != EXPORT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported project export version: {payload.get('version')}")
+
+    project = store.create(payload["project_metadata"], project_id=project_id)
+    project["file_categories"] = payload["file_categories"]
+    project["messages"].extend(payload["messages"])
+    for filename, content in payload["generated_files"].items():
+        project["generated_files"][filename] = content
+    for filename, content in payload["test_files"].items():
+        project["test_files"][filename] = content
+    project["test_sources"].update(payload.get("test_sources", {}))
+    store.save(project)
+    return project
+
+
+# Function to open the configured project store. ASSISTANT_DB selects the
+# SQLite file; ":memory:" keeps projects in process memory only.
+def open_store(path=None):
+    path = path or os.environ.get("ASSISTANT_DB", "assistant.db")
+    if path == ":memory:":
+        return MemoryProjectStore()
+    return SQLiteProjectStore(path)
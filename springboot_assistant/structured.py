@@ -0,0 +1,231 @@
+import json
+import re
+
+# Structured output mode for code generation. The model is constrained by
+# Ollama's `format` JSON schema to answer {files: [{path, language, content}],
+# explanation}, so file names, languages and categories come from the answer
+# instead of being guessed from free text. The answer is parsed as it
+# streams: each file is available as soon as its object closes, and the file
+# being written can be shown while it grows.
+#
+# Files come out in the same shape as fenced code blocks (see fences.py),
+# {"language", "path", "code", "complete"}, so the rest of the app handles
+# both modes alike.
+
+CODE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "files": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "path": {"type": "string"},
+                    "language": {"type": "string"},
+                    "content": {"type": "string"},
+                },
+                "required": ["path", "language", "content"],
+            },
+        },
+        "explanation": {"type": "string"},
+    },
+    "required": ["files", "explanation"],
+}
+
+STRUCTURED_SYSTEM_PROMPT = """
+You are an expert Java Spring Boot developer assistant.
+Your task is to help developers by generating Java Spring Boot code, explaining concepts, and answering questions.
+Answer with a JSON object with two fields:
+- "files": every file you write, each as {"path": ..., "language": ..., "content": ...}. The path is relative to the
+  project root, like src/main/java/com/example/demo/BookController.java or src/main/resources/application.yml;
+  the language is one of java, xml, properties, yaml, json, sql, dockerfile, groovy, kotlin, bash, markdown;
+  the content is the complete file.
+- "explanation": your answer in Markdown: how the files work together, or the answer to a question without code.
+Make sure the code is complete, well-commented, follows best practices and uses the latest Spring Boot conventions.
+Keep package and class names consistent across files.
+"""
+
+# Next character that ends or escapes a JSON string
+_STRING_STOP = re.compile(r'["\\]')
+# Escape sequence cut off at the end of a partial string
+_PARTIAL_ESCAPE = re.compile(r'\\(u[0-9a-fA-F]{0,3})?$')
+
+
+# Function to decode the raw text of a JSON string (without quotes); a
+# partial string may end inside an escape sequence, which is left out
+def _decode(raw, partial=False):
+    if partial:
+        raw = _PARTIAL_ESCAPE.sub("", raw)
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+
+# Incremental parser for the structured answer. Containers are built up as
+# their characters arrive; the text inside strings is found with one search
+# per string end or escape, so each character is looked at about once.
+# Separators are not checked: the schema keeps the model's output valid, and
+# the complete answer is parsed again with json.loads when it ends.
+class StructuredParser:
+    def __init__(self):
+        self.root = None
+        self._stack = []  # [container, key waiting for its value] from the root down
+        self._string = None  # raw parts of the string being read
+        self._escaped = False  # the last chunk ended with a backslash inside a string
+        self._literal = ""  # number, true, false or null being read
+        self._completed = []
+
+    # Function to feed the next piece of the answer; returns the files
+    # completed by it, as {"language", "path", "code", "complete"}
+    def feed(self, chunk):
+        position = 0
+        while position < len(chunk):
+            if self._string is not None:
+                position = self._read_string(chunk, position)
+                continue
+            character = chunk[position]
+            position += 1
+            if self._literal and character not in ",]} \t\r\n":
+                self._literal += character
+                continue
+            if self._literal:
+                self._value(self._parse_literal())
+            if character == "{":
+                self._open({})
+            elif character == "[":
+                self._open([])
+            elif character in "}]":
+                self._close()
+            elif character == '"':
+                self._string = []
+            elif character not in " \t\r\n,:":
+                self._literal = character
+        completed, self._completed = self._completed, []
+        return completed
+
+    # Function to end the answer; returns the files completed by its end and,
+    # if a file was cut off, what arrived of it with complete=False
+    def finish(self):
+        files = self.feed(" ")
+        partial = self.current()
+        if partial is not None and partial["code"]:
+            files.append(partial)
+        return files
+
+    # Function to get the file being written, as received so far
+    def current(self):
+        if len(self._stack) < 3 or not isinstance(self._stack[-1][0], dict) or not self._in_files(self._stack[-2][0]):
+            return None
+        fields = dict(self._stack[-1][0])
+        if self._string is not None and self._stack[-1][1] is not None:
+            fields[self._stack[-1][1]] = _decode("".join(self._string), partial=True)
+        return _block(fields, complete=False)
+
+    # Explanation so far (empty until the model writes it)
+    @property
+    def explanation(self):
+        if isinstance(self.root, dict) and "explanation" in self.root:
+            return self.root["explanation"]
+        if self._string is not None and len(self._stack) == 1 and self._stack[0][1] == "explanation":
+            return _decode("".join(self._string), partial=True)
+        return ""
+
+    def _read_string(self, chunk, position):
+        if self._escaped:
+            self._string.append(chunk[position])
+            self._escaped = False
+            position += 1
+        while True:
+            match = _STRING_STOP.search(chunk, position)
+            if match is None:
+                self._string.append(chunk[position:])
+                return len(chunk)
+            end = match.start()
+            if chunk[end] == '"':
+                self._string.append(chunk[position:end])
+                raw, self._string = "".join(self._string), None
+                self._value(_decode(raw), is_string=True)
+                return end + 1
+            # A backslash: keep it with the character it escapes
+            self._string.append(chunk[position:end + 2])
+            if end + 1 == len(chunk):
+                self._escaped = True
+                return len(chunk)
+            position = end + 2
+
+    def _parse_literal(self):
+        literal, self._literal = self._literal, ""
+        try:
+            return json.loads(literal)
+        except ValueError:
+            return literal
+
+    def _value(self, value, is_string=False):
+        if not self._stack:
+            self.root = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, list):
+            container.append(value)
+        elif frame[1] is None and is_string:
+            frame[1] = value  # a key
+        else:
+            container[frame[1]] = value
+            frame[1] = None
+
+    def _open(self, container):
+        self._value(container)
+        self._stack.append([container, None])
+
+    def _close(self):
+        if not self._stack:
+            return
+        container = self._stack.pop()[0]
+        if isinstance(container, dict) and self._stack and self._in_files(self._stack[-1][0]):
+            self._completed.append(_block(container, complete=True))
+
+    def _in_files(self, container):
+        return isinstance(self.root, dict) and container is self.root.get("files")
+
+
+# Function to turn one file object of the answer into a block
+def _block(fields, complete):
+    language = str(fields.get("language") or "text").strip().lower()
+    return {
+        "language": language,
+        "path": str(fields.get("path") or "").strip() or None,
+        "code": str(fields.get("content") or "").replace("\r\n", "\n").strip("\n").rstrip(),
+        "complete": complete,
+    }
+
+
+# Function to parse a complete structured answer; returns {"files": blocks,
+# "explanation": text}. An answer that is not valid JSON (cut off, or from a
+# model without schema support) keeps the complete files the incremental
+# parser found, as fenced blocks cut off before their end are left out.
+def parse_structured(text):
+    try:
+        answer = json.loads(text)
+    except ValueError:
+        parser = StructuredParser()
+        files = parser.feed(text or "")
+        files.extend(block for block in parser.finish() if block["complete"])
+        return {"files": files, "explanation": parser.explanation}
+    if not isinstance(answer, dict):
+        return {"files": [], "explanation": ""}
+    files = [_block(fields, complete=True) for fields in answer.get("files") or [] if isinstance(fields, dict)]
+    return {"files": files, "explanation": str(answer.get("explanation") or "")}
+
+
+# Function to render a parsed answer as Markdown for the chat history: the
+# explanation, then each file in a fence named after its path
+def to_markdown(answer):
+    parts = [answer["explanation"].strip()] if answer["explanation"].strip() else []
+    for block in answer["files"]:
+        tag = f"{block['language']}:{block['path']}" if block["path"] else block["language"]
+        # A fence longer than any backtick run in the code
+        fence = "`" * max([3] + [len(run) + 1 for run in re.findall(r"`{3,}", block["code"])])
+        parts.append(f"{fence}{tag}\n{block['code']}\n{fence}")
+    return "\n\n".join(parts)
@@ -0,0 +1,493 @@
+import re
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+
+# Deterministic templates for the artifacts that only depend on the project
+# metadata and its dependencies: Dockerfile, docker-compose.yml and the GitHub
+# Actions workflow. Placeholders are written {{name}}; GitHub expressions such
+# as ${{ github.sha }} keep their spaces and are left alone.
+
+_PLACEHOLDER = re.compile(r"\{\{([a-z_]+)\}\}")
+
+# Backing services recognised from build-file artifact IDs
+SERVICE_ARTIFACTS = {
+    "postgresql": "postgres",
+    "r2dbc-postgresql": "postgres",
+    "mysql-connector-j": "mysql",
+    "mysql-connector-java": "mysql",
+    "mariadb-java-client": "mariadb",
+    "spring-boot-starter-data-mongodb": "mongodb",
+    "spring-boot-starter-data-mongodb-reactive": "mongodb",
+    "spring-boot-starter-data-redis": "redis",
+    "spring-boot-starter-data-redis-reactive": "redis",
+    "spring-kafka": "kafka",
+    "spring-cloud-starter-stream-kafka": "kafka",
+    "spring-boot-starter-amqp": "rabbitmq",
+}
+SERVICE_ORDER = ["postgres", "mysql", "mariadb", "mongodb", "redis", "kafka", "rabbitmq"]
+
+
+# Function to fill {{name}} placeholders; unknown names are an error
+def render(template, values):
+    return _PLACEHOLDER.sub(lambda match: str(values[match.group(1)]), template)
+
+
+def _artifact_ids(files):
+    if "pom.xml" in files:
+        try:
+            root = ElementTree.fromstring(files["pom.xml"])
+            return {element.text.strip() for element in root.iter()
+                    if element.tag.split("}")[-1] == "artifactId" and element.text}
+        except ElementTree.ParseError:
+            return set(re.findall(r"<artifactId>\s*([^<\s]+)\s*</artifactId>", files["pom.xml"]))
+    for name in ("build.gradle", "build.gradle.kts"):
+        if name in files:
+            return set(re.findall(r"['\"][\w.\-]+:([\w.\-]+)(?::[^'\"]*)?['\"]", files[name]))
+    return set()
+
+
+# Function to detect what the artifacts depend on: build tool, backing
+# services, JPA and Actuator. Returns a hashable, sorted description.
+def detect_stack(files):
+    artifacts = _artifact_ids(files)
+    services = {service for artifact, service in SERVICE_ARTIFACTS.items() if artifact in artifacts}
+    build_tool = "gradle" if "pom.xml" not in files and any(
+        name in files for name in ("build.gradle", "build.gradle.kts")) else "maven"
+    return (
+        ("actuator", "spring-boot-starter-actuator" in artifacts),
+        ("build_tool", build_tool),
+        ("jpa", "spring-boot-starter-data-jpa" in artifacts),
+        ("services", tuple(service for service in SERVICE_ORDER if service in services)),
+    )
+
+
+def _values(metadata):
+    metadata = dict(metadata)
+    artifact = re.sub(r"[^a-z0-9-]", "-", metadata.get("artifact_id", "demo").lower()).strip("-") or "app"
+    return {
+        "app_name": metadata.get("app_name", artifact),
+        "artifact_id": artifact,
+        "database": artifact.replace("-", "_"),
+        "java_version": metadata.get("java_version", "17"),
+        "spring_boot_version": metadata.get("spring_boot_version", "3.2.3"),
+    }
+
+
+DOCKERFILE_MAVEN = """# syntax=docker/dockerfile:1
+# {{app_name}} - Spring Boot {{spring_boot_version}} on Java {{java_version}}
+
+# Build stage: dependencies are resolved in their own layer so code changes rebuild quickly
+FROM maven:3.9-eclipse-temurin-{{java_version}} AS build
+WORKDIR /workspace
+COPY pom.xml .
+RUN mvn -B -q dependency:go-offline
+COPY src ./src
+RUN mvn -B -q package -DskipTests
+
+# Runtime stage: JRE only, non-root user
+FROM eclipse-temurin:{{java_version}}-jre
+WORKDIR /app
+RUN groupadd --system spring && useradd --system --gid spring spring
+COPY --from=build /workspace/target/*.jar app.jar
+USER spring:spring
+EXPOSE 8080
+ENV JAVA_OPTS="-XX:MaxRAMPercentage=75.0 -XX:+ExitOnOutOfMemoryError"
+ENTRYPOINT ["sh", "-c", "exec java $JAVA_OPTS -jar /app/app.jar"]
+"""
+
+DOCKERFILE_GRADLE = """# syntax=docker/dockerfile:1
+# {{app_name}} - Spring Boot {{spring_boot_version}} on Java {{java_version}}
+
+# Build stage
+FROM gradle:8-jdk{{java_version}} AS build
+WORKDIR /workspace
+COPY . .
+RUN gradle bootJar --no-daemon -q && rm -f build/libs/*-plain.jar
+
+# Runtime stage: JRE only, non-root user
+FROM eclipse-temurin:{{java_version}}-jre
+WORKDIR /app
+RUN groupadd --system spring && useradd --system --gid spring spring
+COPY --from=build /workspace/build/libs/*.jar app.jar
+USER spring:spring
+EXPOSE 8080
+ENV JAVA_OPTS="-XX:MaxRAMPercentage=75.0 -XX:+ExitOnOutOfMemoryError"
+ENTRYPOINT ["sh", "-c", "exec java $JAVA_OPTS -jar /app/app.jar"]
+"""
+
+# Per-service compose block, app environment and volume
+COMPOSE_SERVICES = {
+    "postgres": ("""  postgres:
+    image: postgres:16-alpine
+    environment:
+      POSTGRES_DB: {{database}}
+      POSTGRES_USER: app
+      POSTGRES_PASSWORD: app
+    ports:
+      - "5432:5432"
+    volumes:
+      - postgres-data:/var/lib/postgresql/data
+    healthcheck:
+      test: ["CMD-SHELL", "pg_isready -U app -d {{database}}"]
+      interval: 10s
+      timeout: 5s
+      retries: 5
+""", """      SPRING_DATASOURCE_URL: jdbc:postgresql://postgres:5432/{{database}}
+      SPRING_DATASOURCE_USERNAME: app
+      SPRING_DATASOURCE_PASSWORD: app
+""", "postgres-data"),
+    "mysql": ("""  mysql:
+    image: mysql:8.4
+    environment:
+      MYSQL_DATABASE: {{database}}
+      MYSQL_USER: app
+      MYSQL_PASSWORD: app
+      MYSQL_ROOT_PASSWORD: root
+    ports:
+      - "3306:3306"
+    volumes:
+      - mysql-data:/var/lib/mysql
+    healthcheck:
+      test: ["CMD", "mysqladmin", "ping", "-h", "localhost"]
+      interval: 10s
+      timeout: 5s
+      retries: 5
+""", """      SPRING_DATASOURCE_URL: jdbc:mysql://mysql:3306/{{database}}
+      SPRING_DATASOURCE_USERNAME: app
+      SPRING_DATASOURCE_PASSWORD: app
+""", "mysql-data"),
+    "mariadb": ("""  mariadb:
+    image: mariadb:11
+    environment:
+      MARIADB_DATABASE: {{database}}
+      MARIADB_USER: app
+      MARIADB_PASSWORD: app
+      MARIADB_ROOT_PASSWORD: root
+    ports:
+      - "3306:3306"
+    volumes:
+      - mariadb-data:/var/lib/mysql
+    healthcheck:
+      test: ["CMD", "healthcheck.sh", "--connect", "--innodb_initialized"]
+      interval: 10s
+      timeout: 5s
+      retries: 5
+""", """      SPRING_DATASOURCE_URL: jdbc:mariadb://mariadb:3306/{{database}}
+      SPRING_DATASOURCE_USERNAME: app
+      SPRING_DATASOURCE_PASSWORD: app
+""", "mariadb-data"),
+    "mongodb": ("""  mongodb:
+    image: mongo:7
+    ports:
+      - "27017:27017"
+    volumes:
+      - mongodb-data:/data/db
+    healthcheck:
+      test: ["CMD", "mongosh", "--quiet", "--eval", "db.adminCommand('ping')"]
+      interval: 10s
+      timeout: 5s
+      retries: 5
+""", """      SPRING_DATA_MONGODB_URI: mongodb://mongodb:27017/{{database}}
+""", "mongodb-data"),
+    "redis": ("""  redis:
+    image: redis:7-alpine
+    ports:
+      - "6379:6379"
+    healthcheck:
+      test: ["CMD", "redis-cli", "ping"]
+      interval: 10s
+      timeout: 5s
+      retries: 5
+""", """      {{redis_prefix}}_HOST: redis
+      {{redis_prefix}}_PORT: 6379
+""", None),
+    "kafka": ("""  kafka:
+    image: apache/kafka:3.7.0
+    environment:
+      KAFKA_NODE_ID: 1
+      KAFKA_PROCESS_ROLES: broker,controller
+      KAFKA_LISTENERS: PLAINTEXT://:9092,CONTROLLER://:9093
+      KAFKA_ADVERTISED_LISTENERS: PLAINTEXT://kafka:9092
+      KAFKA_CONTROLLER_LISTENER_NAMES: CONTROLLER
+      KAFKA_LISTENER_SECURITY_PROTOCOL_MAP: CONTROLLER:PLAINTEXT,PLAINTEXT:PLAINTEXT
+      KAFKA_CONTROLLER_QUORUM_VOTERS: 1@kafka:9093
+      KAFKA_OFFSETS_TOPIC_REPLICATION_FACTOR: 1
+    ports:
+      - "9092:9092"
+""", """      SPRING_KAFKA_BOOTSTRAP_SERVERS: kafka:9092
+""", None),
+    "rabbitmq": ("""  rabbitmq:
+    image: rabbitmq:3-management
+    ports:
+      - "5672:5672"
+      - "15672:15672"
+    healthcheck:
+      test: ["CMD", "rabbitmq-diagnostics", "-q", "ping"]
+      interval: 10s
+      timeout: 5s
+      retries: 5
+""", """      SPRING_RABBITMQ_HOST: rabbitmq
+""", None),
+}
+# Services without a healthcheck are only started before the app
+UNCHECKED_SERVICES = {"kafka"}
+
+
+def render_dockerfile(metadata, stack):
+    stack = dict(stack)
+    template = DOCKERFILE_GRADLE if stack["build_tool"] == "gradle" else DOCKERFILE_MAVEN
+    return render(template, _values(metadata))
+
+
+def render_docker_compose(metadata, stack):
+    stack = dict(stack)
+    values = _values(metadata)
+    boot_major = values["spring_boot_version"].split(".")[0]
+    values["redis_prefix"] = "SPRING_DATA_REDIS" if boot_major.isdigit() and int(boot_major) >= 3 else "SPRING_REDIS"
+
+    app = ("services:\n"
+           "  app:\n"
+           "    build: .\n"
+           "    image: {{artifact_id}}:latest\n"
+           "    ports:\n"
+           "      - \"8080:8080\"\n")
+    environment = "".join(COMPOSE_SERVICES[service][1] for service in stack["services"])
+    if environment:
+        app += "    environment:\n" + environment
+    if stack["services"]:
+        app += "    depends_on:\n" + "".join(
+            f"      {service}:\n        condition: "
+            f"{'service_started' if service in UNCHECKED_SERVICES else 'service_healthy'}\n"
+            for service in stack["services"])
+    if stack["actuator"]:
+        app += ("    healthcheck:\n"
+                "      test: [\"CMD-SHELL\", \"wget -qO- http://localhost:8080/actuator/health || exit 1\"]\n"
+                "      interval: 30s\n"
+                "      timeout: 5s\n"
+                "      retries: 3\n")
+
+    compose = app + "".join("\n" + COMPOSE_SERVICES[service][0] for service in stack["services"])
+    volumes = [COMPOSE_SERVICES[service][2] for service in stack["services"] if COMPOSE_SERVICES[service][2]]
+    if volumes:
+        compose += "\nvolumes:\n" + "".join(f"  {volume}:\n" for volume in volumes)
+    return render(compose, values)
+
+
+# Service containers for the CI test job
+CI_SERVICES = {
+    "postgres": """      postgres:
+        image: postgres:16-alpine
+        env:
+          POSTGRES_DB: {{database}}
+          POSTGRES_USER: app
+          POSTGRES_PASSWORD: app
+        ports:
+          - 5432:5432
+        options: --health-cmd "pg_isready -U app" --health-interval 10s --health-timeout 5s --health-retries 5
+""",
+    "mysql": """      mysql:
+        image: mysql:8.4
+        env:
+          MYSQL_DATABASE: {{database}}
+          MYSQL_USER: app
+          MYSQL_PASSWORD: app
+          MYSQL_ROOT_PASSWORD: root
+        ports:
+          - 3306:3306
+        options: --health-cmd "mysqladmin ping -h localhost" --health-interval 10s --health-timeout 5s --health-retries 5
+""",
+    "mariadb": """      mariadb:
+        image: mariadb:11
+        env:
+          MARIADB_DATABASE: {{database}}
+          MARIADB_USER: app
+          MARIADB_PASSWORD: app
+          MARIADB_ROOT_PASSWORD: root
+        ports:
+          - 3306:3306
+        options: --health-cmd "healthcheck.sh --connect" --health-interval 10s --health-timeout 5s --health-retries 5
+""",
+    "mongodb": """      mongodb:
+        image: mongo:7
+        ports:
+          - 27017:27017
+""",
+    "redis": """      redis:
+        image: redis:7-alpine
+        ports:
+          - 6379:6379
+        options: --health-cmd "redis-cli ping" --health-interval 10s --health-timeout 5s --health-retries 5
+""",
+    "rabbitmq": """      rabbitmq:
+        image: rabbitmq:3
+        ports:
+          - 5672:5672
+""",
+}
+CI_ENVIRONMENT = {
+    "postgres": """      SPRING_DATASOURCE_URL: jdbc:postgresql://localhost:5432/{{database}}
+      SPRING_DATASOURCE_USERNAME: app
+      SPRING_DATASOURCE_PASSWORD: app
+""",
+    "mysql": """      SPRING_DATASOURCE_URL: jdbc:mysql://localhost:3306/{{database}}
+      SPRING_DATASOURCE_USERNAME: app
+      SPRING_DATASOURCE_PASSWORD: app
+""",
+    "mariadb": """      SPRING_DATASOURCE_URL: jdbc:mariadb://localhost:3306/{{database}}
+      SPRING_DATASOURCE_USERNAME: app
+      SPRING_DATASOURCE_PASSWORD: app
+""",
+    "mongodb": """      SPRING_DATA_MONGODB_URI: mongodb://localhost:27017/{{database}}
+""",
+}
+
+CI_WORKFLOW = """# CI/CD for {{app_name}}: build and test, scan, publish the image, deploy to staging
+name: CI/CD
+
+on:
+  push:
+    branches: [ main ]
+  pull_request:
+    branches: [ main ]
+
+permissions:
+  contents: read
+  packages: write
+
+env:
+  IMAGE_NAME: ghcr.io/${{ github.repository }}
+
+jobs:
+  build:
+    runs-on: ubuntu-latest
+{{services}}{{environment}}    steps:
+      - uses: actions/checkout@v4
+
+      - name: Set up JDK {{java_version}}
+        uses: actions/setup-java@v4
+        with:
+          distribution: temurin
+          java-version: '{{java_version}}'
+          cache: {{build_tool}}
+{{build_steps}}
+  security-scan:
+    runs-on: ubuntu-latest
+    needs: build
+    steps:
+      - uses: actions/checkout@v4
+
+      - name: Scan dependencies for vulnerabilities
+        uses: aquasecurity/trivy-action@0.28.0
+        with:
+          scan-type: fs
+          scan-ref: .
+          severity: CRITICAL,HIGH
+          ignore-unfixed: true
+          exit-code: '1'
+
+  docker:
+    runs-on: ubuntu-latest
+    needs: [ build, security-scan ]
+    if: github.event_name == 'push' && github.ref == 'refs/heads/main'
+    steps:
+      - uses: actions/checkout@v4
+
+      - name: Log in to GitHub Container Registry
+        uses: docker/login-action@v3
+        with:
+          registry: ghcr.io
+          username: ${{ github.actor }}
+          password: ${{ secrets.GITHUB_TOKEN }}
+
+      - name: Build and push image
+        uses: docker/build-push-action@v6
+        with:
+          context: .
+          push: true
+          tags: |
+            ${{ env.IMAGE_NAME }}:${{ github.sha }}
+            ${{ env.IMAGE_NAME }}:latest
+
+  deploy-staging:
+    runs-on: ubuntu-latest
+    needs: docker
+    environment: staging
+    steps:
+      - name: Deploy to staging
+        # Replace with the deployment command for your platform
+        run: echo "Deploying ${{ env.IMAGE_NAME }}:${{ github.sha }} to staging"
+"""
+
+CI_BUILD_STEPS = {
+    "maven": """
+      - name: Build and test
+        run: mvn -B verify
+
+      - name: Upload test reports
+        if: always()
+        uses: actions/upload-artifact@v4
+        with:
+          name: test-reports
+          path: target/surefire-reports
+
+      - name: Upload application jar
+        uses: actions/upload-artifact@v4
+        with:
+          name: {{artifact_id}}-jar
+          path: target/*.jar
+""",
+    "gradle": """
+      - name: Set up Gradle
+        uses: gradle/actions/setup-gradle@v4
+
+      - name: Build and test
+        run: gradle build --no-daemon
+
+      - name: Upload test reports
+        if: always()
+        uses: actions/upload-artifact@v4
+        with:
+          name: test-reports
+          path: build/reports/tests
+
+      - name: Upload application jar
+        uses: actions/upload-artifact@v4
+        with:
+          name: {{artifact_id}}-jar
+          path: build/libs/*.jar
+""",
+}
+
+
+def render_github_actions(metadata, stack):
+    stack = dict(stack)
+    values = _values(metadata)
+    services = [service for service in stack["services"] if service in CI_SERVICES]
+    values["services"] = ("    services:\n" + "".join(CI_SERVICES[service] for service in services)) if services else ""
+    environment = "".join(CI_ENVIRONMENT[service] for service in services if service in CI_ENVIRONMENT)
+    values["environment"] = ("    env:\n" + environment) if environment else ""
+    values["build_tool"] = stack["build_tool"]
+    values["build_steps"] = CI_BUILD_STEPS[stack["build_tool"]]
+    # Fill the nested templates first, then the workflow itself
+    for key in ("services", "environment", "build_steps"):
+        values[key] = render(values[key], values)
+    return render(CI_WORKFLOW, values)
+
+
+RENDERERS = {
+    "dockerfile": render_dockerfile,
+    "docker-compose": render_docker_compose,
+    "github-actions": render_github_actions,
+}
+
+
+# Function to render an artifact; cached since the output only depends on the
+# metadata and the detected stack
+@lru_cache(maxsize=256)
+def _render_artifact(kind, metadata, stack):
+    return RENDERERS[kind](metadata, stack)
+
+
+def render_artifact(kind, project_metadata, files):
+    metadata = tuple(sorted((key, str(value)) for key, value in project_metadata.items()))
+    return _render_artifact(kind, metadata, detect_stack(files or {}))
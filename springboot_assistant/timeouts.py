@@ -0,0 +1,158 @@
+import os
+import threading
+
+# Timeout policy. Generation timeouts come from the prefill and decode rates
+# Ollama reports for each model and host (prompt_eval_* and eval_* in the last
+# message of every answer) and the size of the prompt:
+#
+#     first token  = SAFETY * (load + prompt tokens / prefill rate) + FIRST_TOKEN_FLOOR
+#     between tokens = max(IDLE_FLOOR, SAFETY * IDLE_TOKENS / decode rate)
+#
+# A stream only fails when no token arrives for that long, never for its total
+# length. Until a model has been measured the rates below, which are modest
+# CPU figures, are assumed. Requests that are not generations use the fixed
+# REQUEST_TIMEOUTS.
+
+# Tokens per second assumed before a model has been measured
+DEFAULT_PREFILL_RATE = 40.0
+DEFAULT_DECODE_RATE = 4.0
+# Seconds assumed for loading a model that has not been measured
+DEFAULT_LOAD_SECONDS = 20.0
+# Headroom over the estimate before giving up
+SAFETY = 3.0
+FIRST_TOKEN_FLOOR = 15.0
+IDLE_FLOOR = 15.0
+# Tokens a decoder may take before the next chunk shows up (markdown fences, long identifiers)
+IDLE_TOKENS = 8
+# Weight of the newest measurement in the moving averages
+RATE_ALPHA = 0.3
+# Expected answer length per task, in tokens
+EXPECTED_OUTPUT_TOKENS = {
+    "chat": 1200,
+    "tests": 1500,
+    "integration-tests": 2500,
+    "documentation": 2500,
+    "openapi": 2500,
+    "docker": 800,
+    "ci": 800,
+    "summary": 300,
+}
+DEFAULT_OUTPUT_TOKENS = 1500
+# Total seconds a task may spend on retries (repeated attempts must fit the budget)
+RETRY_BUDGET = float(os.environ.get("ASSISTANT_RETRY_BUDGET", "600"))
+MAX_RETRIES = 2
+
+# Seconds for requests that are not generations
+REQUEST_TIMEOUTS = {
+    "connect": 5,
+    "health": 3,
+    "model-info": 10,
+    "model-test": 60,
+    "embedding": 30,
+    "initializr": 30,
+}
+
+
+class TimeoutPolicy:
+    def __init__(self):
+        self._rates = {}  # (model, host) -> {"prefill", "decode", "load", "samples"}
+        self._lock = threading.Lock()
+
+    # Function to record the timings Ollama reports at the end of an answer
+    # (durations in nanoseconds, as in the API)
+    def record(self, model, host, metrics):
+        prefill = decode = None
+        if metrics.get("prompt_eval_count") and metrics.get("prompt_eval_duration"):
+            prefill = metrics["prompt_eval_count"] / (metrics["prompt_eval_duration"] / 1e9)
+        if metrics.get("eval_count") and metrics.get("eval_duration"):
+            decode = metrics["eval_count"] / (metrics["eval_duration"] / 1e9)
+        load = metrics.get("load_duration", 0) / 1e9
+        if prefill is None and decode is None:
+            return
+
+        with self._lock:
+            rates = self._rates.get((model, host))
+            if rates is None:
+                self._rates[(model, host)] = {
+                    "prefill": prefill or DEFAULT_PREFILL_RATE,
+                    "decode": decode or DEFAULT_DECODE_RATE,
+                    "load": load,
+                    "samples": 1,
+                }
+                return
+            for key, value in (("prefill", prefill), ("decode", decode)):
+                if value:
+                    rates[key] = RATE_ALPHA * value + (1 - RATE_ALPHA) * rates[key]
+            # Loading only happens on a cold start; keep the worst seen
+            rates["load"] = max(rates["load"], load)
+            rates["samples"] += 1
+
+    # Function to get the rates for a model; without a host, the slowest host
+    # measured for it, so the estimate holds wherever the request lands
+    def rates(self, model, host=None):
+        with self._lock:
+            measured = [rates for (name, at), rates in self._rates.items()
+                        if name == model and (host is None or at == host)]
+            if not measured:
+                return {"prefill": DEFAULT_PREFILL_RATE, "decode": DEFAULT_DECODE_RATE,
+                        "load": DEFAULT_LOAD_SECONDS, "samples": 0}
+            return {
+                "prefill": min(rates["prefill"] for rates in measured),
+                "decode": min(rates["decode"] for rates in measured),
+                "load": max(rates["load"] for rates in measured),
+                "samples": sum(rates["samples"] for rates in measured),
+            }
+
+    # Function to estimate how long a generation takes end to end
+    def estimate(self, model, prompt_tokens, task=None, host=None):
+        rates = self.rates(model, host)
+        output_tokens = EXPECTED_OUTPUT_TOKENS.get(task, DEFAULT_OUTPUT_TOKENS)
+        return rates["load"] + prompt_tokens / rates["prefill"] + output_tokens / rates["decode"]
+
+    # Function to get the timeouts for one generation:
+    # {"first_token", "idle", "estimate", "total"} in seconds
+    def for_generation(self, model, prompt_tokens, task=None, host=None):
+        rates = self.rates(model, host)
+        estimate = self.estimate(model, prompt_tokens, task, host)
+        return {
+            "first_token": round(SAFETY * (rates["load"] + prompt_tokens / rates["prefill"]) + FIRST_TOKEN_FLOOR, 1),
+            "idle": round(max(IDLE_FLOOR, SAFETY * IDLE_TOKENS / rates["decode"]), 1),
+            "estimate": round(estimate, 1),
+            # For the rare call that cannot stream (the non-streaming fallback)
+            "total": round(SAFETY * estimate + FIRST_TOKEN_FLOOR, 1),
+        }
+
+    # Function to get how many times a generation may be retried: as many
+    # further attempts as fit the retry budget, up to MAX_RETRIES. With a
+    # distinct fallback model there is always one retry, on the fallback.
+    def retries(self, model, prompt_tokens, task=None, fallback=None):
+        estimate = self.estimate(model, prompt_tokens, task)
+        retries = max(0, min(MAX_RETRIES, int(RETRY_BUDGET // max(estimate, 1.0)) - 1))
+        if fallback and fallback != model:
+            retries = max(retries, 1)
+        return retries
+
+    # Function to describe the measured rates, for the UI and the HTTP API
+    def describe(self):
+        with self._lock:
+            return [
+                {"model": model, "host": host, "prefill_tokens_per_second": round(rates["prefill"], 1),
+                 "decode_tokens_per_second": round(rates["decode"], 1), "load_seconds": round(rates["load"], 1),
+                 "samples": rates["samples"]}
+                for (model, host), rates in sorted(self._rates.items())
+            ]
+
+
+# Process-wide policy fed by every answer
+policy = TimeoutPolicy()
+
+
+# Function to approximate a chat payload's prompt size in tokens. Four
+# characters a token is close enough here: the timeouts carry SAFETY headroom.
+def prompt_tokens(messages):
+    return sum(len(message.get("content") or "") // 4 + 4 for message in messages)
+
+
+# Function to get the fixed timeout for a kind of request (see REQUEST_TIMEOUTS)
+def request_timeout(kind):
+    return REQUEST_TIMEOUTS[kind]
@@ -0,0 +1,37 @@
+from springboot_assistant.blobs import BlobStore, VersionedFiles, apply_delta, content_hash, make_delta
+
+
+def test_delta_round_trip():
+    source = "class A {\n    int a;\n}\n"
+    target = "class A {\n    int a;\n    int b;\n}\n"
+    assert apply_delta(source, make_delta(source, target)) == target
+
+
+def test_contents_are_shared_and_compressed():
+    blobs = BlobStore(compress_threshold=10)
+    one, two = VersionedFiles(blobs=blobs), VersionedFiles(blobs=blobs)
+    one["A.java"] = two["Copy.java"] = "class A { int value; }"
+    assert blobs.stats()["blobs"] == 1
+    assert isinstance(blobs._blobs[content_hash("class A { int value; }")], bytes)
+    assert two["Copy.java"] == "class A { int value; }"
+
+
+def test_replaced_content_becomes_an_earlier_version():
+    blobs = BlobStore()
+    files = VersionedFiles(blobs=blobs)
+    files["A.java"] = "class A {}\n"
+    files["A.java"] = "class A {\n    int a;\n}\n"
+    assert [version["current"] for version in files.versions("A.java")] == [False, True]
+    assert files.version("A.java", 1) == "class A {}\n"
+    assert files.version("A.java", 2) == files["A.java"]
+    assert blobs.stats()["blobs"] == 1
+
+
+def test_close_hands_the_blobs_back():
+    blobs = BlobStore()
+    files = VersionedFiles({"A.java": "class A {}", "B.java": "class B {}"}, blobs=blobs)
+    other = VersionedFiles({"A.java": "class A {}"}, blobs=blobs)
+    files.close()
+    assert len(files) == 0
+    assert blobs.stats()["blobs"] == 1
+    assert other["A.java"] == "class A {}"
@@ -0,0 +1,47 @@
+from springboot_assistant.browser import file_entries, file_type_of, filter_entries, paginate
+from springboot_assistant.core import new_project
+from springboot_assistant.java_index import JavaSymbolIndex
+
+
+def project():
+    project = new_project()
+    project["generated_files"]["BookController.java"] = (
+        "@RestController\npublic class BookController {\n    public Book findBook() { return null; }\n}\n")
+    project["generated_files"]["application.yml"] = "server:\n  port: 8080\n"
+    project["test_files"]["BookControllerTest.java"] = "class BookControllerTest {}"
+    project["file_categories"]["main"].append("BookController.java")
+    project["file_categories"]["config"].append("application.yml")
+    return project
+
+
+def test_file_types_come_from_the_name():
+    assert file_type_of("src/main/resources/application.yml") == "yaml"
+    assert file_type_of("Dockerfile") == "dockerfile"
+    assert file_type_of("LICENSE") == "text"
+
+
+def test_entries_list_symbols_without_a_category_for_tests():
+    index = JavaSymbolIndex()
+    files = project()
+    index.update(files["generated_files"])
+    entries = {entry["filename"]: entry for entry in file_entries(files, [index])}
+    assert entries["BookController.java"]["role"] == "controller"
+    assert entries["BookController.java"]["symbols"] == ["BookController", "findBook"]
+    assert entries["BookControllerTest.java"]["category"] == "test"
+    assert entries["application.yml"]["type"] == "yaml"
+
+
+def test_every_query_word_must_match():
+    index = JavaSymbolIndex()
+    files = project()
+    index.update(files["generated_files"])
+    entries = file_entries(files, [index])
+    assert [entry["filename"] for entry in filter_entries(entries, "symbol:findbook")] == ["BookController.java"]
+    assert [entry["filename"] for entry in filter_entries(entries, "book type:java", category="test")] == [
+        "BookControllerTest.java"]
+    assert filter_entries(entries, "book yaml") == []
+
+
+def test_pages_are_clamped():
+    assert paginate(list(range(25)), 9, 10) == ([20, 21, 22, 23, 24], 3, 3)
+    assert paginate([], 0, 10) == ([], 1, 1)
@@ -0,0 +1,50 @@
+from springboot_assistant import context
+from springboot_assistant.context import (ConversationSummarizer, build_context, estimate_tokens, pack_history,
+                                          truncate_message)
+
+
+def history(count, words=50):
+    return [{"role": "user" if index % 2 == 0 else "assistant", "content": f"message {index} " + "word " * words}
+            for index in range(count)]
+
+
+def test_long_message_keeps_its_start_and_end():
+    content = "start " + "filler " * 2000 + "end"
+    truncated = truncate_message(content, 200)
+    assert truncated.startswith("start") and truncated.endswith("end")
+    assert estimate_tokens(truncated) <= 250
+    assert truncate_message("short", 200) == "short"
+
+
+def test_history_is_packed_from_the_newest_message():
+    messages = history(20)
+    packed, start = pack_history(messages, budget=300)
+    assert packed == messages[start:]
+    assert 0 < start < 20
+    assert sum(estimate_tokens(message["content"]) for message in packed) <= 300
+
+
+def test_summary_replaces_the_turns_that_do_not_fit(monkeypatch):
+    summaries = []
+
+    def complete(task, messages, **kwargs):
+        summaries.append(messages[0]["content"])
+        return "The developer is building a book service."
+
+    monkeypatch.setattr(context, "routed_completion", complete)
+    summarizer = ConversationSummarizer()
+    messages = history(20)
+    build_context("system", messages, "next", budget=400, summarizer=summarizer)
+    summarizer._worker.join(2)
+    assert summarizer.covered > 0 and len(summaries) == 1
+
+    payload = build_context("system", messages, "next", budget=400, summarizer=summarizer)
+    assert payload[0] == {"role": "system", "content": "system"}
+    assert payload[1]["content"].endswith("The developer is building a book service.")
+    assert payload[-1] == {"role": "user", "content": "next"}
+
+
+def test_short_conversation_is_sent_whole_without_summary():
+    messages = history(2, words=5)
+    payload = build_context("system", messages, "next", budget=3000)
+    assert payload == [{"role": "system", "content": "system"}, *messages, {"role": "user", "content": "next"}]
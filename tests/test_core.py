@@ -0,0 +1,59 @@
+import io
+import zipfile
+
+from springboot_assistant.core import (generate_zip_file, new_project, project_files, register_code_blocks,
+                                       suggest_filename, update_package_declaration)
+
+RESPONSE = """Here is the code:
+
+```java
+package com.example.demo;
+
+public class BookService {}
+```
+
+```java:src/test/java/com/example/demo/BookServiceTest.java
+import org.junit.jupiter.api.Test;
+public class BookServiceTest { @Test void saves() {} }
+```
+
+```properties
+server.port=8080
+```
+"""
+
+
+def test_blocks_become_project_files():
+    project = new_project()
+    info = register_code_blocks(project, RESPONSE)
+    assert [(entry["filename"], entry["category"]) for entry in info] == [
+        ("BookService.java", "main"), ("BookServiceTest.java", "test"), ("application.properties", "config")]
+    assert project["file_categories"]["main"] == ["BookService.java"]
+
+
+def test_revised_class_replaces_the_file():
+    project = new_project()
+    register_code_blocks(project, RESPONSE)
+    register_code_blocks(project, "```java\npublic class BookService { void save() {} }\n```\n")
+    assert project["generated_files"]["BookService.java"] == "public class BookService { void save() {} }"
+    assert "BookService_1.java" not in project["generated_files"]
+
+
+def test_filenames_are_guessed_from_the_code():
+    assert suggest_filename("public class Foo {}", "java") == ("Foo.java", "main")
+    assert suggest_filename("<project></project>", "xml") == ("config.xml", "config")
+    assert suggest_filename("<project><name>pom</name></project>", "xml") == ("pom.xml", "config")
+
+
+def test_package_declarations_are_replaced_or_added():
+    assert update_package_declaration("package a.b;\nclass A {}", "com.x") == "package com.x;\nclass A {}"
+    assert update_package_declaration("class A {}", "com.x") == "package com.x;\n\nclass A {}"
+
+
+def test_zip_uses_the_maven_layout():
+    project = new_project()
+    register_code_blocks(project, RESPONSE)
+    data = generate_zip_file(dict(project_files(project)), project["project_metadata"])
+    names = set(zipfile.ZipFile(io.BytesIO(data)).namelist())
+    assert {"src/main/java/BookService.java", "src/test/java/BookServiceTest.java",
+            "src/main/resources/application.properties"} <= names
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from springboot_assistant import endpoints, llm, retrieval
+from springboot_assistant.endpoints import EndpointPool, get_pool
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+# A stand-in Ollama server: `installed` and `loaded` answer the health checks,
+# `delay` holds every other request that long, and `hits` records the paths served
+class StandIn:
+    def __init__(self, installed=(), loaded=(), delay=0.0, port=0):
+        self.installed, self.loaded, self.delay = list(installed), list(loaded), delay
+        self.hits = []
+        self.port = port
+        self.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self.answer({"models": [{"name": name} for name in stand_in.installed]})
+                elif self.path == "/api/ps":
+                    self.answer({"models": [{"name": name} for name in stand_in.loaded]})
+                else:
+                    self.serve()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.serve()
+
+            def serve(self):
+                stand_in.hits.append(self.path)
+                time.sleep(stand_in.delay)
+                self.answer({"message": {"content": f"from {stand_in.port}"}, "embedding": [float(stand_in.port)]})
+
+            def answer(self, body):
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    pass  # the client gave up (a hedged request that lost)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", self.port), Handler)
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_ins():
+    started = []
+
+    def start(*args, **kwargs):
+        started.append(StandIn(*args, **kwargs))
+        return started[-1]
+
+    yield start
+    for stand_in in started:
+        stand_in.stop()
+
+
+@pytest.fixture
+def pools():
+    created = []
+
+    def create(*args, **kwargs):
+        created.append(EndpointPool(*args, **kwargs))
+        return created[-1]
+
+    yield create
+    for pool in created:
+        pool.close()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.02)
+
+
+def test_requests_go_to_the_endpoint_with_the_fewest_in_flight(stand_ins, pools):
+    busy, idle = stand_ins(delay=1.0), stand_ins()
+    pool = pools([busy.url, idle.url])
+    threading.Thread(target=pool.request, args=("POST", "/api/chat"), kwargs={"timeout": 5}).start()
+    wait_until(lambda: busy.hits)
+
+    for _ in range(3):
+        pool.request("POST", "/api/chat", timeout=5)
+    assert busy.hits == ["/api/chat"] and idle.hits == ["/api/chat"] * 3
+
+
+def test_endpoints_with_the_model_loaded_or_installed_are_preferred(stand_ins, pools):
+    missing, installed, loaded = stand_ins(), stand_ins(installed=["mistral"]), stand_ins(
+        installed=["mistral"], loaded=["mistral"])
+    pool = pools([missing.url, installed.url, loaded.url])
+    pool.refresh()
+    assert pool.choose("mistral").url == loaded.url
+    assert pool.choose("mistral", exclude=(loaded.url,)).url == installed.url
+    assert pool.models() == ["mistral"]
+
+
+def test_fails_over_when_an_endpoint_goes_down_and_recovers_through_the_monitor(stand_ins, pools):
+    flaky, steady = stand_ins(installed=["mistral"]), stand_ins(installed=["mistral"])
+    pool = pools([flaky.url, steady.url], health_interval=0.05)
+    flaky.stop()
+
+    response = pool.request("POST", "/api/chat", model="mistral", timeout=5)
+    assert response.json()["message"]["content"] == f"from {steady.port}"
+    assert [endpoint["healthy"] for endpoint in pool.describe()] == [False, True]
+
+    stand_ins(installed=["mistral"], port=flaky.port)
+    wait_until(lambda: pool.describe()[0]["healthy"])
+
+
+@pytest.fixture
+def hedged_pool(stand_ins, pools, monkeypatch):
+    slow, fast = stand_ins(delay=2.0), stand_ins()
+    monkeypatch.setattr(endpoints, "_pool", pools([slow.url, fast.url], hedge_after=0.1))
+    return slow, fast
+
+
+def test_model_test_is_hedged_to_a_second_endpoint(hedged_pool):
+    slow, fast = hedged_pool
+    started = time.monotonic()
+    assert llm.test_model("mistral") == (True, f"from {fast.port}")
+    assert time.monotonic() - started < 1.5
+    assert slow.hits == fast.hits == ["/api/chat"]
+
+
+def test_embeddings_are_hedged_to_a_second_endpoint(hedged_pool):
+    slow, fast = hedged_pool
+    started = time.monotonic()
+    assert retrieval.embed_text("BookService", timeout=5) == [float(fast.port)]
+    assert time.monotonic() - started < 1.5
+
+
+def test_the_shared_pool_is_built_on_first_use(monkeypatch):
+    monkeypatch.setattr(endpoints, "_pool", None)
+    monkeypatch.setenv("OLLAMA_HOSTS", "gpu-1, gpu-2:11500")
+    pool = get_pool()
+    assert [endpoint.url for endpoint in pool.endpoints] == ["http://gpu-1:11434", "http://gpu-2:11500"]
+    assert get_pool() is pool
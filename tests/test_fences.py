@@ -0,0 +1,62 @@
+from springboot_assistant.fences import FenceScanner, first_block, parse_info, scan_fences, split_fences
+
+RESPONSE = """Here is the service:
+
+```java:src/main/java/com/example/BookService.java
+class BookService {}
+```
+
+And the configuration:
+
+~~~yaml application.yml
+server:
+  port: 8080
+~~~
+"""
+
+
+def test_info_string_gives_language_and_path():
+    assert parse_info("java:src/Foo.java") == ("java", "src/Foo.java")
+    assert parse_info("yaml application.yml") == ("yaml", "application.yml")
+    assert parse_info('xml title="pom.xml"') == ("xml", "pom.xml")
+    assert parse_info("") == ("text", None)
+
+
+def test_blocks_are_scanned_in_order():
+    blocks = scan_fences(RESPONSE)
+    assert [(block["language"], block["path"]) for block in blocks] == [
+        ("java", "src/main/java/com/example/BookService.java"), ("yaml", "application.yml")]
+    assert blocks[1]["code"] == "server:\n  port: 8080"
+    assert all(block["complete"] for block in blocks)
+
+
+def test_streamed_chunks_give_the_same_blocks():
+    for size in (1, 3, 10):
+        scanner = FenceScanner()
+        blocks = []
+        for start in range(0, len(RESPONSE), size):
+            blocks.extend(scanner.feed(RESPONSE[start:start + size]))
+        blocks.extend(scanner.finish())
+        assert blocks == scan_fences(RESPONSE)
+
+
+def test_longer_fence_wraps_shorter_ones_and_markdown_nests():
+    text = "````md\n# Readme\n```bash\nmvn test\n```\n````\n"
+    assert scan_fences(text) == [{"language": "md", "path": None, "code": "# Readme\n```bash\nmvn test\n```",
+                                  "complete": True}]
+    nested = "```markdown\n```java\nclass A {}\n```\n```\n"
+    assert scan_fences(nested)[0]["code"] == "```java\nclass A {}\n```"
+
+
+def test_cut_off_block_is_incomplete():
+    blocks = scan_fences("Text\n```java\nclass A {")
+    assert blocks == [{"language": "java", "path": None, "code": "class A {", "complete": False}]
+    assert first_block("```java\nclass A {", ["java"]) is None
+    assert first_block("```java\nclass A {", ["java"], partial=True) == "class A {"
+
+
+def test_inline_code_and_prose_are_kept_apart():
+    prose, blocks = split_fences("Use ```mvn test``` to run.\n" + RESPONSE)
+    assert len(blocks) == 2
+    assert prose.split("\n")[0] == "Use ```mvn test``` to run."
+    assert "class BookService" not in prose and "And the configuration:" in prose
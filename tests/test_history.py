@@ -0,0 +1,26 @@
+from springboot_assistant.history import history_window, summarize_message
+
+
+def test_window_splits_hidden_collapsed_and_recent():
+    messages = [{"content": str(index)} for index in range(10)]
+    hidden, collapsed, recent = history_window(messages, recent_count=3, pages_loaded=1, page_size=2)
+    assert hidden == 5
+    assert [index for index, _ in collapsed] == [5, 6]
+    assert [index for index, _ in recent] == [7, 8, 9]
+
+
+def test_summary_counts_blocks_and_names_classes():
+    content = "## Service\nHere it is:\n\n```java\nclass BookService {}\n```\n\n```java\nrecord Book() {}\n```\n"
+    assert summarize_message(content) == "Service Here it is: [2 code blocks; BookService, Book]"
+
+
+def test_summary_follows_the_fence_rules():
+    # A longer fence wraps a shorter one: one block, and nothing inside it is prose
+    content = "Readme:\n````markdown\n```bash\nmvn test\n```\nInside the readme\n````\n"
+    assert summarize_message(content) == "Readme: [1 code block]"
+
+
+def test_long_prose_is_cut_at_a_word():
+    summary = summarize_message("word " * 100, max_chars=20)
+    assert summary == "word word word word…"
+    assert summarize_message("") == "(empty message)"
@@ -0,0 +1,41 @@
+import pkgutil
+import subprocess
+import sys
+
+import springboot_assistant
+
+HEAVY = ["ollama", "pygments", "springboot_assistant.build"]
+
+# Imports every module but build.py and the CLI entry point in a fresh
+# interpreter, with the heavy modules blocked so an import of one fails even
+# where it isn't installed
+CHECK = """
+import importlib
+import sys
+
+heavy = {heavy!r}
+attempts = []
+
+
+class Blocker:
+    def find_spec(self, name, path=None, target=None):
+        if name in heavy or name.split(".")[0] in heavy:
+            attempts.append(name)
+            raise ImportError(f"{{name}} is imported on first use only")
+
+
+sys.meta_path.insert(0, Blocker())
+for module in {modules!r}:
+    importlib.import_module(module)
+print(sorted(set(attempts)))
+"""
+
+
+def test_light_modules_do_not_import_the_heavy_dependencies():
+    modules = [f"springboot_assistant.{info.name}" for info in pkgutil.iter_modules(springboot_assistant.__path__)
+               if info.name not in ("build", "__main__")]
+    assert "springboot_assistant.core" in modules
+    result = subprocess.run([sys.executable, "-c", CHECK.format(heavy=HEAVY, modules=modules)],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
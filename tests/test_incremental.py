@@ -0,0 +1,58 @@
+from springboot_assistant.core import new_project
+from springboot_assistant.generators import INCOMPLETE_MARKER
+from springboot_assistant.incremental import add_generated_test, plan_tests, remove_tests
+
+SERVICE = "package com.example;\npublic class BookService {\n    void save() {}\n}\n"
+REPOSITORY = "package com.example;\npublic interface BookRepository {}\n"
+
+
+def project_with(files):
+    project = new_project()
+    for filename, content in files.items():
+        project["generated_files"][filename] = content
+        project["file_categories"]["main"].append(filename)
+    return project
+
+
+def test_new_classes_are_generated_and_tested_ones_skipped():
+    project = project_with({"BookService.java": SERVICE, "BookRepository.java": REPOSITORY})
+    assert plan_tests(project, ["BookService.java", "BookRepository.java"], "m")["generate"] == [
+        ("BookService.java", "new"), ("BookRepository.java", "new")]
+
+    add_generated_test(project, "BookServiceTest.java", "class BookServiceTest {}", "BookService.java", "m")
+    plan = plan_tests(project, ["BookService.java", "BookRepository.java"], "m")
+    assert plan["generate"] == [("BookRepository.java", "new")]
+    assert plan["unchanged"] == ["BookService.java"]
+    assert project["file_categories"]["test"] == ["BookServiceTest.java"]
+
+
+def test_changed_source_or_model_regenerates():
+    project = project_with({"BookService.java": SERVICE})
+    add_generated_test(project, "BookServiceTest.java", "class BookServiceTest {}", "BookService.java", "m")
+    assert plan_tests(project, ["BookService.java"], "other")["generate"] == [
+        ("BookService.java", "model or prompt changed")]
+    project["generated_files"]["BookService.java"] = SERVICE.replace("save", "delete")
+    assert plan_tests(project, ["BookService.java"], "m")["generate"] == [("BookService.java", "source changed")]
+
+
+def test_interrupted_test_is_not_recorded():
+    project = project_with({"BookService.java": SERVICE})
+    add_generated_test(project, "BookServiceTest.java", f"// {INCOMPLETE_MARKER}\nclass BookServiceTest {{",
+                       "BookService.java", "m")
+    assert "BookServiceTest.java" in project["test_files"]
+    assert plan_tests(project, ["BookService.java"], "m")["generate"] == [("BookService.java", "new")]
+
+
+def test_tests_of_removed_or_renamed_classes_are_orphaned():
+    project = project_with({"BookService.java": SERVICE, "BookRepository.java": REPOSITORY})
+    add_generated_test(project, "BookServiceTest.java", "class BookServiceTest {}", "BookService.java", "m")
+    add_generated_test(project, "BookRepositoryTest.java", "class BookRepositoryTest {}", "BookRepository.java", "m")
+    del project["generated_files"]["BookRepository.java"]
+    project["generated_files"]["BookService.java"] = SERVICE.replace("BookService", "LibraryService")
+    orphaned = plan_tests(project, [], "m")["orphaned"]
+    assert orphaned == [("BookRepositoryTest.java", "BookRepository.java was removed"),
+                        ("BookServiceTest.java", "the class in BookService.java was renamed")]
+
+    remove_tests(project, [test_filename for test_filename, _ in orphaned])
+    assert len(project["test_files"]) == 0
+    assert project["test_sources"] == {} and project["file_categories"]["test"] == []
@@ -0,0 +1,146 @@
+from springboot_assistant.java_index import JavaSymbolIndex, parse_java, primary_type, tokenize_java
+
+SERVICE = """
+package com.example.demo.service;
+
+import java.util.List;
+import com.example.demo.repository.BookRepository;
+
+@Service
+@RequiredArgsConstructor
+public class BookService {
+    private final BookRepository repository;
+    private static final int LIMIT = 10;
+
+    public List<Book> findAll() {
+        return repository.findAll();
+    }
+
+    public Book save(@Valid Book book) {
+        return repository.save(book);
+    }
+}
+"""
+
+CONTROLLER = """
+package com.example.demo.controller;
+
+@RestController
+@RequestMapping("/api/books")
+public class BookController {
+    private final BookService service;
+
+    public BookController(BookService service) {
+        this.service = service;
+    }
+
+    @GetMapping
+    public List<Book> all() {
+        return service.findAll();
+    }
+
+    @GetMapping("/{id}")
+    public Book one(@PathVariable Long id) {
+        return service.findById(id);
+    }
+
+    @PostMapping(value = "/", consumes = "application/json")
+    public Book create(@RequestBody Book book) {
+        return service.save(book);
+    }
+}
+"""
+
+
+def test_tokenizer_drops_comments_and_keeps_literals():
+    tokens = tokenize_java('// line\n/* block */ String s = "a // b"; char c = \'}\';')
+    assert ("string", "a // b") in tokens
+    assert ("char", "}") in tokens
+    assert all(text not in ("line", "block") for _, text in tokens)
+
+
+def test_parses_package_imports_and_members():
+    parsed = parse_java(SERVICE)
+    assert parsed["package"] == "com.example.demo.service"
+    assert parsed["imports"] == ["java.util.List", "com.example.demo.repository.BookRepository"]
+    declaration = primary_type(parsed)
+    assert declaration["name"] == "BookService"
+    assert declaration["qualified_name"] == "com.example.demo.service.BookService"
+    assert declaration["role"] == "service"
+    assert [field["name"] for field in declaration["fields"]] == ["repository", "LIMIT"]
+    assert [method["name"] for method in declaration["methods"]] == ["findAll", "save"]
+    assert declaration["methods"][0]["return_type"] == "List<Book>"
+    assert declaration["methods"][1]["parameters"][0]["type"] == "Book"
+    assert declaration["dependencies"] == ["BookRepository"]
+
+
+def test_controller_endpoints():
+    declaration = primary_type(parse_java(CONTROLLER))
+    assert declaration["role"] == "controller"
+    assert declaration["dependencies"] == ["BookService"]
+    assert [(endpoint["method"], endpoint["path"], endpoint["handler"]) for endpoint in declaration["endpoints"]] == [
+        ("GET", "/api/books", "all"),
+        ("GET", "/api/books/{id}", "one"),
+        ("POST", "/api/books", "create"),
+    ]
+    assert declaration["endpoints"][2]["consumes"] == "application/json"
+
+
+def test_literals_holding_delimiters_do_not_end_the_class_body():
+    source = """
+public class Delimiters {
+    private String close = "}";
+    private String open = "{";
+    private String separators = ",;()[]";
+    private char brace = '}';
+    private char comma = ',', semicolon = ';';
+
+    @Value("}")
+    private String annotated;
+
+    public String first(String prefix, @Value("(") String suffix) {
+        return prefix + "}" + suffix;
+    }
+
+    public String second() throws IllegalStateException {
+        return "{";
+    }
+}
+"""
+    declaration = primary_type(parse_java(source))
+    assert [field["name"] for field in declaration["fields"]] == [
+        "close", "open", "separators", "brace", "comma", "semicolon", "annotated"]
+    assert [method["name"] for method in declaration["methods"]] == ["first", "second"]
+    assert [parameter["name"] for parameter in declaration["methods"][0]["parameters"]] == ["prefix", "suffix"]
+    assert declaration["fields"][-1]["annotations"][0]["args"] == {"value": "}"}
+
+
+def test_enum_record_and_nested_types():
+    parsed = parse_java("""
+public enum Status { ACTIVE("}"), INACTIVE(";"); Status(String label) {} }
+record Point(int x, int y) {}
+class Outer { static class Inner { int value; } }
+""")
+    status, point, outer = parsed["types"]
+    assert status["constants"] == ["ACTIVE", "INACTIVE"]
+    assert [field["name"] for field in point["fields"]] == ["x", "y"]
+    assert outer["nested"][0]["qualified_name"] == "Outer.Inner"
+
+
+def test_test_classes_get_the_test_role():
+    declaration = primary_type(parse_java("class BookServiceTest { @Test void saves() {} }"))
+    assert declaration["role"] == "test"
+
+
+def test_index_reparses_only_changed_files():
+    files = {"BookService.java": SERVICE, "BookController.java": CONTROLLER, "README.md": "# Books"}
+    index = JavaSymbolIndex(files)
+    assert sorted(filename for filename, _ in index.types()) == ["BookController.java", "BookService.java"]
+    parsed = index.parsed("BookService.java")
+    files["BookController.java"] = CONTROLLER.replace("BookController", "AuthorController")
+    del files["BookService.java"]
+    index.update(files)
+    assert index.parsed("BookService.java") is None
+    assert index.find_type("AuthorController")[0] == "BookController.java"
+    assert index.update({"BookService.java": SERVICE}).parsed("BookService.java") is parsed
+    assert index.files_with_role("service") == ["BookService.java"]
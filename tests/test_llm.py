@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from springboot_assistant import endpoints, llm
+from springboot_assistant.cancel import CancelToken
+from springboot_assistant.endpoints import EndpointPool
+
+
+class _Ollama(BaseHTTPRequestHandler):
+    # Streams `chunks` over a kept-alive chunked response, as Ollama does, waiting
+    # `delay` seconds before the first (a long prefill) and `stall` seconds after it
+    protocol_version = "HTTP/1.1"
+    chunks = []
+    delay = 0.0
+    stall = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            time.sleep(self.delay)
+            for index, chunk in enumerate(self.chunks):
+                line = (json.dumps(chunk) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+                if index == 0:
+                    time.sleep(self.stall)
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass  # the client closed the stream
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Ollama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(endpoints, "_pool", EndpointPool([f"http://127.0.0.1:{server.server_port}"]))
+    _Ollama.delay = _Ollama.stall = 0.0
+    yield _Ollama
+    server.shutdown()
+
+
+def test_streams_the_chunks(ollama):
+    ollama.delay = 0.0
+    ollama.chunks = [{"message": {"content": "Hello"}}, {"message": {"content": " world"}},
+                     {"message": {"content": ""}, "done": True}]
+    chunks = list(llm.stream_chat([{"role": "user", "content": "hi"}], cancel=CancelToken(),
+                                  timeout=5, first_token_timeout=5))
+    assert "".join(chunks) == "Hello world"
+
+
+def test_cancel_during_prefill_closes_the_stream_at_once(ollama):
+    ollama.delay = 3.0
+    ollama.chunks = [{"message": {"content": "late"}}, {"message": {"content": ""}, "done": True}]
+    token = CancelToken()
+    threading.Timer(0.2, token.cancel).start()
+    started = time.monotonic()
+    chunks = list(llm.stream_chat([{"role": "user", "content": "hi"}], cancel=token, timeout=10,
+                                  first_token_timeout=10))
+    assert chunks == []
+    assert time.monotonic() - started < 2.0
+
+
+def test_cancel_mid_stream_keeps_the_chunks_received(ollama):
+    ollama.stall = 3.0
+    ollama.chunks = [{"message": {"content": "Hello"}}, {"message": {"content": " late"}},
+                     {"message": {"content": ""}, "done": True}]
+    token = CancelToken()
+    chunks = []
+    started = time.monotonic()
+    for chunk in llm.stream_chat([{"role": "user", "content": "hi"}], cancel=token, timeout=10,
+                                 first_token_timeout=10):
+        chunks.append(chunk)
+        threading.Timer(0.2, token.cancel).start()
+    assert chunks == ["Hello"]
+    assert time.monotonic() - started < 2.0
+
+
+def test_read_timeout_drops_once_tokens_flow(ollama):
+    ollama.delay, ollama.stall = 0.5, 3.0
+    ollama.chunks = [{"message": {"content": "Hello"}}, {"message": {"content": " late"}},
+                     {"message": {"content": ""}, "done": True}]
+    chunks = []
+    started = time.monotonic()
+    with pytest.raises(Exception):
+        for chunk in llm.stream_chat([{"role": "user", "content": "hi"}], cancel=CancelToken(), timeout=0.3,
+                                     first_token_timeout=5):
+            chunks.append(chunk)
+    assert chunks == ["Hello"]
+    assert time.monotonic() - started < 2.0
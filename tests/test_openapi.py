@@ -0,0 +1,84 @@
+from springboot_assistant import generators
+from springboot_assistant.java_index import JavaSymbolIndex
+from springboot_assistant.openapi import build_openapi_spec, render_openapi_yaml
+
+CONTROLLER = """package com.example.demo;
+@RestController
+@RequestMapping("/api/books")
+public class BookController {
+    @GetMapping("/{id}")
+    public ResponseEntity<BookDto> get(@PathVariable Long id) { return null; }
+    @PostMapping
+    @ResponseStatus(HttpStatus.CREATED)
+    public BookDto create(@RequestBody @Valid BookDto book) { return book; }
+    @GetMapping
+    public List<BookDto> list(@RequestParam(required = false) String author, HttpServletRequest request) { return null; }
+}
+"""
+DTO = """package com.example.demo;
+public class BookDto extends BaseDto {
+    @NotBlank private String title;
+    private static final long serialVersionUID = 1L;
+    @JsonIgnore private String secret;
+}
+"""
+BASE = """package com.example.demo;
+public class BaseDto { private Long id; }
+"""
+
+
+def project_files():
+    return {"BookController.java": CONTROLLER, "BookDto.java": DTO, "BaseDto.java": BASE}
+
+
+def test_paths_come_from_the_mapping_annotations():
+    spec = build_openapi_spec(project_files(), {"app_name": "books"})
+    assert spec["info"]["title"] == "books"
+    assert sorted(spec["paths"]) == ["/api/books", "/api/books/{id}"]
+    get = spec["paths"]["/api/books/{id}"]["get"]
+    assert get["parameters"] == [{"name": "id", "in": "path", "required": True,
+                                  "schema": {"type": "integer", "format": "int64"}}]
+    create = spec["paths"]["/api/books"]["post"]
+    assert create["requestBody"]["required"]
+    assert list(create["responses"]) == ["201"]
+    # Framework arguments are not parameters
+    assert [parameter["name"] for parameter in spec["paths"]["/api/books"]["get"]["parameters"]] == ["author"]
+
+
+def test_schemas_include_inherited_fields_and_skip_ignored_ones():
+    schema = build_openapi_spec(project_files(), {})["components"]["schemas"]["BookDto"]
+    assert schema == {"type": "object", "properties": {"id": {"type": "integer", "format": "int64"},
+                                                       "title": {"type": "string"}},
+                      "required": ["title"]}
+
+
+def test_changing_a_supertype_updates_the_cached_schema():
+    index = JavaSymbolIndex()
+    files = project_files()
+    build_openapi_spec(files, {}, index)
+    files["BaseDto.java"] = BASE.replace("private Long id;", "private Long id; private String isbn;")
+    schema = build_openapi_spec(files, {}, index)["components"]["schemas"]["BookDto"]
+    assert sorted(schema["properties"]) == ["id", "isbn", "title"]
+
+
+def test_project_without_controllers_has_no_spec():
+    assert build_openapi_spec({"BookDto.java": DTO}, {}) is None
+
+
+def test_enriched_specs_are_bounded(monkeypatch):
+    monkeypatch.setattr(generators, "ENRICHED_SPECS_SIZE", 2)
+    monkeypatch.setattr(generators, "_enriched_specs", type(generators._enriched_specs)())
+    calls = []
+
+    def complete(task, messages, **kwargs):
+        calls.append(task)
+        return "```yaml\n" + messages[-1]["content"].split("```yaml")[1].split("```")[0] + "\n```"
+
+    monkeypatch.setattr(generators, "routed_completion", complete)
+    skeletons = [render_openapi_yaml(build_openapi_spec(project_files(), {"app_name": name}))
+                 for name in ("a", "b", "c")]
+    for skeleton in skeletons:
+        generators.enrich_openapi_spec(skeleton, ["/api/books"])
+    assert len(generators._enriched_specs) == 2
+    generators.enrich_openapi_spec(skeletons[2], ["/api/books"])
+    assert len(calls) == 3
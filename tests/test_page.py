@@ -0,0 +1,66 @@
+import pytest
+
+from springboot_assistant.core import new_project
+from springboot_assistant.page import PageRun
+
+
+class RecordingStore:
+    def __init__(self):
+        self.calls = []
+
+    def save(self, project):
+        self.calls.append("save")
+
+    def evict(self, project):
+        self.calls.append("evict")
+
+
+class Rerun(Exception):
+    pass
+
+
+def rerun():
+    raise Rerun  # st.rerun() stops the script the same way
+
+
+@pytest.fixture
+def project():
+    return {**new_project(), "notices": []}
+
+
+def test_sections_of_a_full_run_leave_saving_to_the_end(project):
+    store = RecordingStore()
+    page = PageRun(store, rerun)
+    page.fragment_done(project)
+    page.fragment_done(project)
+    assert store.calls == []
+
+    page.page_done(project)
+    assert store.calls == ["save", "evict"]
+    assert not page.full_run
+
+
+def test_a_fragment_rerunning_on_its_own_saves_and_evicts(project):
+    store = RecordingStore()
+    page = PageRun(store, rerun)
+    page.page_done(project)
+    store.calls.clear()
+
+    page.fragment_done(project)
+    assert store.calls == ["save", "evict"]
+
+
+def test_a_project_change_saves_and_reruns_the_whole_page(project):
+    store = RecordingStore()
+    page = PageRun(store, rerun)
+    page.page_done(project)
+    store.calls.clear()
+
+    with pytest.raises(Rerun):
+        page.project_changed(project, ("success", "Test generated: BookServiceTest.java"))
+    assert store.calls == ["save"]
+    assert project["notices"] == [("success", "Test generated: BookServiceTest.java")]
+
+    with pytest.raises(Rerun):
+        page.project_changed(project)
+    assert len(project["notices"]) == 1
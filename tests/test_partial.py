@@ -0,0 +1,98 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from springboot_assistant import endpoints, generators, llm, router as router_module
+from springboot_assistant.core import new_project
+from springboot_assistant.endpoints import EndpointPool
+from springboot_assistant.router import ModelRouter
+from springboot_assistant.scheduler import RequestScheduler
+
+SERVICE = "package com.example;\npublic class BookService {\n    void save() {}\n}\n"
+
+
+class _Ollama(BaseHTTPRequestHandler):
+    # Streams `chunks` of content as Ollama does; with `complete` False the
+    # connection drops after the last one instead of finishing the answer
+    protocol_version = "HTTP/1.1"
+    chunks = []
+    complete = True
+    requests = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(payload)
+        if not payload.get("stream"):
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = [{"message": {"content": chunk}} for chunk in self.chunks]
+        if self.complete:
+            lines.append({"message": {"content": ""}, "done": True})
+        for line in lines:
+            data = (json.dumps(line) + "\n").encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        if self.complete:
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Ollama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(endpoints, "_pool", EndpointPool([f"http://127.0.0.1:{server.server_port}"]))
+    monkeypatch.setattr(router_module, "router", ModelRouter({}))
+    monkeypatch.setattr(router_module, "scheduler", RequestScheduler(max_concurrent=4))
+    _Ollama.chunks, _Ollama.complete, _Ollama.requests = [], True, []
+    yield _Ollama
+    server.shutdown()
+
+
+def test_completion_streams_to_the_observer(ollama):
+    ollama.chunks = ["# Library", "\n\nBooks ", "and loans."]
+    seen = []
+    token = llm.stream_observer.set(seen.append)
+    try:
+        assert llm.stream_completion([{"role": "user", "content": "hi"}], model="m") == "# Library\n\nBooks and loans."
+    finally:
+        llm.stream_observer.reset(token)
+    assert seen == ["# Library", "# Library\n\nBooks ", "# Library\n\nBooks and loans."]
+
+
+def test_broken_stream_raises_with_the_output_so_far(ollama):
+    ollama.chunks, ollama.complete = ["# Library", "\n\nBooks "], False
+    with pytest.raises(llm.PartialResponse) as raised:
+        llm.stream_completion([{"role": "user", "content": "hi"}], model="m")
+    assert raised.value.content == "# Library\n\nBooks "
+    assert len(ollama.requests) == 1  # not started again without streaming
+
+
+def test_interrupted_tests_keep_the_partial_class(ollama):
+    ollama.chunks, ollama.complete = ["```java\npublic class BookServiceTest {\n", "    @Test\n"], False
+    test_code, test_class_name = generators.generate_tests(SERVICE, "BookService.java", model="m")
+    assert test_class_name == "BookServiceTest"
+    assert generators.is_incomplete(test_code)
+    assert test_code.split("\n", 1)[1] == "public class BookServiceTest {\n    @Test"
+    assert len(ollama.requests) == 1  # the router doesn't retry a partial answer
+
+
+def test_interrupted_documentation_keeps_the_partial_text(ollama):
+    ollama.chunks, ollama.complete = ["# Library\n", "Books and "], False
+    documentation = generators.generate_documentation({"BookService.java": SERVICE}, new_project()["project_metadata"],
+                                                      model="m")
+    first_line, rest = documentation.split("\n", 1)
+    assert first_line.startswith(f"> {generators.INCOMPLETE_MARKER}")
+    assert rest == "# Library\nBooks and "
@@ -0,0 +1,109 @@
+import pytest
+
+from springboot_assistant.core import new_project, register_blocks
+from springboot_assistant.patches import PatchConflict, apply_edits, apply_hunks, locate, parse_edits
+from springboot_assistant.store import file_hash
+
+SERVICE = """package com.example.demo;
+
+public class BookService {
+    public List<Book> findAll() {
+        return repository.findAll();
+    }
+
+    public Book save(Book book) {
+        return repository.save(book);
+    }
+}"""
+
+
+def project_with(**files):
+    project = new_project()
+    register_blocks(project, [{"language": "java", "path": name, "code": code} for name, code in files.items()])
+    return project
+
+
+def edit_block(filename, search, replace):
+    return f"```java:{filename}\n<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE\n```\n"
+
+
+def test_parse_search_replace_and_whole_files():
+    response = ("Changes:\n\n" + edit_block("src/main/java/BookService.java", "a", "b") +
+                "\n```java:src/main/java/Book.java\npublic class Book {}\n```\n")
+    edits, blocks = parse_edits(response)
+    assert edits == [{"filename": "BookService.java", "path": "src/main/java/BookService.java",
+                      "hunks": [{"old": ["a"], "new": ["b"], "line": None}]}]
+    assert [block["path"] for block in blocks] == ["src/main/java/Book.java"]
+
+
+def test_parse_unified_diff():
+    diff = "```diff\n--- a/Book.java\n+++ b/Book.java\n@@ -2,2 +2,2 @@\n keep\n-old\n+new\n```\n"
+    edits, blocks = parse_edits(diff)
+    assert blocks == []
+    assert edits == [{"filename": "Book.java", "path": "Book.java",
+                      "hunks": [{"old": ["keep", "old"], "new": ["keep", "new"], "line": 2}]}]
+
+
+def test_locate_exact_whitespace_and_fuzzy():
+    lines = SERVICE.split("\n")
+    assert locate(lines, ["        return repository.findAll();"])[2] == "exact"
+    assert locate(lines, ["return   repository.findAll();"])[2] == "whitespace"
+    assert locate(lines, ["        return repository.findAl();"])[2] == "fuzzy"
+    with pytest.raises(PatchConflict):
+        locate(lines, ["        return repository.findAl();"], fuzzy=False)
+    with pytest.raises(PatchConflict, match="matches 2 places"):
+        locate(lines, ["    }"])
+
+
+def test_apply_hunks_keeps_offsets():
+    content, placed = apply_hunks("a\nb\nc\nd", [
+        {"old": ["b"], "new": ["b1", "b2"], "line": 2},
+        {"old": ["d"], "new": ["d1"], "line": 4},
+    ])
+    assert content == "a\nb1\nb2\nc\nd1"
+    assert placed == ["exact", "exact"]
+
+
+def test_apply_edits_patches_creates_and_reports_conflicts():
+    project = project_with(**{"BookService.java": SERVICE})
+    edits, _ = parse_edits(
+        edit_block("BookService.java", "        return repository.findAll();",
+                   "        return repository.findAll(Sort.by(\"title\"));") +
+        edit_block("Missing.java", "x", "y") +
+        "```diff\n+++ b/Author.java\n@@ -0,0 +1 @@\n+public class Author {}\n```\n")
+    results = apply_edits(project, edits)
+    assert [result["status"] for result in results] == ["patched", "conflict", "created"]
+    assert 'findAll(Sort.by("title"))' in project["generated_files"]["BookService.java"]
+    assert results[1]["detail"] == "no such file in the project"
+    assert project["generated_files"]["Author.java"] == "public class Author {}"
+
+
+def test_conflicting_file_is_left_unchanged():
+    project = project_with(**{"BookService.java": SERVICE})
+    edits, _ = parse_edits(edit_block("BookService.java", "    }", "    } // end"))
+    assert apply_edits(project, edits)[0]["status"] == "conflict"
+    assert project["generated_files"]["BookService.java"] == SERVICE
+
+
+def test_later_edits_of_a_file_patched_by_the_same_answer_are_not_stale():
+    project = project_with(**{"BookService.java": SERVICE})
+    base_hashes = {"BookService.java": file_hash(project["generated_files"], "BookService.java")}
+    edits, _ = parse_edits(
+        edit_block("BookService.java", "        return repository.findAll();", "        return repository.findAll(sort);") +
+        edit_block("BookService.java", "        return repository.sav(book);", "        return repository.saveAndFlush(book);"))
+    results = apply_edits(project, edits, base_hashes)
+    assert [result["status"] for result in results] == ["patched", "patched"]
+    assert results[1]["placed"] == ["fuzzy"]
+
+
+def test_stale_file_takes_only_exact_or_whitespace_matches():
+    project = project_with(**{"BookService.java": SERVICE})
+    base_hashes = {"BookService.java": "hash of an older version"}
+    edits, _ = parse_edits(
+        edit_block("BookService.java", "return  repository.findAll();", "return repository.findAll(sort);") +
+        edit_block("BookService.java", "        return repository.sav(book);", "        return repository.saveAndFlush(book);"))
+    results = apply_edits(project, edits, base_hashes)
+    assert results[0]["status"] == "patched"
+    assert results[0]["placed"] == ["whitespace"]
+    assert results[1]["status"] == "conflict"
+    assert results[1]["detail"].endswith("(the file changed since the request)")
@@ -0,0 +1,42 @@
+import pytest
+
+from springboot_assistant import pipeline
+from springboot_assistant.core import new_project
+
+SERVICE = "package com.example;\npublic class BookService {\n    void save() {}\n}\n"
+REPOSITORY = "package com.example;\npublic interface BookRepository {}\n"
+
+
+def project_with(files):
+    project = new_project()
+    for filename, content in files.items():
+        project["generated_files"][filename] = content
+        project["file_categories"]["main"].append(filename)
+    return project
+
+
+def fail_for(failing):
+    def generate_tests(content, filename, model=None, temperature=None):
+        if filename in failing:
+            return None, "Error generating tests: model unavailable"
+        class_name = filename[:-len(".java")]
+        return f"class {class_name}Test {{}}", f"{class_name}Test"
+    return generate_tests
+
+
+def test_one_failed_class_does_not_stop_the_others(monkeypatch):
+    monkeypatch.setattr(pipeline, "generate_tests", fail_for({"BookService.java"}))
+    project = project_with({"BookService.java": SERVICE, "BookRepository.java": REPOSITORY})
+
+    result = pipeline.run_task(project, "tests", model="m")
+    assert result == {"written": ["BookRepositoryTest.java"],
+                      "failed": {"BookService.java": "Error generating tests: model unavailable"}}
+    assert list(project["test_files"]) == ["BookRepositoryTest.java"]
+
+
+def test_raises_when_every_class_failed(monkeypatch):
+    monkeypatch.setattr(pipeline, "generate_tests", fail_for({"BookService.java"}))
+    project = project_with({"BookService.java": SERVICE})
+
+    with pytest.raises(RuntimeError, match="BookService.java"):
+        pipeline.run_task(project, "tests", model="m")
@@ -0,0 +1,82 @@
+from springboot_assistant import retrieval
+from springboot_assistant.retrieval import RetrievalIndex, select_relevant_files, tokenize
+
+FILES = {
+    "BookController.java": "@RestController class BookController { BookService bookService; }",
+    "BookService.java": "@Service class BookService { BookRepository repository; void save(Book book) {} }",
+    "AuthorRepository.java": "interface AuthorRepository extends JpaRepository<Author, Long> {}",
+}
+
+
+def test_identifiers_are_split_into_their_words():
+    assert tokenize("BookService save_book") == ["bookservice", "book", "service", "save_book", "save", "book"]
+    assert "public" not in tokenize("public class A")
+
+
+def test_search_ranks_matching_files_first():
+    index = RetrievalIndex()
+    index.update(FILES)
+    ranked = index.search("author repository")
+    assert ranked[0][0] == "AuthorRepository.java"
+    assert index.search("book service")[0][0] == "BookService.java"
+
+
+def test_changed_and_removed_files_are_reindexed():
+    index = RetrievalIndex()
+    index.update(FILES)
+    files = dict(FILES)
+    files["BookService.java"] = "class BookService { Author author; }"
+    del files["AuthorRepository.java"]
+    index.update(files)
+    assert sorted(index._docs) == ["BookController.java", "BookService.java"]
+    assert index.search("author")[0][0] == "BookService.java"
+
+
+def test_selection_fits_the_budget():
+    large = dict(FILES, **{"Large.java": "class Large { " + "int book; " * 2000 + "}"})
+    selected = select_relevant_files("book", large, budget=300, k=2)
+    assert 0 < len(selected) <= 2
+    assert select_relevant_files("book", {}) == {}
+    only_services = select_relevant_files("book", FILES, include=lambda filename: "Service" in filename)
+    assert list(only_services) == ["BookService.java"]
+
+
+def test_turning_embeddings_on_embeds_indexed_files(monkeypatch):
+    requests = []
+
+    def embed(text, model, timeout=None):
+        requests.append(model)
+        return [1.0, 0.0] if model == "small" else [0.0, 1.0, 0.0]
+
+    monkeypatch.setattr(retrieval, "embed_text", embed)
+    index = RetrievalIndex()
+    index.update(FILES)
+    assert requests == []
+
+    index.embedding_model = "small"
+    index.update(FILES)
+    assert requests == ["small"] * 3
+    assert {model for model, _ in index._vectors.values()} == {"small"}
+
+    # Another model: the old vectors go and every file is embedded again
+    index.embedding_model = "large"
+    assert index._vectors == {}
+    index.update(FILES)
+    assert requests[3:] == ["large"] * 3
+    assert all(len(vector) == 3 for _, vector in index._vectors.values())
+    index.update(FILES)
+    assert len(requests) == 6
+
+
+def test_files_are_embedded_outside_the_index_lock(monkeypatch):
+    held = []
+
+    def embed(text, model, timeout=None):
+        held.append(index._lock.locked())
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(retrieval, "embed_text", embed)
+    index = RetrievalIndex(embedding_model="small")
+    index.update(FILES)
+    index.search("book")
+    assert held and not any(held)
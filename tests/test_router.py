@@ -0,0 +1,76 @@
+import pytest
+
+from springboot_assistant import llm, router as router_module
+from springboot_assistant.cancel import CancelToken
+from springboot_assistant.router import ModelRouter
+from springboot_assistant.scheduler import RequestScheduler
+
+POLICY = {"tests": {"model": "primary", "fallback": "fallback", "slo_seconds": 10, "options": {}}}
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(router_module, "scheduler", RequestScheduler(max_concurrent=4))
+    monkeypatch.setattr(llm, "list_models", lambda: ["primary", "fallback"])
+    return ModelRouter({task: dict(entry) for task, entry in POLICY.items()})
+
+
+def test_cancelled_attempt_is_not_counted_against_the_model(router, monkeypatch):
+    token = CancelToken()
+
+    def cancelled(messages, **kwargs):
+        token.cancel()
+        raise RuntimeError("Empty response when generating tests")
+
+    monkeypatch.setattr(llm, "stream_completion", cancelled)
+    with pytest.raises(RuntimeError):
+        router.complete("tests", [{"role": "user", "content": "hi"}], cancel=token)
+    assert router.stats() == []
+
+
+def test_failed_attempt_is_recorded_and_retried_on_the_fallback(router, monkeypatch):
+    attempts = []
+
+    def flaky(messages, model, **kwargs):
+        attempts.append(model)
+        if model == "primary":
+            raise RuntimeError("Empty response when generating tests")
+        return "class BookServiceTest {}"
+
+    monkeypatch.setattr(llm, "stream_completion", flaky)
+    assert router.complete("tests", [{"role": "user", "content": "hi"}]) == "class BookServiceTest {}"
+    assert attempts == ["primary", "fallback"]
+    assert {(row["model"], row["failures"]) for row in router.stats()} == {("primary", 1), ("fallback", 0)}
+
+
+def test_over_slo_routes_to_the_fallback_and_probes_the_primary(router, monkeypatch):
+    router.record("tests", "primary", 30)
+    # The primary was just used: the next request goes to the fallback
+    router._last_primary[("primary", "tests")] = router_module.time.monotonic()
+    route = router.route("tests")
+    assert route["model"] == "fallback" and route["reason"].startswith("fallback")
+    # Once PROBE_INTERVAL has passed, one request probes the primary again
+    router._last_primary[("primary", "tests")] -= router_module.PROBE_INTERVAL
+    assert router.route("tests")["reason"].startswith("probe")
+    assert router.route("tests")["model"] == "fallback"
+
+
+def test_missing_fallback_keeps_the_primary(router, monkeypatch):
+    monkeypatch.setattr(llm, "list_models", lambda: ["primary"])
+    router.record("tests", "primary", 30)
+    router._last_primary[("primary", "tests")] = router_module.time.monotonic()
+    assert router.route("tests")["model"] == "primary"
+
+
+def test_installed_models_are_listed_outside_the_lock(router, monkeypatch):
+    held = []
+
+    def list_models():
+        held.append(router._lock.locked())
+        return ["primary", "fallback"]
+
+    monkeypatch.setattr(llm, "list_models", list_models)
+    router.record("tests", "primary", 30)
+    router._last_primary[("primary", "tests")] = router_module.time.monotonic()
+    assert router.route("tests")["model"] == "fallback"
+    assert held == [False]
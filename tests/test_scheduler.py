@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from springboot_assistant.cancel import CancelToken, GenerationCancelled
+from springboot_assistant.scheduler import BACKGROUND, INTERACTIVE, QueueFull, RequestScheduler
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def hold(scheduler, release, started, **kwargs):
+    def run():
+        with scheduler.slot(**kwargs):
+            started.append(kwargs.get("session"))
+            release.wait(2)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_runs_at_most_max_concurrent():
+    scheduler = RequestScheduler(max_concurrent=1, per_session=2)
+    release, started = threading.Event(), []
+    first = hold(scheduler, release, started, task="tests", session="a")
+    wait_until(lambda: started == ["a"])
+    second = hold(scheduler, release, started, task="tests", session="b")
+    wait_until(lambda: scheduler.stats()["waiting"]["background"] == 1)
+    assert started == ["a"]
+    release.set()
+    first.join()
+    second.join()
+    assert started == ["a", "b"]
+    assert scheduler.stats()["running"] == {}
+
+
+def test_interactive_requests_start_before_background_ones():
+    scheduler = RequestScheduler(max_concurrent=1, per_session=3)
+    release, started = threading.Event(), []
+    blocker = hold(scheduler, release, started, task="tests", session="blocker")
+    wait_until(lambda: started == ["blocker"])
+    order = []
+
+    def request(task, session):
+        with scheduler.slot(task, session):
+            order.append(session)
+
+    background = threading.Thread(target=request, args=("documentation", "background"))
+    background.start()
+    wait_until(lambda: scheduler.stats()["waiting"]["background"] == 1)
+    chat = threading.Thread(target=request, args=("chat", "chat"))
+    chat.start()
+    wait_until(lambda: scheduler.stats()["waiting"]["interactive"] == 1)
+    release.set()
+    for thread in (blocker, background, chat):
+        thread.join()
+    assert order == ["chat", "background"]
+
+
+def test_per_session_quota_lets_other_sessions_pass():
+    scheduler = RequestScheduler(max_concurrent=2, per_session=1)
+    release, started = threading.Event(), []
+    threads = [hold(scheduler, release, started, task="tests", session="a")]
+    wait_until(lambda: started == ["a"])
+    threads.append(hold(scheduler, release, started, task="tests", session="a"))
+    wait_until(lambda: scheduler.stats()["waiting"]["background"] == 1)
+    threads.append(hold(scheduler, release, started, task="tests", session="b"))
+    wait_until(lambda: started == ["a", "b"])
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert started == ["a", "b", "a"]
+
+
+def test_full_queue_refuses_background_before_interactive():
+    scheduler = RequestScheduler(max_concurrent=1, per_session=5, max_queue=1)
+    release, started = threading.Event(), []
+    threads = [hold(scheduler, release, started, task="tests", session="a")]
+    wait_until(lambda: started == ["a"])
+    threads.append(hold(scheduler, release, started, task="tests", session="b"))
+    wait_until(lambda: scheduler.stats()["waiting"]["background"] == 1)
+    with pytest.raises(QueueFull):
+        with scheduler.slot("tests", "c", priority=BACKGROUND):
+            pass
+    threads.append(hold(scheduler, release, started, task="chat", session="c", priority=INTERACTIVE))
+    wait_until(lambda: scheduler.stats()["waiting"]["interactive"] == 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert started == ["a", "c", "b"]
+
+
+def test_cancelled_request_leaves_the_queue():
+    scheduler = RequestScheduler(max_concurrent=1)
+    release, started = threading.Event(), []
+    blocker = hold(scheduler, release, started, task="tests", session="a")
+    wait_until(lambda: started == ["a"])
+    token = CancelToken()
+    errors = []
+
+    def waiting():
+        try:
+            with scheduler.slot("tests", "b", cancel=token):
+                pass
+        except GenerationCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=waiting)
+    thread.start()
+    wait_until(lambda: scheduler.stats()["waiting"]["background"] == 1)
+    token.cancel()
+    thread.join(2)
+    assert errors and scheduler.stats()["waiting"]["background"] == 0
+    release.set()
+    blocker.join()
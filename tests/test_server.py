@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from springboot_assistant import pipeline, server
+from springboot_assistant.cancel import cancel_token
+from springboot_assistant.jobs import JobManager
+from springboot_assistant.store import SQLiteProjectStore
+
+SERVICE = "package com.example;\npublic class BookService {\n    void save() {}\n}\n"
+REPOSITORY = "package com.example;\npublic interface BookRepository {}\n"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "store", SQLiteProjectStore(str(tmp_path / "assistant.db")))
+    monkeypatch.setattr(server, "jobs", JobManager())
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def released(monkeypatch):
+    calls = []
+    release = server.store.release
+    monkeypatch.setattr(server.store, "release", lambda project: (calls.append(project["id"]), release(project)))
+    return calls
+
+
+def project_with(client, files):
+    project_id = client.post("/projects", json={"metadata": {"name": "library"}}).json()["id"]
+    project = server.store.get(project_id)
+    for filename, content in files.items():
+        project["generated_files"][filename] = content
+        project["file_categories"]["main"].append(filename)
+    server.store.save(project)
+    server.store.release(project)
+    return project_id
+
+
+def wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        assert time.monotonic() < deadline, job
+        time.sleep(0.02)
+
+
+def sse_events(response):
+    return [(event.split("\n")[0][len("event: "):], json.loads(event.split("\n")[1][len("data: "):]))
+            for event in response.text.split("\n\n") if event]
+
+
+def test_file_is_revalidated_with_its_etag(client, released):
+    project_id = project_with(client, {"BookService.java": SERVICE})
+    released.clear()
+
+    response = client.get(f"/projects/{project_id}/files/BookService.java")
+    assert response.status_code == 200 and response.text == SERVICE
+    etag = response.headers["etag"]
+
+    response = client.get(f"/projects/{project_id}/files/BookService.java", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.headers["etag"] == etag
+    assert client.get(f"/projects/{project_id}/files/Missing.java").status_code == 404
+    assert released == [project_id] * 3
+
+
+def test_tests_job_is_polled_until_done_and_saved(client, monkeypatch):
+    monkeypatch.setattr(pipeline, "generate_tests", lambda content, filename, **kwargs: (
+        "class BookServiceTest {}", "BookServiceTest"))
+    project_id = project_with(client, {"BookService.java": SERVICE})
+
+    response = client.post(f"/projects/{project_id}/jobs", json={"task": "tests", "model": "m"})
+    assert response.status_code == 202
+    job = wait_for_job(client, response.json()["id"])
+    assert job["status"] == "done"
+    assert job["result"] == {"written": ["BookServiceTest.java"], "failed": {}}
+    assert client.get(f"/projects/{project_id}").json()["test_files"] == ["BookServiceTest.java"]
+
+
+def test_a_failed_job_keeps_the_files_written_before(client, monkeypatch):
+    def generate_tests(content, filename, **kwargs):
+        if filename == "BookRepository.java":
+            raise RuntimeError("connection lost")
+        return "class BookServiceTest {}", "BookServiceTest"
+
+    monkeypatch.setattr(pipeline, "generate_tests", generate_tests)
+    project_id = project_with(client, {"BookService.java": SERVICE, "BookRepository.java": REPOSITORY})
+
+    job = wait_for_job(client, client.post(f"/projects/{project_id}/jobs", json={"task": "tests"}).json()["id"])
+    assert job["status"] == "failed" and job["error"] == "connection lost"
+    assert client.get(f"/projects/{project_id}").json()["test_files"] == ["BookServiceTest.java"]
+
+
+def test_cancelled_job_stops_after_the_current_class(client, monkeypatch):
+    started = threading.Event()
+
+    def generate_tests(content, filename, **kwargs):
+        started.set()
+        token = cancel_token.get()
+        while not token.cancelled:
+            time.sleep(0.01)
+        class_name = filename[:-len(".java")]
+        return f"class {class_name}Test {{}}", f"{class_name}Test"
+
+    monkeypatch.setattr(pipeline, "generate_tests", generate_tests)
+    project_id = project_with(client, {"BookService.java": SERVICE, "BookRepository.java": REPOSITORY})
+
+    job_id = client.post(f"/projects/{project_id}/jobs", json={"task": "tests"}).json()["id"]
+    assert started.wait(5)
+    assert client.post(f"/jobs/{job_id}/cancel").json() == {"id": job_id, "cancelled": True}
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "cancelled"
+    assert job["result"] == {"written": ["BookServiceTest.java"], "failed": {}}
+    assert client.get(f"/projects/{project_id}").json()["test_files"] == ["BookServiceTest.java"]
+
+
+def test_unknown_tasks_and_jobs_are_rejected(client):
+    project_id = project_with(client, {})
+    assert client.post(f"/projects/{project_id}/jobs", json={"task": "deploy"}).status_code == 400
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.post("/jobs/missing/cancel").status_code == 404
+
+
+def test_chat_streams_events_and_records_the_turn(client, monkeypatch):
+    answer = ["Here it is:\n```java\n", "package com.example;\npublic class Book {}\n", "```\n"]
+    monkeypatch.setattr(server, "routed_stream", lambda task, messages, **kwargs: iter(answer))
+    project_id = project_with(client, {})
+
+    response = client.post("/chat", json={"prompt": "Add a Book entity", "project_id": project_id})
+    events = sse_events(response)
+    assert [event for event, _ in events] == ["start", "chunk", "chunk", "chunk", "block", "done"]
+    assert "".join(data["content"] for event, data in events if event == "chunk") == "".join(answer)
+    assert events[4][1]["language"] == "java"
+    done = events[-1][1]
+    assert [info["filename"] for info in done["files"]] == ["Book.java"] and done["cancelled"] is False
+
+    summary = client.get(f"/projects/{project_id}").json()
+    assert summary["messages"] == 2 and summary["files"] == ["Book.java"]
+    assert project_id in server.summarizers and project_id in server.retrievers
+
+
+def test_cancelled_chat_keeps_the_partial_answer(client, monkeypatch):
+    def routed_stream(task, messages, cancel=None, **kwargs):
+        yield "Partial answer"
+        client.post(f"/chat/{next(iter(server.generations))}/cancel")
+        assert cancel.cancelled
+
+    monkeypatch.setattr(server, "routed_stream", routed_stream)
+    project_id = project_with(client, {})
+
+    events = sse_events(client.post("/chat", json={"prompt": "Explain", "project_id": project_id}))
+    assert events[-1] == ("done", {"length": len("Partial answer"), "files": [], "conflicts": [], "cancelled": True})
+    assert server.generations == {}
+    assert client.post(f"/chat/{events[0][1]['id']}/cancel").status_code == 404
+    assert server.store.get(project_id)["messages"][-1]["content"] == "Partial answer"
+
+
+def test_per_project_chat_state_is_bounded(monkeypatch):
+    monkeypatch.setattr(server, "MAX_PROJECT_STATE", 2)
+    cache = type(server.summarizers)()
+    for project_id in ("a", "b", "a", "c"):
+        server.project_state(cache, project_id, dict)
+    assert list(cache) == ["a", "c"]
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from springboot_assistant import speculative
+from springboot_assistant.cancel import CancelToken, cancel_token
+from springboot_assistant.scheduler import BACKGROUND, SPECULATIVE, RequestScheduler
+from springboot_assistant.speculative import Pregenerator, project_key
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = RequestScheduler(max_concurrent=2)
+    monkeypatch.setattr(speculative, "scheduler", scheduler)
+    monkeypatch.setattr(speculative, "IDLE_POLL", 0.01)
+    return scheduler
+
+
+def test_real_work_preempts_a_speculative_request(scheduler):
+    token, started, release = CancelToken(), threading.Event(), threading.Event()
+
+    def speculate():
+        with scheduler.slot(task="tests", priority=SPECULATIVE, cancel=token):
+            started.set()
+            release.wait(2)
+
+    thread = threading.Thread(target=speculate)
+    thread.start()
+    assert started.wait(2)
+    with scheduler.slot(task="tests", priority=BACKGROUND):
+        assert token.cancelled
+    release.set()
+    thread.join()
+    assert scheduler.stats()["preempted"] == 1
+
+
+def test_speculative_request_waits_for_other_work(scheduler):
+    release, order = threading.Event(), []
+
+    def background():
+        with scheduler.slot(task="tests", session="a"):
+            order.append("background")
+            release.wait(2)
+
+    thread = threading.Thread(target=background)
+    thread.start()
+    wait_until(lambda: order == ["background"])
+
+    def speculate():
+        with scheduler.slot(priority=SPECULATIVE, session="b"):
+            order.append("speculative")
+
+    waiting = threading.Thread(target=speculate)
+    waiting.start()
+    wait_until(lambda: scheduler.stats()["waiting"]["speculative"] == 1)
+    assert order == ["background"]
+    release.set()
+    thread.join()
+    waiting.join()
+    assert order == ["background", "speculative"]
+
+
+def test_jobs_run_once_per_key_and_keep_their_result(scheduler):
+    pregenerator = Pregenerator(idle_delay=0)
+    runs = []
+    assert pregenerator.schedule("key", lambda: runs.append(1) or "result")
+    wait_until(lambda: pregenerator.stats()["completed"] == 1)
+    assert not pregenerator.schedule("key", lambda: runs.append(1) or "result")
+    assert pregenerator.result("key") == "result" and runs == [1]
+    assert pregenerator.result("other") is None
+    assert (pregenerator.stats()["hits"], pregenerator.stats()["misses"]) == (1, 1)
+
+
+def test_preempted_job_is_queued_again(scheduler):
+    pregenerator = Pregenerator(idle_delay=0)
+    attempts = []
+
+    def job():
+        attempts.append(1)
+        if len(attempts) == 1:
+            cancel_token.get().cancel()
+            return None
+        return "result"
+
+    pregenerator.schedule("key", job)
+    wait_until(lambda: pregenerator.result("key") == "result")
+    assert pregenerator.stats()["preempted"] == 1 and len(attempts) == 2
+
+
+def test_jobs_wait_for_the_backend_to_be_idle(scheduler):
+    pregenerator = Pregenerator(idle_delay=0)
+    release, entered = threading.Event(), threading.Event()
+
+    def hold():
+        with scheduler.slot(task="tests"):
+            entered.set()
+            release.wait(2)
+
+    busy = threading.Thread(target=hold)
+    busy.start()
+    assert entered.wait(2)
+    pregenerator.schedule("key", lambda: "result")
+    time.sleep(0.1)
+    assert pregenerator.stats()["completed"] == 0
+    release.set()
+    busy.join()
+    wait_until(lambda: pregenerator.stats()["completed"] == 1)
+
+
+def test_result_keys_follow_the_sources():
+    assert speculative.tests_key("class A {}") != speculative.tests_key("class A { }")
+    assert speculative.tests_key("class A {}", model="a") != speculative.tests_key("class A {}", model="b")
+    files = {"A.java": "class A {}"}
+    key = project_key("documentation", files, {"app_name": "a"})
+    assert key == project_key("documentation", dict(files), {"app_name": "a"})
+    assert key != project_key("documentation", {"A.java": "class A { int a; }"}, {"app_name": "a"})
+    assert key != project_key("openapi", files, {"app_name": "a"})
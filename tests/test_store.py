@@ -0,0 +1,111 @@
+import pytest
+
+from springboot_assistant.blobs import BlobStore, VersionedFiles
+from springboot_assistant.core import new_project
+from springboot_assistant.store import (LazyFiles, MemoryProjectStore, SQLiteProjectStore, export_project,
+                                        import_project)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteProjectStore(str(tmp_path / "assistant.db"))
+
+
+def test_files_messages_and_test_records_survive_a_reload(store):
+    project = store.create({"app_name": "books"})
+    project["generated_files"]["Book.java"] = "class Book {}"
+    project["test_files"]["BookTest.java"] = "class BookTest {}"
+    project["messages"].append({"role": "user", "content": "hi"})
+    project["test_sources"]["BookTest.java"] = {"source": "Book.java", "source_hash": "h", "model": "m",
+                                                "prompt_hash": "p"}
+    store.save(project)
+
+    loaded = store.get(project["id"])
+    assert isinstance(loaded["generated_files"], LazyFiles)
+    assert loaded["generated_files"]["Book.java"] == "class Book {}"
+    assert loaded["messages"] == [{"role": "user", "content": "hi"}]
+    assert loaded["test_sources"] == project["test_sources"]
+
+
+def test_loaded_contents_are_shared_through_the_blob_store(store):
+    blobs = BlobStore()
+    project = store.create()
+    project["generated_files"]["Book.java"] = "class Book {}"
+    store.save(project)
+
+    hashes = {"Book.java": project["generated_files"].hash_of("Book.java")}
+    first = LazyFiles(store, project["id"], "generated", hashes, blobs=blobs)
+    second = LazyFiles(store, project["id"], "generated", hashes, blobs=blobs)
+    assert first["Book.java"] is second["Book.java"]
+    assert blobs.stats()["blobs"] == 1
+    first.evict()
+    assert blobs.stats()["blobs"] == 1
+    second.close()
+    assert blobs.stats()["blobs"] == 0
+
+
+def test_in_memory_history_is_saved(store):
+    project = store.create()
+    session = dict(project, generated_files=VersionedFiles(blobs=BlobStore()))
+    for version in range(1, 4):
+        session["generated_files"]["Book.java"] = f"class Book {{ int v{version}; }}"
+    store.save(session)
+
+    loaded = store.get(project["id"])["generated_files"]
+    assert [version["version"] for version in loaded.versions("Book.java")] == [1, 2, 3]
+    assert loaded.version("Book.java", 1) == "class Book { int v1; }"
+
+    # Versions made after a save are added to the stored ones
+    session["generated_files"]["Book.java"] = "class Book { int v4; }"
+    store.save(session)
+    loaded = store.get(project["id"])["generated_files"]
+    assert loaded.version("Book.java", 3) == "class Book { int v3; }"
+    assert loaded["Book.java"] == "class Book { int v4; }"
+
+
+def test_deleting_an_in_memory_project_releases_its_files():
+    store = MemoryProjectStore()
+    project = store.create()
+    project["generated_files"]["Unique.java"] = "class UniqueToThisTest {}"
+    blobs = project["generated_files"]._blobs
+    before = blobs.stats()["blobs"]
+    assert store.delete(project["id"])
+    assert blobs.stats()["blobs"] == before - 1
+
+
+def test_export_and_import(store):
+    project = new_project({"app_name": "books"})
+    project["generated_files"]["Book.java"] = "class Book {}"
+    project["messages"].append({"role": "user", "content": "hi"})
+    imported = import_project(store, export_project(project))
+    assert store.get(imported["id"])["generated_files"]["Book.java"] == "class Book {}"
+    assert store.get(imported["id"])["project_metadata"]["app_name"] == "books"
+
+
+def test_turns_saved_from_stale_copies_are_all_kept(store):
+    project_id = store.create()["id"]
+    first, second = store.get(project_id), store.get(project_id)
+    first["messages"] += [{"role": "user", "content": "a"}, {"role": "assistant", "content": "A"}]
+    store.save(first)
+    second["messages"] += [{"role": "user", "content": "b"}, {"role": "assistant", "content": "B"}]
+    store.save(second)
+
+    contents = [message["content"] for message in store.get(project_id)["messages"]]
+    assert contents == ["a", "A", "b", "B"]
+    # The later copy now holds the merged history and saves on top of it
+    assert [message["content"] for message in second["messages"]] == contents
+    second["messages"].append({"role": "user", "content": "c"})
+    store.save(second)
+    assert [message["content"] for message in store.get(project_id)["messages"]] == contents + ["c"]
+
+
+def test_edited_and_removed_messages_are_written_back(store):
+    project = store.create()
+    project["messages"] += [{"role": "user", "content": "a"}, {"role": "assistant", "content": "A"}]
+    store.save(project)
+    project["messages"][1]["content"] = "A (stopped)"
+    store.save(project)
+    assert store.get(project["id"])["messages"][1]["content"] == "A (stopped)"
+    del project["messages"][1:]
+    store.save(project)
+    assert store.get(project["id"])["messages"] == [{"role": "user", "content": "a"}]
@@ -0,0 +1,57 @@
+import json
+
+from springboot_assistant.structured import StructuredParser, parse_structured, to_markdown
+
+ANSWER = json.dumps({
+    "files": [
+        {"path": "src/main/java/com/example/Book.java", "language": "Java",
+         "content": "class Book {\n    String title = \"a \\\"quoted\\\" title\";\n}\n"},
+        {"path": "src/main/resources/application.yml", "language": "yaml", "content": "server:\n  port: 8080"},
+    ],
+    "explanation": "Two files.",
+})
+
+
+def feed_in_chunks(parser, text, size):
+    blocks = []
+    for start in range(0, len(text), size):
+        blocks.extend(parser.feed(text[start:start + size]))
+    return blocks
+
+
+def test_files_complete_as_their_objects_close():
+    for size in (1, 2, 7, len(ANSWER)):
+        parser = StructuredParser()
+        blocks = feed_in_chunks(parser, ANSWER, size)
+        assert [block["path"] for block in blocks] == ["src/main/java/com/example/Book.java",
+                                                      "src/main/resources/application.yml"]
+        assert blocks[0]["language"] == "java" and blocks[0]["complete"]
+        assert blocks[0]["code"] == 'class Book {\n    String title = "a \\"quoted\\" title";\n}'
+        assert parser.explanation == "Two files."
+
+
+def test_file_being_written_is_visible():
+    parser = StructuredParser()
+    cut = ANSWER.index("port")
+    parser.feed(ANSWER[:cut])
+    current = parser.current()
+    assert current["path"] == "src/main/resources/application.yml"
+    assert current["code"] == "server:" and not current["complete"]
+
+
+def test_cut_off_answer_keeps_complete_files_only():
+    answer = parse_structured(ANSWER[:ANSWER.index("port")])
+    assert [block["path"] for block in answer["files"]] == ["src/main/java/com/example/Book.java"]
+    assert answer["explanation"] == ""
+
+
+def test_markdown_fences_are_named_after_the_path():
+    markdown = to_markdown(parse_structured(ANSWER))
+    assert markdown.startswith("Two files.\n\n```java:src/main/java/com/example/Book.java\n")
+    assert "```yaml:src/main/resources/application.yml\nserver:\n  port: 8080\n```" in markdown
+
+
+def test_code_with_fences_gets_a_longer_fence():
+    markdown = to_markdown({"explanation": "", "files": [{"language": "markdown", "path": "README.md",
+                                                          "code": "```java\nclass A {}\n```", "complete": True}]})
+    assert markdown.startswith("````markdown:README.md\n") and markdown.endswith("\n````")
@@ -0,0 +1,38 @@
+import pytest
+
+from springboot_assistant.templates import detect_stack, render, render_artifact
+
+POM = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <dependencies>
+    <dependency><artifactId>spring-boot-starter-data-jpa</artifactId></dependency>
+    <dependency><artifactId>postgresql</artifactId></dependency>
+    <dependency><artifactId>spring-boot-starter-data-redis</artifactId></dependency>
+  </dependencies>
+</project>"""
+METADATA = {"app_name": "books", "artifact_id": "Book_Store", "java_version": "17", "spring_boot_version": "3.2.0"}
+
+
+def test_placeholders_are_filled_and_github_expressions_kept():
+    assert render("{{name}}-${{ github.sha }}", {"name": "app"}) == "app-${{ github.sha }}"
+    with pytest.raises(KeyError):
+        render("{{missing}}", {})
+
+
+def test_stack_comes_from_the_build_file():
+    stack = dict(detect_stack({"pom.xml": POM}))
+    assert stack == {"actuator": False, "build_tool": "maven", "jpa": True, "services": ("postgres", "redis")}
+    gradle = dict(detect_stack({"build.gradle": "implementation 'org.springframework.kafka:spring-kafka'"}))
+    assert gradle["build_tool"] == "gradle" and gradle["services"] == ("kafka",)
+
+
+def test_compose_starts_the_detected_services():
+    compose = render_artifact("docker-compose", METADATA, {"pom.xml": POM})
+    assert "postgres" in compose and "redis" in compose and "mysql" not in compose
+    assert "SPRING_DATA_REDIS" in compose and "book_store" in compose
+
+
+def test_artifacts_follow_the_build_tool():
+    maven = render_artifact("github-actions", METADATA, {"pom.xml": POM})
+    gradle = render_artifact("github-actions", METADATA, {"build.gradle": ""})
+    assert "mvn" in maven and "gradle" in gradle
+    assert "# books - Spring Boot 3.2.0 on Java 17" in render_artifact("dockerfile", METADATA, {"pom.xml": POM})
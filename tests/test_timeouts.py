@@ -0,0 +1,48 @@
+from springboot_assistant.timeouts import (DEFAULT_DECODE_RATE, DEFAULT_LOAD_SECONDS, DEFAULT_PREFILL_RATE,
+                                           FIRST_TOKEN_FLOOR, IDLE_FLOOR, SAFETY, TimeoutPolicy)
+
+
+def measure(policy, model="m", host="h", prefill=400, decode=40, load_ns=0):
+    policy.record(model, host, {"prompt_eval_count": prefill, "prompt_eval_duration": 1e9,
+                                "eval_count": decode, "eval_duration": 1e9, "load_duration": load_ns})
+
+
+def test_unmeasured_model_uses_the_default_rates():
+    policy = TimeoutPolicy()
+    assert policy.rates("m") == {"prefill": DEFAULT_PREFILL_RATE, "decode": DEFAULT_DECODE_RATE,
+                                 "load": DEFAULT_LOAD_SECONDS, "samples": 0}
+    timeouts = policy.for_generation("m", 400, "tests")
+    assert timeouts["first_token"] == round(SAFETY * (DEFAULT_LOAD_SECONDS + 400 / DEFAULT_PREFILL_RATE)
+                                            + FIRST_TOKEN_FLOOR, 1)
+    assert timeouts["idle"] >= IDLE_FLOOR
+
+
+def test_rates_are_averaged_and_the_slowest_host_wins():
+    policy = TimeoutPolicy()
+    measure(policy, host="fast", decode=40)
+    measure(policy, host="fast", decode=20)
+    measure(policy, host="slow", decode=10, load_ns=5e9)
+    assert policy.rates("m", "fast")["decode"] == 0.3 * 20 + 0.7 * 40
+    assert policy.rates("m", "fast")["samples"] == 2
+    rates = policy.rates("m")
+    assert rates["decode"] == 10 and rates["load"] == 5 and rates["samples"] == 3
+
+
+def test_reports_without_timings_are_ignored():
+    policy = TimeoutPolicy()
+    policy.record("m", "h", {"load_duration": 1e9})
+    assert policy.describe() == []
+
+
+def test_retries_fit_the_budget():
+    policy = TimeoutPolicy()
+    measure(policy, prefill=1000, decode=100)
+    assert policy.retries("m", 1000, "tests") == 2
+    # The default rates leave no room for a second attempt on the same model
+    assert policy.retries("unmeasured", 1000, "tests") == 0
+
+
+def test_a_distinct_fallback_always_gets_one_retry():
+    policy = TimeoutPolicy()
+    assert policy.retries("unmeasured", 1000, "tests", fallback="other") == 1
+    assert policy.retries("unmeasured", 1000, "tests", fallback="unmeasured") == 0